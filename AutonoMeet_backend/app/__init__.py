@@ -6,38 +6,41 @@ from flask_jwt_extended import JWTManager
 from flask_jwt_extended.exceptions import NoAuthorizationError, JWTExtendedException
 from flask_cors import CORS
 from app.config import Config
+from app.utils.cache import init_caches
+from app.utils.conditional import init_versions
+from app.utils.password_hashing import init_password_hasher
+from app.utils.json_provider import FastJSONProvider, output_json
+from app.utils.replica import RoutingSession, init_replica, replica_binds
+from app.utils.metrics import init_metrics
+from app.utils.query_profiler import init_query_profiler
+from app.utils.structured_logging import init_logging
 from dotenv import load_dotenv
-import stripe
 import os
-import logging  
 
 load_dotenv()
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
-def create_app():
+def create_app(config_overrides=None):
     app = Flask(__name__)
-
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-    )
-    app.logger.setLevel(logging.DEBUG)  
-    handler = logging.StreamHandler()  
-    handler.setLevel(logging.DEBUG)
-    app.logger.addHandler(handler)
+    app.json = FastJSONProvider(app)
 
     CORS(
         app,
         origins=["https://practica-final-sw2-frontend.onrender.com"], 
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
         allow_headers=["Content-Type", "Authorization"],
+        expose_headers=["X-Next-Cursor"],
         supports_credentials=True
     )
 
     API_PREFIX = '/api/v0'
     
     app.config.from_object(Config)
+    if config_overrides:
+        app.config.update(config_overrides)
+
+    init_logging(app)
     
     if not app.config.get('SQLALCHEMY_DATABASE_URI'):
         raise RuntimeError("Database URI not configured")
@@ -46,46 +49,76 @@ def create_app():
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = 3600 
     jwt = JWTManager(app)
     
-    stripe.api_key = app.config['STRIPE_SECRET_KEY']
+    from app.utils.db_pool import engine_options, init_pool_stats
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    app.config['SQLALCHEMY_BINDS'] = replica_binds(app.config, engine_options)
     db.init_app(app)
+    init_replica(app)
+    init_query_profiler(app)
+    init_pool_stats(app)
+    init_caches(app)
+    init_versions(app)
+    init_password_hasher(app)
     
+    # The schema is managed by `flask db upgrade` (app/migrations), never at boot
     with app.app_context():
         from app.models.user import User
         from app.models.appointment import Appointment
         from app.models.category import Category
         from app.models.review import Review 
         from app.models.service import Service
-        db.create_all()
+        from app.models.stripe_event import StripeEvent
+
+    from app.services.payment_service import init_payment_jobs
+    init_payment_jobs(app)
+
+    from app.utils.booking_lock import init_booking_locks
+    init_booking_locks(app)
+
+    from app.utils.search_index import init_search_index
+    init_search_index(app)
+
+    from app.utils.migrations import migrations_cli
+    app.cli.add_command(migrations_cli)
+
+    from app.utils.warmup import start_warmup
+    start_warmup(app)
     
     api = Api(app, title="AutonoMeetApi", version="1.0", 
               description="Documentation of AutonoMeet API with Flask-RESTx")
+    api.representation('application/json')(output_json)
 
     @jwt.unauthorized_loader
     def unauthorized_callback(callback):
-        app.logger.error(f"Unauthorized access: {callback}")
+        app.logger.error("Unauthorized access: %s", callback)
         return jsonify({"message": "Missing Authorization Header"}), 401
 
     @jwt.invalid_token_loader
     def invalid_token_callback(callback):
-        app.logger.error(f"Invalid token: {callback}")
+        app.logger.error("Invalid token: %s", callback)
         return jsonify({"message": "Invalid token"}), 422
     
     @app.errorhandler(NoAuthorizationError)
     def handle_no_authorization_error(e):
-        app.logger.error(f"No authorization error: {str(e)}")
+        app.logger.error("No authorization error: %s", str(e))
         return jsonify({"message": "Missing Authorization Header"}), 401
 
     # Add a general error handler for uncaught exceptions
     @app.errorhandler(Exception)
     def handle_exception(e):
-        app.logger.error(f"Unhandled exception: {str(e)}", exc_info=True)
+        app.logger.error("Unhandled exception: %s", str(e), exc_info=True)
         return jsonify({"message": "Internal server error", "error": str(e)}), 500
 
     from app.routes import auth_routes
-    from app.routes import serv_routes, appointments
+    from app.routes import serv_routes, appointments, admin_routes
     
     api.add_namespace(auth_routes.api, path=f"{API_PREFIX}/auth")
     api.add_namespace(serv_routes.api, path=f"{API_PREFIX}/services") 
     api.add_namespace(appointments.api, path=f"{API_PREFIX}/appointments") 
+    api.add_namespace(admin_routes.api, path=f"{API_PREFIX}/admin")
+    init_metrics(app, api)
+
+    from app.utils.async_views import init_async_views
+    init_async_views(app)
 
     return app
@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -9,6 +10,19 @@ class Config:
         raise ValueError("No DATABASE_URL set for Flask application")
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool sizing for the request path (see app/utils/db_pool.py); any engine
+    # option can also be given as JSON in SQLALCHEMY_ENGINE_OPTIONS, which wins
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 10))
+    # Recycle before managed Postgres/proxies drop idle connections
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    SQLALCHEMY_ENGINE_OPTIONS = json.loads(os.getenv("SQLALCHEMY_ENGINE_OPTIONS", "{}"))
+    # Optional read replica for catalogue reads (see app/utils/replica.py);
+    # a caller who writes keeps reading the primary for the sticky window
+    SQLALCHEMY_REPLICA_URI = os.getenv("DATABASE_REPLICA_URL")
+    DB_REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", 5))
     SECRET_KEY = os.getenv("SECRET_KEY")
     if not SECRET_KEY:
         raise ValueError("No SECRET_KEY set for Flask application")
@@ -21,4 +35,87 @@ class Config:
     if not STRIPE_SECRET_KEY:
         raise ValueError("No STRIPE_SECRET_KEY set for Flask application")
     
-    PROPAGATE_EXCEPTIONS = True
\ No newline at end of file
+    PROPAGATE_EXCEPTIONS = True
+
+    PAGINATION_DEFAULT_LIMIT = int(os.getenv("PAGINATION_DEFAULT_LIMIT", 100))
+    PAGINATION_MAX_LIMIT = int(os.getenv("PAGINATION_MAX_LIMIT", 500))
+
+    SERVICE_CACHE_MAXSIZE = int(os.getenv("SERVICE_CACHE_MAXSIZE", 1024))
+    # Seconds a cached lookup may be served; also bounds staleness across workers
+    SERVICE_CACHE_TTL = float(os.getenv("SERVICE_CACHE_TTL", 30))
+
+    AUTH_CACHE_MAXSIZE = int(os.getenv("AUTH_CACHE_MAXSIZE", 4096))
+    PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 30))
+    TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", 60))
+
+    GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
+    GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+
+    GITHUB_CLIENT_ID = os.getenv("GITHUB_CLIENT_ID")
+    GITHUB_CLIENT_SECRET = os.getenv("GITHUB_CLIENT_SECRET")
+    GITHUB_OAUTH_URL = os.getenv("GITHUB_OAUTH_URL", "https://github.com/login/oauth/access_token")
+    GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 20))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 2))
+    HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", 20))
+
+    # Sign-in, checkout and payment success answer with their async views
+    # (see app/utils/async_views.py), overlapping their upstream calls
+    ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "false").lower() in ("1", "true", "yes")
+    # Threads running async views' database steps; keep within the pool's capacity
+    ASYNC_DB_WORKERS = int(os.getenv("ASYNC_DB_WORKERS", DB_POOL_SIZE + DB_MAX_OVERFLOW))
+    ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", 500))
+    ASYNC_HTTP_PER_HOST_LIMIT = int(os.getenv("ASYNC_HTTP_PER_HOST_LIMIT", 500))
+    # Seconds an async /appointments/success waits for the webhook before a 202
+    PAYMENT_SUCCESS_WAIT = float(os.getenv("PAYMENT_SUCCESS_WAIT", 5))
+
+    STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
+    PAYMENT_WORKERS = int(os.getenv("PAYMENT_WORKERS", 4))
+    # Webhook events still unbooked after this many seconds are re-queued at
+    # boot, and a job's claim on an event expires (its job died with a
+    # previous process)
+    PAYMENT_JOB_TIMEOUT = float(os.getenv("PAYMENT_JOB_TIMEOUT", 300))
+    PAYMENT_SWEEP_ON_START = os.getenv("PAYMENT_SWEEP_ON_START", "true").lower() in ("1", "true", "yes")
+
+    # Seconds a booking waits for the freelancer's lock before a 503
+    BOOKING_LOCK_TIMEOUT = float(os.getenv("BOOKING_LOCK_TIMEOUT", 10))
+    # Longest service, in minutes; conflict checks look back this far for
+    # bookings still running
+    APPOINTMENT_MAX_DURATION = int(os.getenv("APPOINTMENT_MAX_DURATION", 14 * 24 * 60))
+
+    # Any werkzeug method string; changing it rehashes passwords on next login
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", 5))
+
+    # Users allowed on admin endpoints (comma-separated emails)
+    ADMIN_EMAILS = [email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()]
+
+    # Logs go through a queue to a background writer (see app/utils/structured_logging.py)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+    # Fraction of DEBUG records kept, e.g. 0.01 in busy environments
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 1))
+    # Records beyond this many waiting for the writer are dropped, not blocked on
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+
+    # Prometheus endpoint at /metrics (see app/utils/metrics.py); scrapers
+    # must send METRICS_TOKEN as a Bearer token, and without one it is closed
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    # Opt-in SQL profiler (see app/utils/query_profiler.py): per-request
+    # statement counts, N+1 warnings and a slow-query log with call sites
+    SQL_PROFILER = os.getenv("SQL_PROFILER", "false").lower() in ("1", "true", "yes")
+    SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", 200))
+    SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", 5))
+
+    # Comma-separated warm-up hooks run after boot (see app/utils/warmup.py),
+    # e.g. "db,http,stripe,google,services,search"; empty means a cold, lazy start
+    WARMUP = [name.strip() for name in os.getenv("WARMUP", "").split(",") if name.strip()]
+    WARMUP_IN_BACKGROUND = os.getenv("WARMUP_IN_BACKGROUND", "true").lower() in ("1", "true", "yes")
+    WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", 2))
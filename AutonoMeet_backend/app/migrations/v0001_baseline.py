@@ -0,0 +1,61 @@
+"""Baseline: the schema as it stood before migrations, when create_all built it at boot.
+
+Tables are declared here rather than imported from app.models so the
+baseline stays fixed while the models move on. Existing databases keep
+their tables (checkfirst) and are simply recorded as migrated.
+"""
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, ForeignKey, Integer, MetaData, SmallInteger, String, Table, Text, TIMESTAMP, func
+)
+
+metadata = MetaData()
+
+Table(
+    'users', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('github_id', Integer, unique=True, nullable=True),
+    Column('email', String(255), unique=True, nullable=True),
+    Column('password_hash', String(255), nullable=True),
+    Column('is_freelancer', Boolean, default=False),
+    Column('created_at', TIMESTAMP, default=func.now())
+)
+
+Table(
+    'categories', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('name', String(100), unique=True, nullable=False)
+)
+
+Table(
+    'services', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('user_id', Integer, ForeignKey('users.id')),
+    Column('category_id', Integer, ForeignKey('categories.id')),
+    Column('title', String(255), nullable=False),
+    Column('price', Float, nullable=False),
+    Column('duration', Integer, nullable=False),
+    Column('description', String(500))
+)
+
+Table(
+    'appointments', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('client_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('service_id', Integer, ForeignKey('services.id'), nullable=False),
+    Column('scheduled_at', DateTime, nullable=False),
+    Column('created_at', DateTime, nullable=False)
+)
+
+Table(
+    'reviews', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('author_id', Integer, ForeignKey('users.id')),
+    Column('rating', SmallInteger, nullable=False),
+    Column('comment', Text)
+)
+
+def upgrade(conn):
+    metadata.create_all(conn, checkfirst=True)
+
+def downgrade(conn):
+    metadata.drop_all(conn, checkfirst=True)
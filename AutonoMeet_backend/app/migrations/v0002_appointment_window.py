@@ -0,0 +1,37 @@
+"""Materialize each appointment's freelancer and end time for indexed conflict checks."""
+from datetime import datetime, timedelta
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, bindparam, column, table, update
+from app.utils.migrations import add_column, create_index, drop_column, drop_index, set_not_null
+
+appointments = table('appointments', column('id'), column('ends_at', DateTime))
+
+def upgrade(conn):
+    add_column(conn, 'appointments', Column('freelancer_id', Integer, ForeignKey('users.id')))
+    add_column(conn, 'appointments', Column('ends_at', DateTime))
+    conn.exec_driver_sql(
+        'UPDATE appointments SET freelancer_id = '
+        '(SELECT services.user_id FROM services WHERE services.id = appointments.service_id) '
+        'WHERE freelancer_id IS NULL'
+    )
+    # Interval arithmetic differs per dialect, so end times are computed here
+    rows = conn.exec_driver_sql(
+        'SELECT appointments.id, appointments.scheduled_at, services.duration FROM appointments '
+        'JOIN services ON services.id = appointments.service_id WHERE appointments.ends_at IS NULL'
+    ).all()
+    if rows:
+        conn.execute(
+            update(appointments).where(appointments.c.id == bindparam('row_id')).values(ends_at=bindparam('row_ends_at')),
+            [{'row_id': id, 'row_ends_at': _as_datetime(start) + timedelta(minutes=duration)} for id, start, duration in rows]
+        )
+    set_not_null(conn, 'appointments', 'freelancer_id')
+    set_not_null(conn, 'appointments', 'ends_at')
+    create_index(conn, 'ix_appointments_freelancer_window', 'appointments', 'freelancer_id', 'scheduled_at', 'ends_at')
+
+def downgrade(conn):
+    drop_index(conn, 'ix_appointments_freelancer_window', 'appointments')
+    drop_column(conn, 'appointments', 'ends_at')
+    drop_column(conn, 'appointments', 'freelancer_id')
+
+def _as_datetime(value):
+    # Raw SQLite DATETIME values come back as strings
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
@@ -0,0 +1,25 @@
+"""Link appointments to the Stripe checkout that paid for them and log webhook events."""
+from sqlalchemy import Column, DateTime, MetaData, String, Table
+from app.utils.migrations import add_column, create_index, drop_column, drop_index
+
+metadata = MetaData()
+
+stripe_events = Table(
+    'stripe_events', metadata,
+    Column('id', String(255), primary_key=True),
+    Column('type', String(100), nullable=False),
+    Column('session_id', String(255), index=True),
+    Column('status', String(20), nullable=False),
+    Column('error', String(500)),
+    Column('received_at', DateTime, nullable=False)
+)
+
+def upgrade(conn):
+    add_column(conn, 'appointments', Column('stripe_session_id', String(255)))
+    create_index(conn, 'ix_appointments_stripe_session_id', 'appointments', 'stripe_session_id', unique=True)
+    stripe_events.create(conn, checkfirst=True)
+
+def downgrade(conn):
+    stripe_events.drop(conn, checkfirst=True)
+    drop_index(conn, 'ix_appointments_stripe_session_id', 'appointments')
+    drop_column(conn, 'appointments', 'stripe_session_id')
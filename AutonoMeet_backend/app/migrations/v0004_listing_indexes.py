@@ -0,0 +1,27 @@
+"""Composite indexes behind the keyset-paginated listings and per-service lookups.
+
+Each one matches a listing's filter plus its (scheduled_at, id) or id
+ordering, so a page is an index range scan rather than a sequential scan
+and sort. Built without a transaction so Postgres can use CONCURRENTLY
+and not block writes while they build.
+"""
+from app.utils.migrations import create_index, drop_index
+
+transactional = False
+
+INDEXES = (
+    ('ix_appointments_scheduled_at_id', 'appointments', ('scheduled_at', 'id')),
+    ('ix_appointments_client_schedule', 'appointments', ('client_id', 'scheduled_at', 'id')),
+    ('ix_appointments_freelancer_schedule', 'appointments', ('freelancer_id', 'scheduled_at', 'id')),
+    ('ix_appointments_service_schedule', 'appointments', ('service_id', 'scheduled_at')),
+    ('ix_services_user_id_id', 'services', ('user_id', 'id')),
+    ('ix_services_category_id_id', 'services', ('category_id', 'id')),
+)
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, *columns)
+
+def downgrade(conn):
+    for name, table, _ in reversed(INDEXES):
+        drop_index(conn, name, table)
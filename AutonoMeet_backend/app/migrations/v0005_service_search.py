@@ -0,0 +1,26 @@
+"""Full-text search document for services (see app/utils/search_index.py).
+
+Postgres only: a weighted tsvector column, backfilled for existing
+services, behind a GIN index. Other databases search through the
+in-process index, so there this migration does nothing. Built without a
+transaction so the index can be created CONCURRENTLY.
+"""
+from sqlalchemy import Column, update
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from app.utils.migrations import add_column, create_index, drop_column, drop_index
+from app.utils.search_index import search_vector, services
+
+transactional = False
+
+def upgrade(conn):
+    if conn.dialect.name != 'postgresql':
+        return
+    add_column(conn, 'services', Column('search_vector', TSVECTOR))
+    conn.execute(update(services).where(services.c.search_vector.is_(None)).values(search_vector=search_vector()))
+    create_index(conn, 'ix_services_search_vector', 'services', 'search_vector', using='gin')
+
+def downgrade(conn):
+    if conn.dialect.name != 'postgresql':
+        return
+    drop_index(conn, 'ix_services_search_vector', 'services')
+    drop_column(conn, 'services', 'search_vector')
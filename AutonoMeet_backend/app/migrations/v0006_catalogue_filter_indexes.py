@@ -0,0 +1,25 @@
+"""Composite indexes behind the catalogue listing's filters and sort keys.
+
+Sorting by price or duration seeks on (price, id) or (duration, id), which
+also serve min/max price ranges. Category browsing sorted by price, or with a
+price range, is one range scan on (category_id, price, id). Per-freelancer
+and per-category listings in id order keep the v0004 indexes. Built without
+a transaction so Postgres can use CONCURRENTLY.
+"""
+from app.utils.migrations import create_index, drop_index
+
+transactional = False
+
+INDEXES = (
+    ('ix_services_price_id', 'services', ('price', 'id')),
+    ('ix_services_duration_id', 'services', ('duration', 'id')),
+    ('ix_services_category_price_id', 'services', ('category_id', 'price', 'id')),
+)
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, *columns)
+
+def downgrade(conn):
+    for name, table, _ in reversed(INDEXES):
+        drop_index(conn, name, table)
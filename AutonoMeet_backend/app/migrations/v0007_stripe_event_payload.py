@@ -0,0 +1,9 @@
+"""Keep each webhook's checkout session so an abandoned booking job can be re-run."""
+from sqlalchemy import Column, Text
+from app.utils.migrations import add_column, drop_column
+
+def upgrade(conn):
+    add_column(conn, 'stripe_events', Column('payload', Text))
+
+def downgrade(conn):
+    drop_column(conn, 'stripe_events', 'payload')
@@ -0,0 +1,9 @@
+"""Record when a booking job claimed a webhook event, so only one job books it."""
+from sqlalchemy import Column, DateTime
+from app.utils.migrations import add_column, drop_column
+
+def upgrade(conn):
+    add_column(conn, 'stripe_events', Column('claimed_at', DateTime))
+
+def downgrade(conn):
+    drop_column(conn, 'stripe_events', 'claimed_at')
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from app import db
 from datetime import datetime
@@ -11,16 +11,22 @@ class Appointment(db.Model):
     service_id = Column(Integer, ForeignKey('services.id'), nullable=False)
     scheduled_at = Column(DateTime, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Materialized from the booked service so conflict checks never join services
+    freelancer_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    ends_at = Column(DateTime, nullable=False)
+    # Checkout session that paid for the booking, if it came through Stripe
+    stripe_session_id = Column(String(255))
     service = relationship('Service')
 
+    __table_args__ = (
+        Index('ix_appointments_freelancer_window', 'freelancer_id', 'scheduled_at', 'ends_at'),
+        Index('ix_appointments_scheduled_at_id', 'scheduled_at', 'id'),
+        Index('ix_appointments_client_schedule', 'client_id', 'scheduled_at', 'id'),
+        Index('ix_appointments_freelancer_schedule', 'freelancer_id', 'scheduled_at', 'id'),
+        Index('ix_appointments_service_schedule', 'service_id', 'scheduled_at'),
+        Index('ix_appointments_stripe_session_id', 'stripe_session_id', unique=True),
+    )
+
     def to_dict(self):
-        return {
-            'id': self.id,
-            'client_id': self.client_id,
-            'service_id': self.service_id,
-            'scheduled_at': self.scheduled_at.isoformat(),
-            'created_at': self.created_at.isoformat(),
-            'service': {
-                'duration': self.service.duration
-            }
-        }
\ No newline at end of file
+        from app.serializers.appointment import AppointmentDTO
+        return AppointmentDTO.from_orm(self, with_service=True).to_detail_dict()
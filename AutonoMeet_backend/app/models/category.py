@@ -13,8 +13,6 @@ class Category(db.Model):
         return f"<Category(id={self.id}, name={self.name})>"
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name
-            # Nota: la relación 'services' se excluye para evitar referencias circulares
-        }
\ No newline at end of file
+        # la relación 'services' se excluye para evitar referencias circulares
+        from app.serializers.category import CategoryDTO
+        return CategoryDTO.from_orm(self).to_dict()
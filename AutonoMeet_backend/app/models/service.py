@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.models.category import Category
 from app import db
@@ -17,23 +17,17 @@ class Service(db.Model):
     category = relationship('Category', backref='services')
     user = relationship('User', backref='services')
 
+    __table_args__ = (
+        Index('ix_services_user_id_id', 'user_id', 'id'),
+        Index('ix_services_category_id_id', 'category_id', 'id'),
+        Index('ix_services_price_id', 'price', 'id'),
+        Index('ix_services_duration_id', 'duration', 'id'),
+        Index('ix_services_category_price_id', 'category_id', 'price', 'id'),
+    )
+
     def __repr__(self):
         return f"<Service(id={self.id}, title={self.title})>"
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'user': {
-                'id': self.user.id,
-                'email': self.user.email
-            } if self.user else None,
-            'category_id': self.category_id,
-            'category': {
-                'name': self.category.name
-            } if self.category else None,
-            'title': self.title,
-            'price': self.price,
-            'duration': self.duration,
-            'description': self.description
-        }
\ No newline at end of file
+        from app.serializers.service import ServiceDTO
+        return ServiceDTO.from_orm(self).to_dict()
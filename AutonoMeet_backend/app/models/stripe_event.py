@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime, Text
+from app import db
+from datetime import datetime
+
+class StripeEvent(db.Model):
+    __tablename__ = 'stripe_events'
+
+    # Stripe's event id; the primary key makes redelivered events no-ops
+    id = Column(String(255), primary_key=True)
+    type = Column(String(100), nullable=False)
+    session_id = Column(String(255), index=True)
+    # received -> processing (claimed by a booking job) -> booked or failed
+    status = Column(String(20), default='received', nullable=False)
+    error = Column(String(500))
+    # The checkout session as delivered, so an abandoned job can be re-run
+    payload = Column(Text)
+    received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    claimed_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<StripeEvent(id={self.id}, type={self.type}, status={self.status})>"
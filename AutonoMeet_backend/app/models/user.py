@@ -12,7 +12,7 @@ class User(db.Model):
     is_freelancer = Column(Boolean, default=False)
     created_at = Column(TIMESTAMP, default=func.now())
 
-    appointments = db.relationship('Appointment', backref='client')
+    appointments = db.relationship('Appointment', backref='client', foreign_keys='Appointment.client_id')
     reviews = db.relationship('Review', backref='author')
 
     def __repr__(self):
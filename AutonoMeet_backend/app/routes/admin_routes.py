@@ -0,0 +1,15 @@
+from flask_restx import Namespace, Resource
+from ..utils.jwt_utils import jwt_required
+from ..utils.db_pool import pool_stats
+
+api = Namespace('admin', description='Operational diagnostics')
+
+@api.route('/db-pool')
+class DatabasePool(Resource):
+    @api.doc('get_db_pool_stats')
+    @jwt_required
+    def get(self, current_user):
+        """Connection pool usage: checked-out/idle connections, overflow, checkout waits and checkouts per request"""
+        if not current_user.is_admin:
+            return {'message': 'Only admins can view pool statistics'}, 403
+        return pool_stats(), 200
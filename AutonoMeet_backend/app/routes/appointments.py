@@ -1,9 +1,18 @@
+import asyncio
 from flask_restx import Namespace, Resource, fields
 from flask import request, current_app
 from app.services.appointment_service import AppointmentService
 from ..utils.jwt_utils import jwt_required
+from ..utils.pagination import PAGE_PARAMS, page_args, page_response
+from ..utils.streaming import STREAM_FORMATS, STREAM_PARAMS, ndjson_response
 from app.services.serv_service import ServiceService
-import stripe
+from app.services.payment_service import PaymentService
+from app.serializers.appointment import AppointmentDTO
+from app.utils.stripe_client import stripe_client
+from app.utils.metrics import outbound_call
+from app.utils.async_views import async_views, run_db
+
+SUCCESS_POLL_INTERVAL = 0.25
 
 api = Namespace('appointments', description='Appointment Operations')
 
@@ -40,26 +49,27 @@ class AppointmentList(Resource):
             return {"message": error}, status_code
         return {
             "message": "Appointment created successfully",
-            "appointment": {
-                "id": appointment.id,
-                "client_id": appointment.client_id,
-                "service_id": appointment.service_id,
-                "scheduled_at": appointment.scheduled_at.isoformat(),
-                "created_at": appointment.created_at.isoformat()
-            }
+            "appointment": AppointmentDTO.from_orm(appointment).to_dict()
         }, 201
 
-    @jwt_required
-    def get(self):
+    @api.doc(params={**PAGE_PARAMS, **STREAM_PARAMS})
+    @jwt_required(claims_only=True)
+    def get(self, current_user):
         """Get all appointments"""
-        appointments = AppointmentService.get_all_appointments()
-        return [{
-            "id": appointment.id,
-            "client_id": appointment.client_id,
-            "service_id": appointment.service_id,
-            "scheduled_at": appointment.scheduled_at.isoformat(),
-            "created_at": appointment.created_at.isoformat()
-        } for appointment in appointments], 200
+        stream = request.args.get('stream')
+        if stream:
+            if stream not in STREAM_FORMATS:
+                return {"message": f"Unsupported stream format: {stream}"}, 400
+            return ndjson_response(AppointmentService.iter_all_appointments(), AppointmentDTO.to_dict)
+
+        try:
+            limit, after = page_args(request.args)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        page, error, status_code = AppointmentService.get_all_appointments(limit, after)
+        if error:
+            return {"message": error}, status_code
+        return page_response([appointment.to_dict() for appointment in page.items], page)
 
 @api.route('/<int:id>')
 class Appointment(Resource):
@@ -69,13 +79,7 @@ class Appointment(Resource):
         appointment, error, status_code = AppointmentService.get_appointment_by_id(id)
         if error:
             return {"message": error}, status_code
-        return {
-            "id": appointment.id,
-            "client_id": appointment.client_id,
-            "service_id": appointment.service_id,
-            "scheduled_at": appointment.scheduled_at.isoformat(),
-            "created_at": appointment.created_at.isoformat()
-        }, 200
+        return AppointmentDTO.from_orm(appointment).to_dict(), 200
 
     @jwt_required
     @api.expect(appointment_update_model)
@@ -87,13 +91,7 @@ class Appointment(Resource):
             return {"message": error}, status_code
         return {
             "message": "Appointment updated successfully",
-            "appointment": {
-                "id": appointment.id,
-                "client_id": appointment.client_id,
-                "service_id": appointment.service_id,
-                "scheduled_at": appointment.scheduled_at.isoformat(),
-                "created_at": appointment.created_at.isoformat()
-            }
+            "appointment": AppointmentDTO.from_orm(appointment).to_dict()
         }, 200
 
     @jwt_required
@@ -113,115 +111,155 @@ class Appointment(Resource):
 
 @api.route('/freelancer/<int:freelancer_id>')
 class FreelancerAppointments(Resource):
-    @api.doc('get_freelancer_appointments')
-    @jwt_required
+    @api.doc('get_freelancer_appointments', params=PAGE_PARAMS)
+    @jwt_required(claims_only=True)
     def get(self, freelancer_id, current_user):
         """Get all appointments for a freelancer"""
-        appointments, error, status_code = AppointmentService.get_appointments_by_freelancer(freelancer_id)
+        try:
+            limit, after = page_args(request.args)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        page, error, status_code = AppointmentService.get_appointments_by_freelancer(freelancer_id, limit, after)
         if error:
             return {'message': error}, status_code
-        return [appointment.to_dict() for appointment in appointments], status_code
+        return page_response([appointment.to_detail_dict() for appointment in page.items], page, status_code)
 
 @api.route('/client/<int:client_id>')
 class ClientAppointments(Resource):
-    @api.doc('get_client_appointments')
-    @jwt_required
+    @api.doc('get_client_appointments', params=PAGE_PARAMS)
+    @jwt_required(claims_only=True)
     def get(self, client_id, current_user):
         """Get all appointments for a client"""
         if str(current_user.id) != str(client_id):
             return {"message": "You can only view your own appointments"}, 403
-        
-        appointments, error, status_code = AppointmentService.get_appointments_by_client(client_id)
+
+        try:
+            limit, after = page_args(request.args)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        page, error, status_code = AppointmentService.get_appointments_by_client(client_id, limit, after)
         if error:
             return {"message": error}, status_code
-        return [{
-            "id": appointment.id,
-            "client_id": appointment.client_id,
-            "service_id": appointment.service_id,
-            "scheduled_at": appointment.scheduled_at.isoformat(),
-            "created_at": appointment.created_at.isoformat()
-        } for appointment in appointments], 200
+        return page_response([appointment.to_dict() for appointment in page.items], page)
+
+FRONTEND_URL = 'https://practica-final-sw2-frontend.onrender.com'
 
 @api.route('/checkout')
 class AppointmentCheckout(Resource):
-    @jwt_required
+    method_decorators = [async_views]
+
+    @jwt_required(claims_only=True)
     @api.expect(checkout_model)
     def post(self, current_user):
         """Create a Stripe Checkout Session for an appointment"""
-        data = request.get_json()
-        service_id = data.get('service_id')
-        scheduled_at = data.get('scheduled_at')
+        try:
+            params, error, status_code = self.session_params(current_user)
+            if error:
+                return {"message": error}, status_code
+            with outbound_call('stripe'):
+                checkout_session = stripe_client().checkout.Session.create(**params)
+            return self.respond(checkout_session)
+        except Exception as e:
+            return {"message": str(e)}, 400
 
+    @jwt_required(claims_only=True)
+    async def async_post(self, current_user):
         try:
-            service, error, status_code = ServiceService.get_service_by_id(service_id)
+            params, error, status_code = await run_db(self.session_params, current_user)
             if error:
                 return {"message": error}, status_code
+            with outbound_call('stripe'):
+                checkout_session = await stripe_client().checkout.Session.create_async(**params)
+            return self.respond(checkout_session)
+        except Exception as e:
+            return {"message": str(e)}, 400
+
+    def session_params(self, current_user):
+        data = request.get_json()
+        service_id = data.get('service_id')
+        scheduled_at = data.get('scheduled_at')
+
+        service, error, status_code = ServiceService.get_service_by_id(service_id)
+        if error:
+            return None, error, status_code
 
-            auth_header = request.headers.get('Authorization')
-            token = auth_header.split(" ")[1] if auth_header else None
-
-            checkout_session = stripe.checkout.Session.create(
-                payment_method_types=['card'],
-                line_items=[
-                    {
-                        'price_data': {
-                            'currency': 'usd',
-                            'unit_amount': int(service.price * 100),  
-                            'product_data': {
-                                'name': service.title,
-                            },
+        auth_header = request.headers.get('Authorization')
+        token = auth_header.split(" ")[1] if auth_header else None
+        cancel_url = f'{FRONTEND_URL}/services/{service_id}?canceled=true'
+        return {
+            'payment_method_types': ['card'],
+            'line_items': [
+                {
+                    'price_data': {
+                        'currency': 'usd',
+                        'unit_amount': int(service.price * 100),
+                        'product_data': {
+                            'name': service.title,
                         },
-                        'quantity': 1,
                     },
-                ],
-                mode='payment',
-                success_url='https://practica-final-sw2-frontend.onrender.com/success?session_id={CHECKOUT_SESSION_ID}',
-                cancel_url=f'https://practica-final-sw2-frontend.onrender.com/services/{service_id}?canceled=true&token={token}' if token else f'https://practica-final-sw2-frontend.onrender.com/services/{service_id}?canceled=true',
-                metadata={
-                    'client_id': current_user.id,
-                    'service_id': service_id,
-                    'scheduled_at': scheduled_at,
+                    'quantity': 1,
                 },
-            )
-            return {
-                'sessionId': checkout_session.id,
-                'publishableKey': current_app.config['STRIPE_PUBLISHABLE_KEY']
-            }, 200
-        except Exception as e:
-            return {"message": str(e)}, 400
-        
+            ],
+            'mode': 'payment',
+            'success_url': f'{FRONTEND_URL}/success?session_id={{CHECKOUT_SESSION_ID}}',
+            'cancel_url': f'{cancel_url}&token={token}' if token else cancel_url,
+            'metadata': {
+                'client_id': current_user.id,
+                'service_id': service_id,
+                'scheduled_at': scheduled_at,
+            },
+        }, None, 200
+
+    def respond(self, checkout_session):
+        return {
+            'sessionId': checkout_session.id,
+            'publishableKey': current_app.config['STRIPE_PUBLISHABLE_KEY']
+        }, 200
+
+@api.route('/webhook')
+class StripeWebhook(Resource):
+    def post(self):
+        """Receive signed Stripe events; completed checkouts are booked in the background"""
+        job, error, status_code = PaymentService.handle_webhook(
+            request.get_data(), request.headers.get('Stripe-Signature', '')
+        )
+        if error:
+            return {"message": error}, status_code
+        return {"received": True}, status_code
+
 @api.route('/success')
 class PaymentSuccess(Resource):
+    method_decorators = [async_views]
+
     def get(self):
-        """Handle successful payment and create appointment"""
+        """Return the appointment booked for a paid checkout session"""
         session_id = request.args.get('session_id')
-        try:
-            session = stripe.checkout.Session.retrieve(session_id)
-            if session.payment_status == 'paid':
-                if not all(key in session.metadata for key in ['client_id', 'service_id', 'scheduled_at']):
-                    return {"message": "Missing appointment data in Stripe session"}, 400
-                
-                appointment_data = {
-                    'client_id': int(session.metadata['client_id']),
-                    'service_id': int(session.metadata['service_id']),
-                    'scheduled_at': session.metadata['scheduled_at'],
-                }
-                
-                appointment, error, status_code = AppointmentService.create_appointment(appointment_data)
-                if error:
-                    return {"message": error}, status_code
-                
-                return {
-                    "message": "Appointment booked successfully",
-                    "appointment": {
-                        "id": appointment.id,
-                        "client_id": appointment.client_id,
-                        "service_id": appointment.service_id,
-                        "scheduled_at": appointment.scheduled_at.isoformat(),
-                        "created_at": appointment.created_at.isoformat()
-                    }
-                }, 200
-            else:
-                return {"message": "Payment not completed"}, 400
-        except Exception as e:
-            return {"message": str(e)}, 400
\ No newline at end of file
+        if not session_id:
+            return {"message": "Missing session_id"}, 400
+        return self.booking(session_id)
+
+    async def async_get(self):
+        # Wait here for the webhook for up to PAYMENT_SUCCESS_WAIT seconds
+        # instead of having the client poll
+        session_id = request.args.get('session_id')
+        if not session_id:
+            return {"message": "Missing session_id"}, 400
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + current_app.config['PAYMENT_SUCCESS_WAIT']
+        while True:
+            body, status_code = await run_db(self.booking, session_id)
+            if status_code != 202 or loop.time() >= deadline:
+                return body, status_code
+            await asyncio.sleep(min(SUCCESS_POLL_INTERVAL, max(0, deadline - loop.time())))
+
+    def booking(self, session_id):
+        appointment, error, status_code = PaymentService.get_booking(session_id)
+        if error:
+            return {"message": error}, status_code
+        if not appointment:
+            return {"message": "Payment received, your booking is being confirmed"}, status_code
+
+        return {
+            "message": "Appointment booked successfully",
+            "appointment": AppointmentDTO.from_orm(appointment).to_dict()
+        }, 200
@@ -1,6 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from flask import request
 from ..utils.jwt_utils import generate_access_token
+from ..utils.async_views import async_views
 from app.services.auth_service import AuthService
 from flask import current_app as app
 
@@ -71,57 +72,52 @@ class Login(Resource):
             "access_token": access_token
         }, 200
     
+def sign_in_response(user, message):
+    return {
+        "message": message,
+        "user_id": user.id,
+        "is_freelancer": user.is_freelancer,
+        "email": user.email,
+        "access_token": generate_access_token(user)
+    }, 200
+
 @api.route('/google')
 class GoogleAuth(Resource):
+    method_decorators = [async_views]
+
     @api.expect(google_auth_model)
     def post(self):
-        app.logger.debug("Starting Google authentication")
         data = request.get_json()
-        app.logger.debug(f"Received data: {data}")
-        token = data.get('token')
-        is_freelancer = data.get('is_freelancer', False)
-        app.logger.debug(f"Extracted token: {token}, is_freelancer: {is_freelancer}")
+        user, error, status_code = AuthService.google_auth(data.get('token'), data.get('is_freelancer', False))
+        return self.respond(user, error, status_code)
 
-        app.logger.debug("Calling AuthService.google_auth")
-        user, error, status_code = AuthService.google_auth(token, is_freelancer)
-        app.logger.debug(f"AuthService response - user: {user}, error: {error}, status_code: {status_code}")
+    async def async_post(self):
+        data = request.get_json()
+        user, error, status_code = await AuthService.google_auth_async(data.get('token'), data.get('is_freelancer', False))
+        return self.respond(user, error, status_code)
 
+    def respond(self, user, error, status_code):
         if error:
-            app.logger.error(f"Authentication failed with error: {error}")
+            app.logger.warning("Google authentication failed (%s): %s", status_code, error)
             return {"message": error}, status_code
-
-        app.logger.debug("Generating access token")
-        access_token = generate_access_token(user)
-        app.logger.debug(f"Generated access token: {access_token}")
-
-        response = {
-            "message": "Google authentication successful",
-            "user_id": user.id,
-            "is_freelancer": user.is_freelancer,
-            "email": user.email,
-            "access_token": access_token
-        }
-        app.logger.debug(f"Returning response: {response}")
-        return response, 200
+        app.logger.debug("Google authentication succeeded for user %s", user.id)
+        return sign_in_response(user, "Google authentication successful")
 
 @api.route('/github')
 class GitHubAuth(Resource):
+    method_decorators = [async_views]
+
     @api.expect(github_auth_model)
     def post(self):
         data = request.get_json()
-        code = data.get('code')
-        is_freelancer = data.get('is_freelancer', False)
-
-        user, error, status_code = AuthService.github_auth(code, is_freelancer)
+        user, error, status_code = AuthService.github_auth(data.get('code'), data.get('is_freelancer', False))
         if error:
             return {"message": error}, status_code
+        return sign_in_response(user, "GitHub authentication successful")
 
-        access_token = generate_access_token(user)
-
-        return {
-            "message": "GitHub authentication successful",
-            "user_id": user.id,
-            "is_freelancer": user.is_freelancer,
-            "email": user.email,
-            "access_token": access_token
-        }, 200
\ No newline at end of file
+    async def async_post(self):
+        data = request.get_json()
+        user, error, status_code = await AuthService.github_auth_async(data.get('code'), data.get('is_freelancer', False))
+        if error:
+            return {"message": error}, status_code
+        return sign_in_response(user, "GitHub authentication successful")
@@ -1,7 +1,13 @@
+import math
 from flask_restx import Namespace, Resource, fields
 from flask import request
-from ..services.serv_service import ServiceService, CategoryService
+from ..services.serv_service import SERVICE_SORTS, ServiceService, CategoryService
+from ..services.appointment_service import AppointmentService
 from ..utils.jwt_utils import jwt_required
+from ..utils.pagination import PAGE_PARAMS, page_args, page_response
+from ..utils.conditional import conditional
+from ..utils.streaming import STREAM_FORMATS, STREAM_PARAMS, ndjson_response
+from ..serializers.service import ServiceDTO
 
 api = Namespace('services', description='Service operations')
 
@@ -26,15 +32,68 @@ category_model = api.model('Category', {
     'name': fields.String(required=True, description='Category name')
 })
 
+LISTING_FILTERS = {
+    'min_price': (float, 'Lowest price'),
+    'max_price': (float, 'Highest price'),
+    'max_duration': (int, 'Longest duration in minutes'),
+    'category_id': (int, 'Only services in this category'),
+    'user_id': (int, 'Only services of this freelancer')
+}
+
+LISTING_PARAMS = {
+    **{name: description for name, (_, description) in LISTING_FILTERS.items()},
+    'sort': f"One of {', '.join(SERVICE_SORTS)} (default id); a leading '-' sorts descending"
+}
+
+def listing_args(args):
+    """Read the listing's filters and 'sort' from a query string.
+
+    Raises ValueError with a client-facing message when they are malformed.
+    """
+    filters = {}
+    for name, (convert, _) in LISTING_FILTERS.items():
+        value = args.get(name)
+        if value is None:
+            continue
+        try:
+            filters[name] = convert(value)
+        except ValueError:
+            raise ValueError(f"{name} must be {'a number' if convert is float else 'an integer'}")
+        if not math.isfinite(filters[name]):
+            raise ValueError(f"{name} must be a number")
+    sort = args.get('sort', 'id')
+    if sort not in SERVICE_SORTS:
+        raise ValueError(f"sort must be one of {', '.join(SERVICE_SORTS)}")
+    return filters, sort
+
 @api.route('/')
 class ServiceList(Resource):
-    @api.doc('list_services')
+    @api.doc('list_services', params={**PAGE_PARAMS, **LISTING_PARAMS, **STREAM_PARAMS})
+    @conditional('services', 'categories', 'users')
     def get(self):
-        """List all services"""
-        services, error, status_code = ServiceService.get_all_services()
+        """List services, optionally filtered and sorted
+
+        Filters combine with AND. The next cursor of a page only continues
+        the same filters and sort.
+        """
+        try:
+            filters, sort = listing_args(request.args)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        stream = request.args.get('stream')
+        if stream:
+            if stream not in STREAM_FORMATS:
+                return {'message': f"Unsupported stream format: {stream}"}, 400
+            return ndjson_response(ServiceService.iter_all_services(sort, **filters), ServiceDTO.to_dict)
+
+        try:
+            limit, after = page_args(request.args)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        page, error, status_code = ServiceService.get_all_services(limit, after, sort, **filters)
         if error:
             return {'message': error}, status_code
-        return [service.to_dict() for service in services], status_code
+        return page_response([service.to_dict() for service in page.items], page, status_code)
 
     @api.doc('create_service')
     @api.expect(service_model)
@@ -51,9 +110,27 @@ class ServiceList(Resource):
             return {'message': error}, status_code
         return service, status_code
 
+@api.route('/search')
+class ServiceSearch(Resource):
+    @api.doc('search_services', params={
+        'q': 'Words to find in the title, category or description; the last one also matches as a prefix',
+        'limit': 'Maximum results (default 100)'
+    })
+    def get(self):
+        """Search services, best match first"""
+        try:
+            limit, _ = page_args(request.args)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        services, error, status_code = ServiceService.search_services(request.args.get('q'), limit)
+        if error:
+            return {'message': error}, status_code
+        return [service.to_dict() for service in services], status_code
+
 @api.route('/<int:service_id>')
 class ServiceResource(Resource):
     @api.doc('get_service')
+    @conditional('categories', 'users', item=('services', 'service_id'))
     def get(self, service_id):
         """Get a specific service"""
         service, error, status_code = ServiceService.get_service_by_id(service_id)
@@ -91,29 +168,63 @@ class ServiceResource(Resource):
             return {'message': error}, status_code
         return result, status_code
 
+@api.route('/<int:service_id>/availability')
+class ServiceAvailability(Resource):
+    @api.doc('get_service_availability', params={
+        'from': 'Window start (YYYY-MM-DDTHH:mm:ss)',
+        'to': 'Window end (YYYY-MM-DDTHH:mm:ss)',
+        'step': 'Minutes between candidate slot starts (default 15)',
+        'limit': 'Maximum slots per page (default 100)'
+    })
+    def get(self, service_id):
+        """Find free slots for a service in a time window
+
+        Large windows are paginated: repeat the call with 'from' set to the
+        returned 'next' until it is null.
+        """
+        availability, error, status_code = AppointmentService.get_availability(
+            service_id,
+            request.args.get('from'),
+            request.args.get('to'),
+            step=request.args.get('step'),
+            limit=request.args.get('limit')
+        )
+        if error:
+            return {'message': error}, status_code
+        return availability, status_code
+
 @api.route('/freelancer/<int:freelancer_id>')
 class FreelancerServices(Resource):
-    @api.doc('get_freelancer_services')
+    @api.doc('get_freelancer_services', params=PAGE_PARAMS)
     def get(self, freelancer_id):
         """Get all services for a freelancer"""
-        services, error, status_code = ServiceService.get_services_by_freelancer(freelancer_id)
+        try:
+            limit, after = page_args(request.args)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        page, error, status_code = ServiceService.get_services_by_freelancer(freelancer_id, limit, after)
         if error:
             return {'message': error}, status_code
-        return [service.to_dict() for service in services], status_code
+        return page_response([service.to_dict() for service in page.items], page, status_code)
 
 @api.route('/category/<int:category_id>')
 class CategoryServices(Resource):
-    @api.doc('get_category_services')
+    @api.doc('get_category_services', params=PAGE_PARAMS)
     def get(self, category_id):
         """Get all services in a category"""
-        services, error, status_code = ServiceService.get_services_by_category(category_id)
+        try:
+            limit, after = page_args(request.args)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        page, error, status_code = ServiceService.get_services_by_category(category_id, limit, after)
         if error:
             return {'message': error}, status_code
-        return [service.to_dict() for service in services], status_code
+        return page_response([service.to_dict() for service in page.items], page, status_code)
 
 @api.route('/categories')
 class CategoryList(Resource):
     @api.doc('list_categories')
+    @conditional('categories')
     def get(self):
         """List all categories"""
         categories, error, status_code = CategoryService.get_all_categories()
@@ -137,6 +248,7 @@ class CategoryList(Resource):
 @api.route('/categories/<int:category_id>')
 class CategoryResource(Resource):
     @api.doc('get_category')
+    @conditional(item=('categories', 'category_id'))
     def get(self, category_id):
         """Get a specific category"""
         category, error, status_code = CategoryService.get_category_by_id(category_id)
@@ -0,0 +1,73 @@
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, raiseload
+from app.models.appointment import Appointment
+from app.models.service import Service
+
+# Eager-load plans: every relationship a serializer reads is loaded in the
+# same SELECT, and any other access raises instead of issuing a lazy query.
+# Built on call because loader options configure the mappers.
+def summary_load():
+    return (raiseload('*'),)
+
+def detail_load():
+    return (joinedload(Appointment.service).load_only(Service.duration), raiseload('*'))
+
+def appointment_projection(with_service=False):
+    """Core select of exactly the columns AppointmentDTO.from_row reads."""
+    appointments = Appointment.__table__
+    columns = [
+        appointments.c.id,
+        appointments.c.client_id,
+        appointments.c.service_id,
+        appointments.c.scheduled_at,
+        appointments.c.created_at
+    ]
+    if not with_service:
+        return select(*columns)
+    services = Service.__table__
+    return select(*columns, services.c.duration).select_from(
+        appointments.join(services, services.c.id == appointments.c.service_id)
+    )
+
+class AppointmentDTO:
+    __slots__ = ('id', 'client_id', 'service_id', 'scheduled_at', 'created_at', 'duration')
+
+    def __init__(self, id, client_id, service_id, scheduled_at, created_at, duration=None):
+        self.id = id
+        self.client_id = client_id
+        self.service_id = service_id
+        self.scheduled_at = scheduled_at
+        self.created_at = created_at
+        self.duration = duration
+
+    @classmethod
+    def from_orm(cls, appointment, with_service=False):
+        """Copy an Appointment; ``with_service`` needs detail_load() (or a loaded service)."""
+        return cls(
+            appointment.id,
+            appointment.client_id,
+            appointment.service_id,
+            appointment.scheduled_at,
+            appointment.created_at,
+            appointment.service.duration if with_service else None
+        )
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from an appointment_projection() row (duration only ``with_service``)."""
+        return cls(row.id, row.client_id, row.service_id, row.scheduled_at, row.created_at,
+                   getattr(row, 'duration', None))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'client_id': self.client_id,
+            'service_id': self.service_id,
+            'scheduled_at': self.scheduled_at.isoformat(),
+            'created_at': self.created_at.isoformat()
+        }
+
+    def to_detail_dict(self):
+        data = self.to_dict()
+        data['service'] = {'duration': self.duration}
+        return data
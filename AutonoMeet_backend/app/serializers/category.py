@@ -0,0 +1,16 @@
+class CategoryDTO:
+    __slots__ = ('id', 'name')
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+    @classmethod
+    def from_orm(cls, category):
+        return cls(category.id, category.name)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name
+        }
@@ -0,0 +1,102 @@
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, raiseload
+from app.models.service import Service
+from app.models.user import User
+from app.models.category import Category
+
+# Eager-load plan for anything serialized with ServiceDTO: owner and category
+# come in the same SELECT, any other relationship access raises.
+def service_load():
+    return (
+        joinedload(Service.user).load_only(User.email),
+        joinedload(Service.category).load_only(Category.name),
+        raiseload('*')
+    )
+
+def service_projection():
+    """Core select of exactly the columns ServiceDTO.from_row reads."""
+    services, users, categories = Service.__table__, User.__table__, Category.__table__
+    return select(
+        services.c.id,
+        services.c.user_id,
+        users.c.id.label('owner_id'),
+        users.c.email.label('owner_email'),
+        services.c.category_id,
+        categories.c.name.label('category_name'),
+        services.c.title,
+        services.c.price,
+        services.c.duration,
+        services.c.description
+    ).select_from(
+        services
+        .outerjoin(users, users.c.id == services.c.user_id)
+        .outerjoin(categories, categories.c.id == services.c.category_id)
+    )
+
+class ServiceDTO:
+    """Read-only copy of a Service and the owner/category fields it is shown with.
+
+    Safe to cache across requests: it holds plain values, not ORM state.
+    """
+    __slots__ = ('id', 'user_id', 'user', 'category_id', 'category_name', 'title', 'price', 'duration', 'description')
+
+    def __init__(self, id, user_id, user, category_id, category_name, title, price, duration, description):
+        self.id = id
+        self.user_id = user_id
+        self.user = user  # (id, email) of the owner, or None
+        self.category_id = category_id
+        self.category_name = category_name
+        self.title = title
+        self.price = price
+        self.duration = duration
+        self.description = description
+
+    @classmethod
+    def from_orm(cls, service):
+        user = service.user
+        category = service.category
+        return cls(
+            service.id,
+            service.user_id,
+            (user.id, user.email) if user else None,
+            service.category_id,
+            category.name if category else None,
+            service.title,
+            service.price,
+            service.duration,
+            service.description
+        )
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from a service_projection() row."""
+        return cls(
+            row.id,
+            row.user_id,
+            (row.owner_id, row.owner_email) if row.owner_id is not None else None,
+            row.category_id,
+            row.category_name,
+            row.title,
+            row.price,
+            row.duration,
+            row.description
+        )
+
+    def to_dict(self):
+        user = self.user
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'user': {
+                'id': user[0],
+                'email': user[1]
+            } if user else None,
+            'category_id': self.category_id,
+            'category': {
+                'name': self.category_name
+            } if self.category_name is not None else None,
+            'title': self.title,
+            'price': self.price,
+            'duration': self.duration,
+            'description': self.description
+        }
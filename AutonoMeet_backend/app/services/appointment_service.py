@@ -3,7 +3,20 @@ from app.models.user import User
 from app.models.service import Service
 from app import db
 from datetime import datetime, timedelta
-from sqlalchemy.orm import joinedload
+from flask import current_app
+from itertools import islice
+from app.utils.pagination import Page, paginate_rows
+from app.serializers.appointment import AppointmentDTO, appointment_projection
+from app.utils.booking_lock import BookingBusyError, freelancer_lock
+
+AVAILABILITY_DEFAULT_STEP = 15
+AVAILABILITY_DEFAULT_LIMIT = 100
+AVAILABILITY_MAX_LIMIT = 1000
+APPOINTMENT_ORDER = (Appointment.scheduled_at, Appointment.id)
+STREAM_BATCH_SIZE = 1000
+
+def _lookback(start):
+    return start - timedelta(minutes=current_app.config['APPOINTMENT_MAX_DURATION'])
 
 class AppointmentService:
     @staticmethod
@@ -21,50 +34,153 @@ class AppointmentService:
             except ValueError:
                 return None, "Invalid datetime format for scheduled_at, expected YYYY-MM-DDTHH:mm:ss", 400
 
-            existing_appointment = Appointment.query.filter_by(
-                client_id=client_id,
-                service_id=service_id,
-                scheduled_at=scheduled_at
-            ).first()
-
-            if existing_appointment:
-                return existing_appointment, "Appointment already exists", 200
-
             service = Service.query.get(service_id)
             if not service:
                 return None, "Service not found", 404
 
-            new_duration = service.duration  
-            new_end = scheduled_at + timedelta(minutes=new_duration)
-
-            freelancer_appointments = Appointment.query.join(Appointment.service).filter(
-                Service.user_id == service.user_id,
-                Appointment.scheduled_at >= scheduled_at - timedelta(days=1),  
-                Appointment.scheduled_at <= scheduled_at + timedelta(days=1)
-            ).options(joinedload(Appointment.service)).all()
-
-            for appt in freelancer_appointments:
-                appt_start = appt.scheduled_at
-                appt_duration = appt.service.duration
-                appt_end = appt_start + timedelta(minutes=appt_duration)
-
-                if scheduled_at < appt_end and new_end > appt_start:
-                    return None, f"Time slot unavailable: conflicts with another appointment at {appt_start.isoformat()}", 409
-
-            new_appointment = Appointment(
-                client_id=client_id,
-                service_id=service_id,
-                scheduled_at=scheduled_at
-            )
-            db.session.add(new_appointment)
-            db.session.commit()
+            new_end = scheduled_at + timedelta(minutes=service.duration)
+
+            # Check and insert under the freelancer's lock so concurrent
+            # bookings of the same freelancer cannot both pass the check
+            with freelancer_lock(service.user_id):
+                existing_appointment = Appointment.query.filter_by(
+                    client_id=client_id,
+                    service_id=service_id,
+                    scheduled_at=scheduled_at
+                ).first()
+
+                if existing_appointment:
+                    return existing_appointment, "Appointment already exists", 200
+
+                conflict = AppointmentService.find_conflict(service.user_id, scheduled_at, new_end)
+                if conflict:
+                    return None, f"Time slot unavailable: conflicts with another appointment at {conflict.scheduled_at.isoformat()}", 409
+
+                new_appointment = Appointment(
+                    client_id=client_id,
+                    service_id=service_id,
+                    scheduled_at=scheduled_at,
+                    freelancer_id=service.user_id,
+                    ends_at=new_end,
+                    stripe_session_id=data.get('stripe_session_id')
+                )
+                db.session.add(new_appointment)
 
             return new_appointment, None, 201
 
+        except BookingBusyError:
+            return None, "Too many bookings in progress for this freelancer, please try again", 503
         except Exception as e:
             db.session.rollback()
             return None, f"Error creating appointment: {str(e)}", 500
-        
+
+    @staticmethod
+    def find_conflict(freelancer_id, start, end, exclude_id=None):
+        """Return the freelancer's earliest appointment overlapping [start, end), if any.
+
+        No booking runs longer than APPOINTMENT_MAX_DURATION, so only those
+        starting that far before ``start`` can still be running: the check is
+        a bounded range scan on ix_appointments_freelancer_window, whatever
+        the length of the freelancer's history. It does not assume existing
+        bookings never overlap one another.
+        """
+        query = Appointment.query.filter(
+            Appointment.freelancer_id == freelancer_id,
+            Appointment.scheduled_at >= _lookback(start),
+            Appointment.scheduled_at < end,
+            Appointment.ends_at > start
+        )
+        if exclude_id is not None:
+            query = query.filter(Appointment.id != exclude_id)
+        return query.order_by(Appointment.scheduled_at).first()
+
+    @staticmethod
+    def iter_busy_intervals(freelancer_id, start, end):
+        """Yield the freelancer's merged busy (start, end) pairs overlapping [start, end).
+
+        One range scan on ix_appointments_freelancer_window, from
+        APPOINTMENT_MAX_DURATION before ``start`` (the earliest a booking
+        still running can have begun), streamed in start order and merged
+        with a sweep so overlapping or touching bookings come out as one
+        interval.
+        """
+        rows = db.session.query(Appointment.scheduled_at, Appointment.ends_at).filter(
+            Appointment.freelancer_id == freelancer_id,
+            Appointment.scheduled_at >= _lookback(start),
+            Appointment.scheduled_at < end
+        ).order_by(Appointment.scheduled_at).yield_per(500)
+
+        current_start = current_end = None
+        for busy_start, busy_end in rows:
+            if busy_end <= start:
+                continue
+            if current_end is not None and busy_start <= current_end:
+                current_end = max(current_end, busy_end)
+                continue
+            if current_end is not None:
+                yield current_start, current_end
+            current_start, current_end = busy_start, busy_end
+        if current_end is not None:
+            yield current_start, current_end
+
+    @staticmethod
+    def iter_free_slots(freelancer_id, duration, start, end, step):
+        """Yield free (start, end) slots of ``duration`` on a ``step`` grid from ``start``."""
+        length = timedelta(minutes=duration)
+        step = timedelta(minutes=step)
+        busy = AppointmentService.iter_busy_intervals(freelancer_id, start, end)
+        blocking = next(busy, None)
+        slot_start = start
+
+        while slot_start + length <= end:
+            while blocking and blocking[1] <= slot_start:
+                blocking = next(busy, None)
+            if blocking and blocking[0] < slot_start + length:
+                # Jump to the first grid point at or after the busy interval ends
+                skipped = -((slot_start - blocking[1]) // step)
+                slot_start += skipped * step
+                continue
+            yield slot_start, slot_start + length
+            slot_start += step
+
+    @staticmethod
+    def get_availability(service_id, start, end, step=None, limit=None):
+        try:
+            try:
+                start = datetime.strptime(start, '%Y-%m-%dT%H:%M:%S')
+                end = datetime.strptime(end, '%Y-%m-%dT%H:%M:%S')
+            except (TypeError, ValueError):
+                return None, "Invalid or missing from/to, expected YYYY-MM-DDTHH:mm:ss", 400
+            if end <= start:
+                return None, "'to' must be after 'from'", 400
+
+            try:
+                step = int(step) if step is not None else AVAILABILITY_DEFAULT_STEP
+                limit = int(limit) if limit is not None else AVAILABILITY_DEFAULT_LIMIT
+            except ValueError:
+                return None, "step and limit must be integers", 400
+            if step <= 0:
+                return None, "step must be a positive number of minutes", 400
+            if not 0 < limit <= AVAILABILITY_MAX_LIMIT:
+                return None, f"limit must be between 1 and {AVAILABILITY_MAX_LIMIT}", 400
+
+            service = Service.query.get(service_id)
+            if not service:
+                return None, "Service not found", 404
+
+            slots = AppointmentService.iter_free_slots(service.user_id, service.duration, start, end, step)
+            page = list(islice(slots, limit + 1))
+            next_from = page.pop()[0].isoformat() if len(page) > limit else None
+
+            return {
+                'service_id': service.id,
+                'duration': service.duration,
+                'step': step,
+                'slots': [{'start': s.isoformat(), 'end': e.isoformat()} for s, e in page],
+                'next': next_from
+            }, None, 200
+        except Exception as e:
+            return None, f"Error retrieving availability: {str(e)}", 500
 
     @staticmethod
     def update_appointment(appointment_id, data):
@@ -73,33 +189,65 @@ class AppointmentService:
             if not appointment:
                 return None, "Appointment not found", 404
 
-            if 'client_id' in data:
-                appointment.client_id = data['client_id']
-
+            service = None
             if 'service_id' in data:
-                appointment.service_id = data['service_id']
+                service = Service.query.get(data['service_id'])
+                if not service:
+                    return None, "Service not found", 404
 
+            scheduled_at = None
             if 'scheduled_at' in data:
                 try:
                     scheduled_at = datetime.strptime(data['scheduled_at'], '%Y-%m-%dT%H:%M:%S')
-                    appointment.scheduled_at = scheduled_at
                 except ValueError:
                     return None, "Invalid datetime format for scheduled_at, expected YYYY-MM-DDTHH:mm:ss", 400
 
-            db.session.commit()
+            # Nothing is written before the lock is held: an early flush would
+            # take the database's write lock while waiting for the booking lock
+            locked = {appointment.freelancer_id, service.user_id if service else appointment.freelancer_id}
+            with freelancer_lock(*locked):
+                db.session.refresh(appointment)
+                if appointment.freelancer_id not in locked:
+                    return None, "Appointment was changed concurrently, please try again", 409
+                service = service or Service.query.get(appointment.service_id)
+                scheduled_at = scheduled_at or appointment.scheduled_at
+
+                ends_at = scheduled_at + timedelta(minutes=service.duration)
+                conflict = AppointmentService.find_conflict(service.user_id, scheduled_at, ends_at, exclude_id=appointment.id)
+                if conflict:
+                    return None, f"Time slot unavailable: conflicts with another appointment at {conflict.scheduled_at.isoformat()}", 409
+
+                if 'client_id' in data:
+                    appointment.client_id = data['client_id']
+                appointment.service_id = service.id
+                appointment.freelancer_id = service.user_id
+                appointment.scheduled_at = scheduled_at
+                appointment.ends_at = ends_at
             return appointment, None, 200
 
+        except BookingBusyError:
+            db.session.rollback()
+            return None, "Too many bookings in progress for this freelancer, please try again", 503
         except Exception as e:
             db.session.rollback()
             return None, f"Error updating appointment: {str(e)}", 500
 
     @staticmethod
-    def get_all_appointments():
+    def get_all_appointments(limit, after=None):
         try:
-            return Appointment.query.all()
+            page = paginate_rows(appointment_projection(), APPOINTMENT_ORDER, limit, after)
+            return Page([AppointmentDTO.from_row(row) for row in page.items], page.next_cursor), None, 200
+        except ValueError as e:
+            return None, str(e), 400
         except Exception as e:
             return None, f"Error retrieving appointments: {str(e)}", 500
 
+    @staticmethod
+    def iter_all_appointments():
+        """Lazily iterate every appointment in key order using a server-side cursor."""
+        statement = appointment_projection().order_by(*APPOINTMENT_ORDER).execution_options(yield_per=STREAM_BATCH_SIZE)
+        return (AppointmentDTO.from_row(row) for row in db.session.execute(statement))
+
     @staticmethod
     def get_appointment_by_id(appointment_id):
         try:
@@ -126,23 +274,23 @@ class AppointmentService:
             return f"Error deleting appointment: {str(e)}", 500
 
     @staticmethod
-    def get_appointments_by_freelancer(freelancer_id):
+    def get_appointments_by_freelancer(freelancer_id, limit, after=None):
         try:
-            appointments = Appointment.query.join(Appointment.service).filter(
-                Service.user_id == freelancer_id
-            ).options(joinedload(Appointment.service)).all()
-            if not appointments:
-                return [], None, 200
-            return appointments, None, 200
+            statement = appointment_projection(with_service=True).where(Appointment.freelancer_id == freelancer_id)
+            page = paginate_rows(statement, APPOINTMENT_ORDER, limit, after)
+            return Page([AppointmentDTO.from_row(row) for row in page.items], page.next_cursor), None, 200
+        except ValueError as e:
+            return None, str(e), 400
         except Exception as e:
             return None, f"Error retrieving freelancer appointments: {str(e)}", 500
 
     @staticmethod
-    def get_appointments_by_client(client_id):
+    def get_appointments_by_client(client_id, limit, after=None):
         try:
-            appointments = Appointment.query.filter_by(client_id=client_id).options(joinedload(Appointment.service)).all()
-            if not appointments:
-                return [], None, 200
-            return appointments, None, 200
+            statement = appointment_projection().where(Appointment.client_id == client_id)
+            page = paginate_rows(statement, APPOINTMENT_ORDER, limit, after)
+            return Page([AppointmentDTO.from_row(row) for row in page.items], page.next_cursor), None, 200
+        except ValueError as e:
+            return None, str(e), 400
         except Exception as e:
-            return None, f"Error retrieving client appointments: {str(e)}", 500
\ No newline at end of file
+            return None, f"Error retrieving client appointments: {str(e)}", 500
@@ -1,10 +1,11 @@
-from werkzeug.security import generate_password_hash, check_password_hash
 from app.models.user import User
+from app.services.serv_service import ServiceService
+from app.utils.conditional import bump_version
+from app.utils.jwt_utils import Principal
 from app import db
-import requests
-from google.oauth2 import id_token
-from google.auth.transport.requests import Request 
-import os
+from app.utils.google_certs import verify_id_token
+from app.utils.http_client import http_client
+from app.utils.password_hashing import password_hasher, HashingBusyError
 from flask import current_app as app
 
 class AuthService:
@@ -14,7 +15,10 @@ class AuthService:
         if User.query.filter_by(email=normalized_email).first():
             return None, "User already exists", 409  
 
-        password_hash = generate_password_hash(password)
+        try:
+            password_hash = password_hasher().hash(password)
+        except HashingBusyError:
+            return None, "Server busy, please try again", 503
 
         new_user = User(email=normalized_email, password_hash=password_hash, is_freelancer=is_freelancer)
         db.session.add(new_user)
@@ -30,103 +34,180 @@ class AuthService:
         if not user:
             return None, "User not found", 404  
 
-        if not check_password_hash(user.password_hash, password):
-            return None, "Invalid password", 401  
+        if not user.password_hash:
+            return None, "Invalid password", 401
+
+        hasher = password_hasher()
+        try:
+            if not hasher.verify(user.password_hash, password):
+                return None, "Invalid password", 401
+            if hasher.needs_rehash(user.password_hash):
+                user.password_hash = hasher.hash(password)
+                db.session.commit()
+        except HashingBusyError:
+            return None, "Server busy, please try again", 503
 
         return user, None, 200
     
     @staticmethod
     def google_auth(token, is_freelancer):
         try:
-            idinfo = id_token.verify_oauth2_token(
-                token, 
-                Request(), 
-                os.getenv('GOOGLE_CLIENT_ID'),
+            idinfo = verify_id_token(
+                token,
+                app.config['GOOGLE_CLIENT_ID'],
+                certs_url=app.config['GOOGLE_CERTS_URL'],
                 clock_skew_in_seconds=600
             )
-            app.logger.debug(f"Google token verified: {idinfo}")
-
-            if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
-                app.logger.error("Wrong issuer in Google token")
-                return None, "Wrong issuer", 401
-
-            email = idinfo['email']
-            normalized_email = email.lower()
-            app.logger.debug(f"Processing email: {normalized_email}")
-            user = User.query.filter_by(email=normalized_email).first()
-
-            if not user:
-                app.logger.info(f"User not found, creating new user with email: {normalized_email}, is_freelancer: {is_freelancer}")
-                user = User(email=normalized_email, password_hash=None, is_freelancer=is_freelancer)
-                db.session.add(user)
-                db.session.commit()
-                app.logger.debug(f"New user created: {user}")
-            else:
-                app.logger.debug(f"Existing user found: {user}")
-
-            return user, None, 200
+            return AuthService.google_user(idinfo, is_freelancer)
+        except ValueError as e:
+            app.logger.warning("Invalid Google token: %s", str(e))
+            return None, f"Invalid Google token: {str(e)}", 401
+        except Exception as e:
+            app.logger.error("Unexpected error in google_auth: %s", str(e), exc_info=True)
+            return None, "Internal server error during Google auth", 500
 
+    @staticmethod
+    async def google_auth_async(token, is_freelancer):
+        """google_auth for async views; returns a Principal, as the user's session is closed by then."""
+        from app.utils.async_views import run_db
+        from app.utils.google_certs import verify_id_token_async
+        try:
+            idinfo = await verify_id_token_async(
+                token,
+                app.config['GOOGLE_CLIENT_ID'],
+                certs_url=app.config['GOOGLE_CERTS_URL'],
+                clock_skew_in_seconds=600
+            )
+            return await run_db(AuthService._as_principal, AuthService.google_user, idinfo, is_freelancer)
         except ValueError as e:
-            app.logger.error(f"Invalid Google token: {str(e)}")
+            app.logger.warning("Invalid Google token: %s", str(e))
             return None, f"Invalid Google token: {str(e)}", 401
         except Exception as e:
-            app.logger.error(f"Unexpected error in google_auth: {str(e)}", exc_info=True)
+            app.logger.error("Unexpected error in google_auth: %s", str(e), exc_info=True)
             return None, "Internal server error during Google auth", 500
-    
+
+    @staticmethod
+    def google_user(idinfo, is_freelancer):
+        """Find or create the user for verified Google claims."""
+        app.logger.debug("Google token verified for subject %s", idinfo.get('sub'))
+        if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
+            app.logger.error("Wrong issuer in Google token")
+            return None, "Wrong issuer", 401
+
+        normalized_email = idinfo['email'].lower()
+        user = User.query.filter_by(email=normalized_email).first()
+
+        if not user:
+            user = User(email=normalized_email, password_hash=None, is_freelancer=is_freelancer)
+            db.session.add(user)
+            db.session.commit()
+            app.logger.info("Created user %s from Google sign-in (freelancer: %s)", user.id, bool(is_freelancer))
+
+        return user, None, 200
+
     @staticmethod
     def github_auth(code, is_freelancer):
+        import requests  # deferred with the HTTP client; only OAuth sign-ins need it
         try:
-            print(f"Starting GitHub auth with code: {code}, is_freelancer: {is_freelancer}")
-            
-            response = requests.post(
-                'https://github.com/login/oauth/access_token',
+            client = http_client()
+            response = client.post(
+                app.config['GITHUB_OAUTH_URL'],
+                upstream='github',
                 headers={'Accept': 'application/json'},
-                data={
-                    'client_id': os.getenv('GITHUB_CLIENT_ID'),
-                    'client_secret': os.getenv('GITHUB_CLIENT_SECRET'),
-                    'code': code
-                }
+                data=AuthService._github_code_exchange(code)
             )
-            
-            print(f"Response status code: {response.status_code}")
-            response_data = response.json()
-            access_token = response_data.get('access_token')
+            access_token = AuthService._github_access_token(response)
             if not access_token:
-                print("No access token received")
                 return None, "Invalid GitHub code", 401
 
-            print(f"Got access token: {access_token}")
-            user_info = requests.get(
-                'https://api.github.com/user',
+            user_info = client.get(
+                f"{app.config['GITHUB_API_URL']}/user",
+                upstream='github',
                 headers={'Authorization': f'token {access_token}'}
             ).json()
+            return AuthService.github_user(user_info, is_freelancer)
+
+        except requests.RequestException as e:
+            app.logger.warning("GitHub unreachable: %s", str(e))
+            return None, "GitHub is unavailable, please try again", 502
+        except Exception as e:
+            app.logger.error("GitHub auth error: %s", str(e), exc_info=True)
+            return None, "Error during GitHub authentication", 500
+
+    @staticmethod
+    async def github_auth_async(code, is_freelancer):
+        """github_auth for async views; returns a Principal, as the user's session is closed by then."""
+        import httpx
+        from app.utils.async_http import async_http_client
+        from app.utils.async_views import run_db
+        try:
+            client = async_http_client()
+            response = await client.post(
+                app.config['GITHUB_OAUTH_URL'],
+                upstream='github',
+                headers={'Accept': 'application/json'},
+                data=AuthService._github_code_exchange(code)
+            )
+            access_token = AuthService._github_access_token(response)
+            if not access_token:
+                return None, "Invalid GitHub code", 401
+
+            user_info = (await client.get(
+                f"{app.config['GITHUB_API_URL']}/user",
+                upstream='github',
+                headers={'Authorization': f'token {access_token}'}
+            )).json()
+            return await run_db(AuthService._as_principal, AuthService.github_user, user_info, is_freelancer)
+
+        except httpx.HTTPError as e:
+            app.logger.warning("GitHub unreachable: %s", str(e))
+            return None, "GitHub is unavailable, please try again", 502
+        except Exception as e:
+            app.logger.error("GitHub auth error: %s", str(e), exc_info=True)
+            return None, "Error during GitHub authentication", 500
+
+    @staticmethod
+    def _github_code_exchange(code):
+        return {
+            'client_id': app.config['GITHUB_CLIENT_ID'],
+            'client_secret': app.config['GITHUB_CLIENT_SECRET'],
+            'code': code
+        }
+
+    @staticmethod
+    def _github_access_token(response):
+        access_token = response.json().get('access_token')
+        if not access_token:
+            app.logger.warning("GitHub code exchange returned no access token (HTTP %s)", response.status_code)
+        return access_token
 
-            github_id = user_info.get('id')
-            email = user_info.get('email')
-            print(f"Extracted github_id: {github_id}, email: {email}")
+    @staticmethod
+    def github_user(user_info, is_freelancer):
+        """Find or create the user for a GitHub profile."""
+        github_id = user_info.get('id')
+        email = user_info.get('email')
 
-            if not github_id:
-                print("No GitHub ID found in user_info")
-                return None, "No GitHub ID provided", 400
+        if not github_id:
+            app.logger.warning("GitHub user info had no id")
+            return None, "No GitHub ID provided", 400
 
-            user = User.query.filter_by(github_id=github_id).first()
-            print(f"Queried user: {user}")
+        user = User.query.filter_by(github_id=github_id).first()
 
-            if not user:
-                user = User(github_id=github_id, email=email, password_hash=None, is_freelancer=is_freelancer)
-                db.session.add(user)
+        if not user:
+            user = User(github_id=github_id, email=email, password_hash=None, is_freelancer=is_freelancer)
+            db.session.add(user)
+            db.session.commit()
+            app.logger.info("Created user %s from GitHub sign-in (freelancer: %s)", user.id, bool(is_freelancer))
+        else:
+            if email and not user.email:
+                user.email = email
                 db.session.commit()
-                print(f"New user created with id: {user.id}")
-            else:
-                if email and not user.email:
-                    user.email = email
-                    db.session.commit()
-                else:
-                    print("User exists, no email update needed")
+                bump_version('users', user.id)
+                ServiceService.invalidate_where(lambda service: service.user_id == user.id)
 
-            print(f"Returning user: {user}")
-            return user, None, 200
+        return user, None, 200
 
-        except Exception as e:
-            print(f"GitHub auth error: {str(e)}")
-            return None, "Error during GitHub authentication", 500
\ No newline at end of file
+    @staticmethod
+    def _as_principal(find_user, *args):
+        user, error, status_code = find_user(*args)
+        return (Principal.from_user(user) if user else None), error, status_code
@@ -0,0 +1,190 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app as app
+from sqlalchemy import and_, inspect, or_, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.appointment import Appointment
+from app.models.stripe_event import StripeEvent
+from app.services.appointment_service import AppointmentService
+from app.utils.stripe_client import stripe_client
+
+CHECKOUT_COMPLETED = 'checkout.session.completed'
+REQUIRED_METADATA = ('client_id', 'service_id', 'scheduled_at')
+UNFINISHED = ('received', 'processing')
+
+def init_payment_jobs(app):
+    app.extensions['payment_jobs'] = ThreadPoolExecutor(
+        max_workers=app.config['PAYMENT_WORKERS'],
+        thread_name_prefix='payment-job'
+    )
+    if app.config['PAYMENT_SWEEP_ON_START']:
+        app.extensions['payment_jobs'].submit(PaymentService.requeue_abandoned, app)
+
+class PaymentService:
+    @staticmethod
+    def handle_webhook(payload, signature):
+        """Verify a Stripe webhook and queue the booking for completed checkouts.
+
+        Returns the queued job (a Future resolving to the booked appointment's
+        id) or None when there is nothing to do, so Stripe gets its 2xx
+        without waiting on the booking itself.
+        """
+        secret = app.config.get('STRIPE_WEBHOOK_SECRET')
+        if not secret:
+            return None, "Stripe webhook secret not configured", 503
+        stripe = stripe_client()
+        try:
+            stripe.WebhookSignature.verify_header(payload.decode('utf-8'), signature, secret)
+            event = json.loads(payload)
+        except (stripe.SignatureVerificationError, UnicodeDecodeError, ValueError):
+            return None, "Invalid Stripe signature or payload", 400
+
+        if event.get('type') != CHECKOUT_COMPLETED:
+            return None, None, 200
+
+        session = event['data']['object']
+        try:
+            db.session.add(StripeEvent(id=event['id'], type=event['type'], session_id=session.get('id'),
+                                       payload=json.dumps(session)))
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            # A redelivery: only an event whose job never finished (e.g. the
+            # process died with it queued) is worth another attempt; if its
+            # job is merely still running, the new one finds it claimed
+            known = StripeEvent.query.get(event['id'])
+            if known is None or known.status not in UNFINISHED:
+                return None, None, 200
+
+        return PaymentService._queue(app._get_current_object(), event['id'], session), None, 200
+
+    @staticmethod
+    def _queue(flask_app, event_id, session):
+        return flask_app.extensions['payment_jobs'].submit(PaymentService._run_booking, flask_app, event_id, session)
+
+    @staticmethod
+    def _claim(event_id):
+        """Mark the event 'processing' for this job; False if another job holds it.
+
+        One conditional UPDATE, so of two jobs queued for the same event only
+        one can win. A claim older than PAYMENT_JOB_TIMEOUT is taken over:
+        its job died with its process.
+        """
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=app.config['PAYMENT_JOB_TIMEOUT'])
+        claimed = db.session.execute(
+            update(StripeEvent).where(
+                StripeEvent.id == event_id,
+                or_(StripeEvent.status == 'received',
+                    and_(StripeEvent.status == 'processing', StripeEvent.claimed_at < stale))
+            ).values(status='processing', claimed_at=now)
+        ).rowcount
+        db.session.commit()
+        return claimed == 1
+
+    @staticmethod
+    def _run_booking(flask_app, event_id, session):
+        with flask_app.app_context():
+            try:
+                if not PaymentService._claim(event_id):
+                    return None
+                appointment = PaymentService.book_from_session(event_id, session)
+                return appointment.id if appointment else None
+            except Exception as e:
+                db.session.rollback()
+                app.logger.exception("Booking for Stripe event %s failed", event_id)
+                event = StripeEvent.query.get(event_id)
+                if event is not None and event.status == 'processing':
+                    event.status, event.error = 'failed', f"Booking failed: {e}"[:500]
+                    db.session.commit()
+                raise
+            finally:
+                db.session.remove()
+
+    @staticmethod
+    def requeue_abandoned(flask_app):
+        """Queue again the events left unbooked for PAYMENT_JOB_TIMEOUT seconds.
+
+        Their job was lost with a previous process. A job that is merely slow
+        keeps its claim, so the one queued here finds the event taken.
+        Returns the queued jobs.
+        """
+        with flask_app.app_context():
+            try:
+                if not inspect(db.engine).has_table(StripeEvent.__tablename__):
+                    return []
+                cutoff = datetime.utcnow() - timedelta(seconds=flask_app.config['PAYMENT_JOB_TIMEOUT'])
+                abandoned = StripeEvent.query.filter(
+                    or_(and_(StripeEvent.status == 'received', StripeEvent.received_at < cutoff),
+                        and_(StripeEvent.status == 'processing', StripeEvent.claimed_at < cutoff)),
+                    StripeEvent.payload.isnot(None)
+                ).all()
+                jobs = [PaymentService._queue(flask_app, event.id, json.loads(event.payload)) for event in abandoned]
+                if jobs:
+                    flask_app.logger.warning("Re-queued %d abandoned Stripe events", len(jobs))
+                return jobs
+            except Exception as e:
+                flask_app.logger.warning("Sweep of abandoned Stripe events failed: %s", str(e))
+                return []
+            finally:
+                db.session.remove()
+
+    @staticmethod
+    def book_from_session(event_id, session):
+        """Create the appointment paid for by a completed checkout session, once."""
+        event = StripeEvent.query.get(event_id)
+        appointment = Appointment.query.filter_by(stripe_session_id=session['id']).first()
+        if appointment:
+            event.status = 'booked'
+            db.session.commit()
+            return appointment
+
+        metadata = session.get('metadata') or {}
+        appointment = None
+        if session.get('payment_status') != 'paid':
+            error = "Payment not completed"
+        elif not all(key in metadata for key in REQUIRED_METADATA):
+            error = "Missing appointment data in Stripe session"
+        elif not all(str(metadata[key]).isdigit() for key in ('client_id', 'service_id')):
+            error = "Invalid appointment data in Stripe session"
+        else:
+            appointment, error, status_code = AppointmentService.create_appointment({
+                'client_id': int(metadata['client_id']),
+                'service_id': int(metadata['service_id']),
+                'scheduled_at': metadata['scheduled_at'],
+                'stripe_session_id': session['id']
+            })
+            if appointment is None:
+                # A concurrent delivery may have won the unique stripe_session_id
+                appointment = Appointment.query.filter_by(stripe_session_id=session['id']).first()
+
+        event = StripeEvent.query.get(event_id)
+        if appointment is None:
+            app.logger.error("Stripe session %s could not be booked: %s", session['id'], error)
+            event.status, event.error = 'failed', error[:500]
+        else:
+            # create_appointment returns an identical booking made without Stripe as-is
+            appointment.stripe_session_id = appointment.stripe_session_id or session['id']
+            event.status = 'booked'
+        db.session.commit()
+        return appointment
+
+    @staticmethod
+    def get_booking(session_id):
+        """Look up what the webhook recorded for a checkout session.
+
+        Returns (appointment, error, status_code): 200 once booked, 202 while
+        the webhook has not been processed yet, 409 if booking failed.
+        """
+        try:
+            appointment = Appointment.query.filter_by(stripe_session_id=session_id).first()
+            if appointment:
+                return appointment, None, 200
+            event = StripeEvent.query.filter_by(session_id=session_id).first()
+            if event and event.status == 'failed':
+                return None, event.error, 409
+            return None, None, 202
+        except Exception as e:
+            return None, f"Error retrieving booking: {str(e)}", 500
@@ -1,17 +1,121 @@
+import hashlib
+import json
+from flask import current_app
 from app.models.service import Service, Category
 from app import db
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import joinedload
+from app.utils.pagination import Page, paginate_rows, decode_cursor
+from app.utils.cache import get_cache
+from app.utils.conditional import bump_version
+from app.utils.replica import pinned_to_primary, read_replica
+from app.utils.search_index import parse_query, reindex_services, search
+from app.serializers.service import ServiceDTO, service_load, service_projection
+
+SERVICE_ORDER = (Service.id,)
+# Sort keys of the catalogue listing: (order_by, descending). Each ordering
+# ends with the id so it is total, and each has an index to seek on (v0006)
+SERVICE_SORTS = {
+    'id': (SERVICE_ORDER, False),
+    '-id': (SERVICE_ORDER, True),
+    'price': ((Service.price, Service.id), False),
+    '-price': ((Service.price, Service.id), True),
+    'duration': ((Service.duration, Service.id), False),
+    '-duration': ((Service.duration, Service.id), True),
+}
+STREAM_BATCH_SIZE = 1000
+
+def listing_conditions(min_price=None, max_price=None, max_duration=None, category_id=None, user_id=None):
+    """WHERE clauses for the catalogue listing's filters; None means unfiltered."""
+    conditions = []
+    if min_price is not None:
+        conditions.append(Service.price >= min_price)
+    if max_price is not None:
+        conditions.append(Service.price <= max_price)
+    if max_duration is not None:
+        conditions.append(Service.duration <= max_duration)
+    if category_id is not None:
+        conditions.append(Service.category_id == category_id)
+    if user_id is not None:
+        conditions.append(Service.user_id == user_id)
+    return conditions
+
+def listing_scope(sort, filters):
+    """Cursor scope of a catalogue listing: its sort key and a digest of its filters."""
+    digest = hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()[:12]
+    return f'{sort}:{digest}'
+
+def _duration_error(duration):
+    if not isinstance(duration, int) or duration <= 0:
+        return "Duration must be a positive integer"
+    longest = current_app.config['APPOINTMENT_MAX_DURATION']
+    if duration > longest:
+        return f"Duration must be at most {longest} minutes"
+    return None
+
+def _cached(name, key, loader):
+    """Read-through ``get_cache(name)``, except for callers who must read their own writes."""
+    if pinned_to_primary():
+        return loader()
+    return get_cache(name).get_or_load(key, loader)
+
+def _page_covers(page_key, page, service_id):
+    """Whether adding, changing or removing ``service_id`` alters a cached listing page."""
+    _, limit, after_id = page_key
+    if service_id <= after_id:
+        return False
+    return page.next_cursor is None or service_id <= page.items[-1].id
 
 class ServiceService:
     @staticmethod
-    def get_all_services():
+    def invalidate_service(service_id):
+        bump_version('services', service_id)
+        get_cache('services').invalidate(service_id)
+        get_cache('service_pages').invalidate_where(lambda key, page: _page_covers(key, page, service_id))
+
+    @staticmethod
+    def invalidate_where(predicate):
+        """Drop cached services (and the listing pages showing them) matching ``predicate``."""
+        bump_version('services')
+        get_cache('services').invalidate_where(lambda key, service: predicate(service))
+        get_cache('service_pages').invalidate_where(lambda key, page: any(predicate(s) for s in page.items))
+
+    @staticmethod
+    @read_replica
+    def get_all_services(limit, after=None, sort='id', **filters):
+        """One keyset page of the catalogue, filtered (see listing_conditions) and sorted by a SERVICE_SORTS key."""
         try:
-            services = Service.query.options(joinedload(Service.user), joinedload(Service.category)).all()
-            return services, None, 200
+            order_by, descending = SERVICE_SORTS[sort]
+            conditions = listing_conditions(**filters)
+            scope = listing_scope(sort, filters)
+
+            def load_page():
+                statement = service_projection().where(*conditions)
+                page = paginate_rows(statement, order_by, limit, after, descending, scope)
+                return Page([ServiceDTO.from_row(row) for row in page.items], page.next_cursor)
+
+            # Only the plain listing is cached: the invalidation in
+            # _page_covers assumes pages in id order over every service
+            if sort != 'id' or conditions:
+                return load_page(), None, 200
+            # Keyed by the decoded id, so only valid cursors reach the cache
+            # and the same page is cached once however its cursor was spelled
+            after_id = decode_cursor(after, SERVICE_ORDER, scope)[0] if after else 0
+            page = _cached('service_pages', ('all', limit, after_id), load_page)
+            return page, None, 200
+        except ValueError as e:
+            return None, str(e), 400
         except Exception as e:
             return None, f"Error retrieving services: {str(e)}", 500
 
+    @staticmethod
+    def iter_all_services(sort='id', **filters):
+        """Lazily iterate every matching service in ``sort`` order using a server-side cursor."""
+        order_by, descending = SERVICE_SORTS[sort]
+        ordering = [column.desc() for column in order_by] if descending else order_by
+        statement = (service_projection().where(*listing_conditions(**filters)).order_by(*ordering)
+                     .execution_options(yield_per=STREAM_BATCH_SIZE))
+        return (ServiceDTO.from_row(row) for row in db.session.execute(statement))
+
     @staticmethod
     def create_service(user_id, category_id, title, price, duration, description=None):
         try:
@@ -21,8 +125,9 @@ class ServiceService:
                 return None, "User not found", 400
             if not Category.query.get(category_id):
                 return None, "Category not found", 400
-            if not isinstance(duration, int) or duration <= 0:
-                return None, "Duration must be a positive integer", 400
+            error = _duration_error(duration)
+            if error:
+                return None, error, 400
             service = Service(
                 user_id=user_id,
                 category_id=category_id,
@@ -32,18 +137,26 @@ class ServiceService:
                 description=description
             )
             db.session.add(service)
+            db.session.flush()
+            reindex_services(service_id=service.id)
             db.session.commit()
-            # Reload service with user and category for to_dict
-            service = Service.query.options(joinedload(Service.user), joinedload(Service.category)).get(service.id)
-            return service, None, 201
+            ServiceService.invalidate_service(service.id)
+            service = Service.query.options(*service_load()).get(service.id)
+            return ServiceDTO.from_orm(service), None, 201
         except Exception as e:
             db.session.rollback()
             return None, str(e), 500
 
     @staticmethod
+    @read_replica
     def get_service_by_id(service_id):
+        """Return a cached ServiceDTO; use Service.query when an ORM instance is needed."""
         try:
-            service = Service.query.options(joinedload(Service.user), joinedload(Service.category)).get(service_id)
+            def load_service():
+                service = Service.query.options(*service_load()).get(service_id)
+                return ServiceDTO.from_orm(service) if service else None
+
+            service = _cached('services', service_id, load_service)
             if not service:
                 return None, "Service not found", 404
             return service, None, 200
@@ -58,15 +171,18 @@ class ServiceService:
                 return None, "Service not found", 404
             if 'price' in kwargs and kwargs['price'] <= 0:
                 return None, "Price must be greater than 0", 400
-            if 'duration' in kwargs and (not isinstance(kwargs['duration'], int) or kwargs['duration'] <= 0):
-                return None, "Duration must be a positive integer", 400
+            error = _duration_error(kwargs['duration']) if 'duration' in kwargs else None
+            if error:
+                return None, error, 400
             for key, value in kwargs.items():
                 if hasattr(service, key):
                     setattr(service, key, value)
+            db.session.flush()
+            reindex_services(service_id=service_id)
             db.session.commit()
-            # Reload service with user and category for to_dict
-            service = Service.query.options(joinedload(Service.user), joinedload(Service.category)).get(service_id)
-            return service, None, 200
+            ServiceService.invalidate_service(service_id)
+            service = Service.query.options(*service_load()).get(service_id)
+            return ServiceDTO.from_orm(service), None, 200
         except SQLAlchemyError as e:
             db.session.rollback()
             return None, f"Database error: {str(e)}", 500
@@ -79,8 +195,10 @@ class ServiceService:
             service = Service.query.get(service_id)
             if not service:
                 return None, "Service not found", 404
+            reindex_services(service_id=service_id)
             db.session.delete(service)
             db.session.commit()
+            ServiceService.invalidate_service(service_id)
             return {"message": "Service deleted successfully"}, None, 200
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -89,21 +207,41 @@ class ServiceService:
             return None, f"Unexpected error: {str(e)}", 500
 
     @staticmethod
-    def get_services_by_freelancer(user_id):
-        print(f"Attempting to retrieve services for user_id: {user_id}")
+    @read_replica
+    def search_services(query, limit):
+        """ServiceDTOs matching every word of ``query`` (the last also as a prefix), best match first."""
+        try:
+            terms = parse_query(query)
+            return [ServiceDTO.from_row(row) for row in search(service_projection(), terms, limit)], None, 200
+        except ValueError as e:
+            return None, str(e), 400
+        except Exception as e:
+            current_app.logger.error("Error searching services for %r: %s", query, str(e))
+            return None, f"Error searching services: {str(e)}", 500
+
+    @staticmethod
+    @read_replica
+    def get_services_by_freelancer(user_id, limit, after=None):
         try:
-            services = Service.query.filter_by(user_id=user_id).options(joinedload(Service.user), joinedload(Service.category)).all()
-            print(f"Successfully retrieved {len(services)} services for user_id: {user_id}")
-            return services, None, 200
+            statement = service_projection().where(Service.user_id == user_id)
+            page = paginate_rows(statement, SERVICE_ORDER, limit, after)
+            page = Page([ServiceDTO.from_row(row) for row in page.items], page.next_cursor)
+            return page, None, 200
+        except ValueError as e:
+            return None, str(e), 400
         except Exception as e:
-            print(f"Error occurred while retrieving services for user_id: {user_id}. Error: {str(e)}")
+            current_app.logger.error("Error retrieving services for user %s: %s", user_id, str(e))
             return None, f"Error retrieving services: {str(e)}", 500
 
     @staticmethod
-    def get_services_by_category(category_id):
+    @read_replica
+    def get_services_by_category(category_id, limit, after=None):
         try:
-            services = Service.query.filter_by(category_id=category_id).options(joinedload(Service.user), joinedload(Service.category)).all()
-            return services, None, 200
+            statement = service_projection().where(Service.category_id == category_id)
+            page = paginate_rows(statement, SERVICE_ORDER, limit, after)
+            return Page([ServiceDTO.from_row(row) for row in page.items], page.next_cursor), None, 200
+        except ValueError as e:
+            return None, str(e), 400
         except Exception as e:
             return None, f"Error retrieving services: {str(e)}", 500
 
@@ -119,6 +257,7 @@ class CategoryService:
             new_category = Category(name=name)
             db.session.add(new_category)
             db.session.commit()
+            bump_version('categories', new_category.id)
             return new_category, None, 201
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -127,6 +266,7 @@ class CategoryService:
             return None, f"Unexpected error: {str(e)}", 500
 
     @staticmethod
+    @read_replica
     def get_all_categories():
         try:
             categories = Category.query.all()
@@ -135,6 +275,7 @@ class CategoryService:
             return None, f"Error retrieving categories: {str(e)}", 500
 
     @staticmethod
+    @read_replica
     def get_category_by_id(category_id):
         try:
             category = Category.query.get(category_id)
@@ -156,7 +297,11 @@ class CategoryService:
             if existing_category and existing_category.id != category_id:
                 return None, "Category name already exists", 409
             category.name = new_name
+            db.session.flush()
+            reindex_services(category_id=category_id)
             db.session.commit()
+            bump_version('categories', category_id)
+            ServiceService.invalidate_where(lambda service: service.category_id == category_id)
             return category, None, 200
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -170,10 +315,12 @@ class CategoryService:
             category = Category.query.get(category_id)
             if not category:
                 return None, "Category not found", 404
-            if category.services:
+            # EXISTS instead of loading the whole Category.services collection
+            if db.session.query(Service.query.filter_by(category_id=category_id).exists()).scalar():
                 return None, "Cannot delete category with associated services", 400
             db.session.delete(category)
             db.session.commit()
+            bump_version('categories', category_id)
             return {"message": "Category deleted successfully"}, None, 200
         except SQLAlchemyError as e:
             db.session.rollback()
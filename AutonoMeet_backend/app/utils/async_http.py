@@ -0,0 +1,116 @@
+import asyncio
+import itertools
+import random
+import weakref
+from urllib.parse import urlsplit
+import httpx
+from flask import current_app
+from app.utils.metrics import outbound_call
+
+RETRY_STATUSES = (502, 503, 504)
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+# httpcore scans every connection of a pool each time it hands one out, so
+# one pool of hundreds of connections costs more CPU than the calls; calls
+# are spread round-robin over pools of at most this many connections instead
+POOL_SHARD_SIZE = 16
+
+class UpstreamBusyError(httpx.TransportError):
+    """Raised when a host already has its maximum number of calls in flight."""
+
+class AsyncHttpClient:
+    """HttpClient's counterpart for async views (see app/utils/async_views.py).
+
+    Same timeouts, retry policy and metrics as HttpClient, but a call waiting
+    on its upstream is a suspended coroutine rather than a blocked thread, so
+    the per-host limit can be in the hundreds. httpx connections belong to
+    the event loop that opened them: get instances from async_http_client().
+    """
+
+    def __init__(self, max_connections=500, connect_timeout=3.05, read_timeout=10,
+                 retries=2, backoff_factor=0.2, backoff_jitter=0.2,
+                 per_host_limit=500, acquire_timeout=5):
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_jitter = backoff_jitter
+        self.per_host_limit = per_host_limit
+        self.acquire_timeout = acquire_timeout
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        shard_size = min(max_connections, POOL_SHARD_SIZE)
+        self.limits = httpx.Limits(max_connections=shard_size, max_keepalive_connections=shard_size)
+        self._ssl_context = None
+        self._sessions = [None] * -(-max_connections // shard_size)
+        self._next_session = itertools.count()
+        self._slots = {}
+
+    def _session(self):
+        index = next(self._next_session) % len(self._sessions)
+        if self._sessions[index] is None:
+            if self._ssl_context is None:
+                self._ssl_context = httpx.create_ssl_context()
+            # The transport retries connection failures; statuses are retried in request()
+            transport = httpx.AsyncHTTPTransport(verify=self._ssl_context, limits=self.limits, retries=self.retries)
+            self._sessions[index] = httpx.AsyncClient(timeout=self.timeout, transport=transport)
+        return self._sessions[index]
+
+    def _slot(self, host):
+        if host not in self._slots:
+            self._slots[host] = asyncio.BoundedSemaphore(self.per_host_limit)
+        return self._slots[host]
+
+    def _backoff(self, attempt):
+        return self.backoff_factor * 2 ** attempt + random.uniform(0, self.backoff_jitter)
+
+    async def request(self, method, url, upstream=None, **kwargs):
+        host = urlsplit(url).netloc
+        slot = self._slot(host)
+        try:
+            await asyncio.wait_for(slot.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise UpstreamBusyError(f"Too many concurrent requests to {host}") from None
+        try:
+            session = self._session()
+            with outbound_call(upstream or host) as call:
+                attempt = 0
+                while True:
+                    response = await session.request(method, url, **kwargs)
+                    if (response.status_code not in RETRY_STATUSES or method not in IDEMPOTENT_METHODS
+                            or attempt == self.retries):
+                        break
+                    await response.aclose()
+                    await asyncio.sleep(self._backoff(attempt))
+                    attempt += 1
+                call['outcome'] = f"{response.status_code // 100}xx"
+                return response
+        finally:
+            slot.release()
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def aclose(self):
+        for session in filter(None, self._sessions):
+            await session.aclose()
+
+def async_http_client():
+    """The AsyncHttpClient of the running event loop, built on first use."""
+    clients = current_app.extensions.setdefault('async_http_clients', weakref.WeakKeyDictionary())
+    loop = asyncio.get_running_loop()
+    client = clients.get(loop)
+    if client is None:
+        config = current_app.config
+        client = clients[loop] = AsyncHttpClient(
+            max_connections=config['ASYNC_HTTP_MAX_CONNECTIONS'],
+            connect_timeout=config['HTTP_CONNECT_TIMEOUT'],
+            read_timeout=config['HTTP_READ_TIMEOUT'],
+            retries=config['HTTP_RETRIES'],
+            per_host_limit=config['ASYNC_HTTP_PER_HOST_LIMIT']
+        )
+    return client
+
+async def close_async_http_client(app):
+    client = app.extensions.get('async_http_clients', {}).pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,66 @@
+"""Async variants of the resources that mostly wait on Google, GitHub and Stripe.
+
+A Resource opts in by defining ``async_<method>`` next to its sync method,
+e.g. ``async def async_post(self)``, and listing ``async_views`` in its
+``method_decorators``. With ASYNC_VIEWS on, flask-restx dispatches the
+request as usual (method decorators, payload validation, response
+handling) and the decorator answers it with the async method through
+Flask's own async view support: the view's upstream calls
+(async_http_client(), Stripe's ``*_async`` calls) can then run
+concurrently within the request. The request still occupies its WSGI
+thread, as any Flask async view does.
+
+Database work never runs on the event loop. Views pass it to ``run_db``,
+which runs it on a pool of ASYNC_DB_WORKERS threads (at most the
+connection pool's capacity) and closes the session afterwards, so no
+connection is held while the view waits on the network. Anything returned
+from ``run_db`` must be usable without a session: DTOs, Principals, ids.
+"""
+import asyncio
+import contextvars
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from flask import current_app, request
+from app import db
+from app.utils.async_http import close_async_http_client
+
+def init_async_views(app):
+    app.extensions['async_db'] = ThreadPoolExecutor(
+        max_workers=app.config['ASYNC_DB_WORKERS'],
+        thread_name_prefix='async-db'
+    )
+
+async def run_db(fn, *args, **kwargs):
+    """Run ``fn`` on the database threads within this request's context; the session is closed after."""
+    context = contextvars.copy_context()
+
+    def call():
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            db.session.remove()
+    executor = current_app.extensions['async_db']
+    return await asyncio.get_running_loop().run_in_executor(executor, context.run, call)
+
+def async_views(meth):
+    """Resource method decorator: with ASYNC_VIEWS on, answer with the resource's ``async_<method>`` instead."""
+    @wraps(meth)
+    def decorated_function(*args, **kwargs):
+        view = getattr(meth.__self__, f'async_{request.method.lower()}', None)
+        if view is None or not current_app.config['ASYNC_VIEWS']:
+            return meth(*args, **kwargs)
+        app = current_app._get_current_object()
+        return app.ensure_sync(_run_async)(app, view, args, kwargs)
+    return decorated_function
+
+async def _run_async(app, view, args, kwargs):
+    try:
+        rv = view(*args, **kwargs)
+        # Decorators such as jwt_required may answer without awaiting the view
+        if inspect.isawaitable(rv):
+            rv = await rv
+        return rv
+    finally:
+        # Each async view gets its own event loop; its connections go with it
+        await close_async_http_client(app)
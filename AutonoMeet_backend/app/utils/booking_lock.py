@@ -0,0 +1,84 @@
+import threading
+from contextlib import ExitStack, contextmanager
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import db
+
+# First key of the two-int advisory lock, so booking locks cannot collide
+# with advisory locks other code might take on plain freelancer ids
+BOOKING_LOCK_CLASS = 4201
+PG_LOCK_NOT_AVAILABLE = '55P03'
+
+class BookingBusyError(Exception):
+    """Raised when a freelancer's booking lock is not acquired within BOOKING_LOCK_TIMEOUT."""
+
+class KeyedLocks:
+    """One in-process lock per key, dropped again once nobody holds or waits for it."""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks = {}
+
+    @contextmanager
+    def hold(self, key, timeout=-1):
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            if not entry[0].acquire(timeout=timeout):
+                raise BookingBusyError(f"Timed out waiting for the booking lock of {key}")
+            try:
+                yield
+            finally:
+                entry[0].release()
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+def init_booking_locks(app):
+    app.extensions['booking_locks'] = KeyedLocks()
+
+def _pg_advisory_lock(freelancer_id, timeout):
+    db.session.execute(text("SELECT set_config('lock_timeout', :timeout, true)"), {'timeout': f'{int(timeout * 1000)}ms'})
+    try:
+        db.session.execute(text("SELECT pg_advisory_xact_lock(:lock_class, :freelancer_id)"),
+                           {'lock_class': BOOKING_LOCK_CLASS, 'freelancer_id': freelancer_id})
+    except OperationalError as e:
+        if getattr(e.orig, 'pgcode', None) == PG_LOCK_NOT_AVAILABLE:
+            raise BookingBusyError(f"Timed out waiting for the booking lock of {freelancer_id}") from e
+        raise
+
+@contextmanager
+def freelancer_lock(*freelancer_ids):
+    """Serialize one freelancer's bookings; other freelancers' bookings run in parallel.
+
+    On Postgres this is a transaction-scoped advisory lock, so it holds
+    across workers and hosts. Other databases (SQLite in tests and local
+    runs) get an in-process lock per freelancer, which only covers threads
+    of this process. Either way the block's transaction is committed on exit
+    (rolled back on error), which is what releases the lock, so the conflict
+    check and the insert inside it see each other's effects in order.
+
+    Moving a booking between freelancers locks both; the locks are always
+    taken in id order so two such moves cannot deadlock.
+    """
+    timeout = current_app.config['BOOKING_LOCK_TIMEOUT']
+    freelancer_ids = sorted(set(freelancer_ids))
+    try:
+        if db.session.get_bind().dialect.name == 'postgresql':
+            for freelancer_id in freelancer_ids:
+                _pg_advisory_lock(freelancer_id, timeout)
+            yield
+            db.session.commit()
+        else:
+            with ExitStack() as held:
+                for freelancer_id in freelancer_ids:
+                    held.enter_context(current_app.extensions['booking_locks'].hold(freelancer_id, timeout))
+                yield
+                db.session.commit()
+    except BaseException:
+        db.session.rollback()
+        raise
@@ -0,0 +1,87 @@
+import threading
+from cachetools import TTLCache
+from flask import current_app
+
+class LookupCache:
+    """Bounded read-through cache (TTL + LRU eviction) with hit/miss counters.
+
+    Values loaded while an invalidation happens are returned to the caller
+    but not stored, so a slow reader cannot put back data a concurrent
+    write just invalidated.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key, loader):
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+        if value is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._cache[key] = value
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._generation += 1
+            self._cache.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """Drop the entries ``predicate(key, value)`` selects.
+
+        Runs after the write it reflects has committed, so it never raises:
+        should the predicate fail, everything is dropped instead.
+        """
+        with self._lock:
+            self._generation += 1
+            try:
+                stale = [key for key, value in self._cache.items() if predicate(key, value)]
+            except Exception:
+                current_app.logger.exception("Cache invalidation failed; clearing the cache")
+                self._cache.clear()
+                return
+            for key in stale:
+                del self._cache[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._cache),
+                'maxsize': self._cache.maxsize,
+                'ttl': self._cache.ttl
+            }
+
+def init_caches(app):
+    maxsize = app.config['SERVICE_CACHE_MAXSIZE']
+    ttl = app.config['SERVICE_CACHE_TTL']
+    app.extensions['lookup_caches'] = {
+        'services': LookupCache(maxsize, ttl),
+        'service_pages': LookupCache(maxsize, ttl),
+        'principals': LookupCache(app.config['AUTH_CACHE_MAXSIZE'], app.config['PRINCIPAL_CACHE_TTL']),
+        'verified_tokens': LookupCache(app.config['AUTH_CACHE_MAXSIZE'], app.config['TOKEN_CACHE_TTL'])
+    }
+
+def get_cache(name):
+    return current_app.extensions['lookup_caches'][name]
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in current_app.extensions['lookup_caches'].items()}
@@ -0,0 +1,134 @@
+import hashlib
+import secrets
+import threading
+import time
+from functools import wraps
+from email.utils import formatdate, parsedate_to_datetime
+from flask import current_app, request
+from flask_restx.utils import unpack
+
+class VersionRegistry:
+    """Per-process version counters and modification times for cached collections.
+
+    Keys are ``(collection,)`` for a whole collection and
+    ``(collection, item_id)`` for one item. Validators embed a random
+    process token, so a worker never answers 304 for another worker's ETag.
+    """
+
+    def __init__(self):
+        self.token = secrets.token_hex(4)
+        self.started_at = time.time()
+        self._versions = {}
+        self._modified = {}
+        self._lock = threading.Lock()
+
+    def bump(self, collection, item_id=None):
+        keys = [(collection,)] if item_id is None else [(collection,), (collection, item_id)]
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._modified[key] = now
+
+    def snapshot(self, keys):
+        with self._lock:
+            versions = [self._versions.get(key, 0) for key in keys]
+            modified = max([self._modified.get(key, self.started_at) for key in keys])
+        return versions, modified
+
+def init_versions(app):
+    app.extensions['catalogue_versions'] = VersionRegistry()
+
+def bump_version(collection, item_id=None):
+    current_app.extensions['catalogue_versions'].bump(collection, item_id)
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    header = request.headers.get('If-Modified-Since')
+    if header:
+        # HTTP dates drop the fraction, so a change later in the second the
+        # client saw must not compare equal to it
+        try:
+            return parsedate_to_datetime(header).timestamp() >= last_modified
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def conditional(*collections, item=None):
+    """Answer GETs with ETag/Last-Modified and short-circuit matching revalidations with 304.
+
+    ``collections`` name the collections whose changes alter the response;
+    ``item`` is an optional ``(collection, view_arg)`` pair for single-item
+    views. The validator is computed from in-memory versions alone, so a 304
+    never touches the database. Both the ETag and Last-Modified roll over
+    every SERVICE_CACHE_TTL seconds, which bounds how stale another worker's
+    writes can leave them.
+
+    With a read replica the versions no longer describe what is served: a
+    GET can see this process's newest version while reading lagging replica
+    rows. The view then always runs and the ETag is a hash of its body,
+    without Last-Modified, so a 304 only ever confirms the data actually
+    being served.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if current_app.extensions.get('replica_sticky') is not None:
+                return _validated_by_body(f(*args, **kwargs))
+            registry = current_app.extensions['catalogue_versions']
+            keys = [(collection,) for collection in collections]
+            if item:
+                keys.append((item[0], kwargs[item[1]]))
+            versions, last_modified = registry.snapshot(keys)
+            ttl = current_app.config['SERVICE_CACHE_TTL']
+            if ttl > 0:
+                window = int(time.time() // ttl)
+                last_modified = max(last_modified, window * ttl)
+            else:
+                window = time.time_ns()
+                last_modified = time.time()
+
+            fingerprint = f"{keys}{versions}{window}{request.query_string!r}"
+            etag = f"{registry.token}-{hashlib.sha1(fingerprint.encode()).hexdigest()[:16]}"
+            headers = {
+                'ETag': f'W/"{etag}"',
+                'Last-Modified': formatdate(int(last_modified), usegmt=True),
+                'Cache-Control': 'no-cache'
+            }
+
+            if _not_modified(etag, last_modified):
+                return None, 304, headers
+
+            result = f(*args, **kwargs)
+            if isinstance(result, current_app.response_class):
+                if result.status_code == 200:
+                    result.headers.update(headers)
+                return result
+            data, code, extra_headers = unpack(result)
+            if code == 200:
+                extra_headers = {**headers, **(extra_headers or {})}
+            return data, code, extra_headers
+        return decorated_function
+    return decorator
+
+def _validated_by_body(result):
+    if isinstance(result, current_app.response_class):
+        # A streamed body is not known up front, so it goes out without a validator
+        if result.status_code != 200 or result.is_streamed:
+            return result
+        body = result.get_data()
+    else:
+        data, code, extra_headers = unpack(result)
+        if code != 200:
+            return result
+        body = current_app.json.dumps(data).encode()
+
+    etag = hashlib.sha1(body).hexdigest()[:16]
+    headers = {'ETag': f'W/"{etag}"', 'Cache-Control': 'no-cache'}
+    if request.if_none_match and request.if_none_match.contains_weak(etag):
+        return None, 304, headers
+    if isinstance(result, current_app.response_class):
+        result.headers.update(headers)
+        return result
+    return data, code, {**headers, **(extra_headers or {})}
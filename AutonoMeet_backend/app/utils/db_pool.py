@@ -0,0 +1,161 @@
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from app import db
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection."""
+    monitor = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.monitor is not None:
+                self.monitor.record_wait(time.perf_counter() - started, timed_out)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+def engine_options(config, uri=None):
+    """Pool settings from DB_POOL_* config; explicit SQLALCHEMY_ENGINE_OPTIONS entries win.
+
+    ``uri`` defaults to the primary database; binds pass their own.
+    """
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_recycle': config['DB_POOL_RECYCLE']
+    }
+    uri = uri or config['SQLALCHEMY_DATABASE_URI']
+    # In-memory SQLite gets Flask-SQLAlchemy's StaticPool, which takes no sizing
+    if not (uri.startswith('sqlite') and (uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri)):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=config['DB_POOL_SIZE'],
+            max_overflow=config['DB_MAX_OVERFLOW'],
+            pool_timeout=config['DB_POOL_TIMEOUT']
+        )
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    return options
+
+class PoolMonitor:
+    """Checkout, wait and per-request counters for one engine's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidated = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.requests = 0
+        self.request_checkouts = 0
+        self.max_request_checkouts = 0
+        self.by_endpoint = {}
+
+    def record_wait(self, seconds, timed_out):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            self.timeouts += timed_out
+
+    def record_request(self, endpoint, checkouts):
+        with self._lock:
+            self.requests += 1
+            self.request_checkouts += checkouts
+            self.max_request_checkouts = max(self.max_request_checkouts, checkouts)
+            requests, total, most = self.by_endpoint.get(endpoint, (0, 0, 0))
+            self.by_endpoint[endpoint] = (requests + 1, total + checkouts, max(most, checkouts))
+
+    def _count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def stats(self, pool):
+        with self._lock:
+            return {
+                'pool': type(pool).__name__,
+                'size': pool.size() if hasattr(pool, 'size') else None,
+                'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else None,
+                'idle': pool.checkedin() if hasattr(pool, 'checkedin') else None,
+                'overflow': max(0, pool.overflow()) if hasattr(pool, 'overflow') else None,
+                'max_overflow': getattr(pool, '_max_overflow', None),
+                'connections_opened': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidated': self.invalidated,
+                'wait': {
+                    'count': self.waits,
+                    'avg_ms': 1000 * self.wait_seconds / self.waits if self.waits else 0.0,
+                    'max_ms': 1000 * self.max_wait_seconds,
+                    'timeouts': self.timeouts
+                },
+                'requests': {
+                    'count': self.requests,
+                    'avg_checkouts': self.request_checkouts / self.requests if self.requests else 0.0,
+                    'max_checkouts': self.max_request_checkouts,
+                    'by_endpoint': {
+                        endpoint: {'requests': count, 'avg_checkouts': total / count, 'max_checkouts': most}
+                        for endpoint, (count, total, most) in sorted(self.by_endpoint.items())
+                    }
+                }
+            }
+
+def _watch(name, engine, monitor):
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.monitor = monitor
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, record):
+        monitor._count('connects')
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, record, proxy):
+        monitor._count('checkouts')
+        if has_request_context():
+            counts = g.setdefault('db_checkouts', {})
+            counts[name] = counts.get(name, 0) + 1
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, record):
+        monitor._count('checkins')
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, record, exception):
+        monitor._count('invalidated')
+
+def init_pool_stats(app):
+    with app.app_context():
+        engines = {bind or 'default': engine for bind, engine in db.engines.items()}
+    monitors = app.extensions['pool_monitors'] = {}
+    for name, engine in engines.items():
+        monitors[name] = PoolMonitor()
+        _watch(name, engine, monitors[name])
+
+    @app.teardown_request
+    def record_request_checkouts(exc):
+        counts = g.pop('db_checkouts', {})
+        endpoint = request.endpoint or 'unmatched'
+        for name, monitor in monitors.items():
+            monitor.record_request(endpoint, counts.get(name, 0))
+
+def pool_stats():
+    engines = {bind or 'default': engine for bind, engine in db.engines.items()}
+    return {
+        name: monitor.stats(engines[name].pool)
+        for name, monitor in current_app.extensions['pool_monitors'].items()
+    }
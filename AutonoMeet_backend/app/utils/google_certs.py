@@ -0,0 +1,96 @@
+import asyncio
+import re
+import threading
+import time
+import weakref
+from app.utils.http_client import http_client
+
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/oauth2/v1/certs'
+DEFAULT_MAX_AGE = 300
+MIN_REFRESH_INTERVAL = 30
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+class CertificateCache:
+    """Signing certificates from one URL, kept for as long as its Cache-Control allows."""
+
+    def __init__(self, url):
+        self.url = url
+        self.fetches = 0
+        self._certs = None
+        self._expires_at = 0
+        self._fetched_at = None
+        self._lock = threading.Lock()
+        self._async_locks = weakref.WeakKeyDictionary()
+
+    def _fresh(self, force_refresh):
+        if self._certs is None:
+            return False
+        now = time.monotonic()
+        if force_refresh:
+            return now - self._fetched_at < MIN_REFRESH_INTERVAL
+        return now < self._expires_at
+
+    def get(self, force_refresh=False):
+        if self._fresh(force_refresh):
+            return self._certs
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._fresh(force_refresh):
+                return self._certs
+            return self._store(http_client().get(self.url, upstream='google'))
+
+    async def get_async(self, force_refresh=False):
+        """get() for async views: a refresh goes through the loop's async client."""
+        from app.utils.async_http import async_http_client
+        if self._fresh(force_refresh):
+            return self._certs
+        lock = self._async_locks.setdefault(asyncio.get_running_loop(), asyncio.Lock())
+        async with lock:
+            if self._fresh(force_refresh):
+                return self._certs
+            return self._store(await async_http_client().get(self.url, upstream='google'))
+
+    def _store(self, response):
+        response.raise_for_status()
+        self.fetches += 1
+        match = _MAX_AGE.search(response.headers.get('Cache-Control', ''))
+        max_age = int(match.group(1)) if match else DEFAULT_MAX_AGE
+        self._certs = response.json()
+        self._fetched_at = time.monotonic()
+        self._expires_at = self._fetched_at + max_age
+        return self._certs
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def certificate_cache(url=GOOGLE_CERTS_URL):
+    with _caches_lock:
+        if url not in _caches:
+            _caches[url] = CertificateCache(url)
+        return _caches[url]
+
+def verify_id_token(token, audience, certs_url=GOOGLE_CERTS_URL, clock_skew_in_seconds=0):
+    """Verify a Google ID token locally against the cached signing certificates.
+
+    Raises ValueError for invalid tokens, like google.oauth2.id_token. A key
+    id missing from the cached set triggers a refresh (at most one per
+    MIN_REFRESH_INTERVAL), to follow Google's key rotation early.
+    """
+    from google.auth import jwt as google_jwt  # deferred: only Google sign-in needs it
+    cache = certificate_cache(certs_url)
+    certs = cache.get()
+    key_id = google_jwt.decode_header(token).get('kid')
+    if key_id and key_id not in certs:
+        certs = cache.get(force_refresh=True)
+    return google_jwt.decode(token, certs=certs, audience=audience, clock_skew_in_seconds=clock_skew_in_seconds)
+
+async def verify_id_token_async(token, audience, certs_url=GOOGLE_CERTS_URL, clock_skew_in_seconds=0):
+    """verify_id_token for async views; only a certificate refresh awaits the network."""
+    from google.auth import jwt as google_jwt
+    cache = certificate_cache(certs_url)
+    certs = await cache.get_async()
+    key_id = google_jwt.decode_header(token).get('kid')
+    if key_id and key_id not in certs:
+        certs = await cache.get_async(force_refresh=True)
+    return google_jwt.decode(token, certs=certs, audience=audience, clock_skew_in_seconds=clock_skew_in_seconds)
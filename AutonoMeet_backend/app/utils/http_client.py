@@ -0,0 +1,106 @@
+import threading
+from urllib.parse import urlsplit
+from flask import current_app
+from app.utils.metrics import outbound_call
+
+_build_lock = threading.Lock()
+
+def __getattr__(name):
+    # UpstreamBusyError subclasses requests.RequestException, so it is only
+    # defined (and requests imported) once something asks for it
+    if name == 'UpstreamBusyError':
+        return _upstream_busy_error()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _upstream_busy_error():
+    with _build_lock:
+        if 'UpstreamBusyError' not in globals():
+            import requests
+
+            class UpstreamBusyError(requests.RequestException):
+                """Raised when a host already has its maximum number of calls in flight."""
+            UpstreamBusyError.__module__ = __name__
+            globals()['UpstreamBusyError'] = UpstreamBusyError
+        return globals()['UpstreamBusyError']
+
+class HttpClient:
+    """Pooled, time-bounded client shared by every outbound call (OAuth, certificates).
+
+    - keep-alive connection pools per host via one requests.Session
+    - a (connect, read) timeout on every request unless the caller overrides it
+    - retries with exponential backoff and jitter on connection failures, and
+      on 502/503/504 for idempotent methods only (urllib3 never re-sends a
+      POST whose request may have reached the server)
+    - at most ``per_host_limit`` concurrent calls per host; callers wait up to
+      ``acquire_timeout`` seconds for a slot before UpstreamBusyError
+    - latency recorded per ``upstream`` (default: the host) on /metrics
+    """
+
+    def __init__(self, pool_maxsize=20, connect_timeout=3.05, read_timeout=10,
+                 retries=2, backoff_factor=0.2, backoff_jitter=0.2,
+                 per_host_limit=20, acquire_timeout=5):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util import Retry
+        self.timeout = (connect_timeout, read_timeout)
+        self.per_host_limit = per_host_limit
+        self.acquire_timeout = acquire_timeout
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            status_forcelist=(502, 503, 504),
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._slots = {}
+        self._slots_lock = threading.Lock()
+
+    def _slot(self, host):
+        with self._slots_lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._slots[host]
+
+    def request(self, method, url, upstream=None, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).netloc
+        slot = self._slot(host)
+        if not slot.acquire(timeout=self.acquire_timeout):
+            raise _upstream_busy_error()(f"Too many concurrent requests to {host}")
+        try:
+            with outbound_call(upstream or host) as call:
+                response = self.session.request(method, url, **kwargs)
+                call['outcome'] = f"{response.status_code // 100}xx"
+                return response
+        finally:
+            slot.release()
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+def http_client():
+    """The app's shared HttpClient, built (and requests imported) on first use."""
+    client = current_app.extensions.get('http_client')
+    if client is None:
+        with _build_lock:
+            client = current_app.extensions.get('http_client')
+            if client is None:
+                config = current_app.config
+                client = current_app.extensions['http_client'] = HttpClient(
+                    pool_maxsize=config['HTTP_POOL_MAXSIZE'],
+                    connect_timeout=config['HTTP_CONNECT_TIMEOUT'],
+                    read_timeout=config['HTTP_READ_TIMEOUT'],
+                    retries=config['HTTP_RETRIES'],
+                    per_host_limit=config['HTTP_PER_HOST_LIMIT']
+                )
+    return client
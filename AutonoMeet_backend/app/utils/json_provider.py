@@ -0,0 +1,46 @@
+import json
+from flask import current_app, make_response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+def dumps(data):
+    """Encode ``data`` compactly, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, separators=(',', ':'))
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, falling back to the default one.
+
+    Dates and dataclasses still go through Flask's ``default`` so jsonify
+    output is unchanged; options orjson lacks use DefaultJSONProvider.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+def output_json(data, code, headers=None):
+    """flask-restx representation using the fast encoder (RESTX_JSON settings still win)."""
+    if current_app.config.get('RESTX_JSON'):
+        dumped = json.dumps(data, **current_app.config['RESTX_JSON'])
+    else:
+        dumped = dumps(data)
+    response = make_response(dumped + '\n', code)
+    response.headers.extend(headers or {})
+    return response
@@ -1,9 +1,20 @@
 import jwt
+import time
 from datetime import datetime, timedelta
-from flask import current_app, request, jsonify
+from flask import current_app, request
 from functools import wraps
+import inspect
 from jwt import ExpiredSignatureError, InvalidTokenError
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
 from app.models.user import User
+from app.utils.cache import get_cache
+from app.utils.replica import RoutingSession
+
+# Methods that may trust the token's claims; anything else changes data and
+# needs the user to still exist
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STALE_PRINCIPALS_KEY = 'stale_principals'
 
 def generate_access_token(user):
     expiration = datetime.utcnow() + timedelta(hours=2)
@@ -16,7 +27,80 @@ def generate_access_token(user):
     token = jwt.encode(payload, current_app.config['SECRET_KEY'], algorithm='HS256')
     return token
 
-def jwt_required(f=None, *, optional=False):
+class Principal:
+    """Authenticated caller handed to views as ``current_user``."""
+    __slots__ = ('id', 'email', 'is_freelancer', 'is_admin')
+
+    def __init__(self, id, email, is_freelancer, is_admin=False):
+        self.id = id
+        self.email = email
+        self.is_freelancer = is_freelancer
+        self.is_admin = is_admin
+
+    @classmethod
+    def from_user(cls, user):
+        is_admin = getattr(user, 'is_admin', False) or (
+            user.email is not None and user.email.lower() in current_app.config['ADMIN_EMAILS']
+        )
+        return cls(user.id, user.email, bool(user.is_freelancer), is_admin)
+
+    @classmethod
+    def from_claims(cls, payload):
+        return cls(int(payload['sub']), payload.get('email'), bool(payload.get('is_freelancer')))
+
+    def __repr__(self):
+        return f"<Principal(id={self.id}, email={self.email})>"
+
+def decode_token(token):
+    """Verify ``token`` and return its claims.
+
+    Signatures verified in the last TOKEN_CACHE_TTL seconds are not checked
+    again; expiry still is, on every call.
+    """
+    payload = get_cache('verified_tokens').get_or_load(
+        token,
+        lambda: jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    )
+    if payload['exp'] <= time.time():
+        raise ExpiredSignatureError("Signature has expired")
+    return payload
+
+def load_principal(user_id):
+    """Return the Principal for ``user_id``, cached for PRINCIPAL_CACHE_TTL seconds."""
+    def load():
+        user = User.query.filter_by(id=user_id).first()
+        return Principal.from_user(user) if user else None
+    return get_cache('principals').get_or_load(str(user_id), load)
+
+def invalidate_principal(user_id):
+    get_cache('principals').invalidate(str(user_id))
+
+# Any change to a user row drops its cached principal once the change commits,
+# whichever code path made it; bulk query.update()/delete() bypass these
+# events and must call invalidate_principal themselves
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _user_changed(mapper, connection, user):
+    object_session(user).info.setdefault(STALE_PRINCIPALS_KEY, set()).add(user.id)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _after_commit(session):
+    for user_id in session.info.pop(STALE_PRINCIPALS_KEY, ()):
+        invalidate_principal(user_id)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop(STALE_PRINCIPALS_KEY, None)
+
+def jwt_required(f=None, *, optional=False, claims_only=False):
+    """Authenticate the request and pass the caller as ``current_user``.
+
+    With ``claims_only`` the principal is built from the token alone on
+    GET/HEAD/OPTIONS, for views that only need the caller's id or freelancer
+    flag. Every other request, claims-only or not, needs the user to still
+    exist, which is checked through the principal cache; async views do that
+    lookup on the database threads.
+    """
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -24,29 +108,38 @@ def jwt_required(f=None, *, optional=False):
             if not token:
                 if optional:
                     return f(*args, **kwargs)
-                return jsonify({"message": "Missing token"}), 401
+                return {"message": "Missing token"}, 401
             
             try:
                 if token.startswith('Bearer '):
                     token = token.split(' ')[1]
-                payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-                # Query the User model using the 'sub' (user ID)
-                current_user = User.query.filter_by(id=payload['sub']).first()
-                if not current_user:
-                    return jsonify({"message": "User not found"}), 401
-                kwargs['current_user'] = current_user
+                payload = decode_token(token)
             except ExpiredSignatureError:
-                return jsonify({"message": "Token has expired"}), 401
+                return {"message": "Token has expired"}, 401
             except InvalidTokenError:
-                return jsonify({"message": "Invalid token"}), 401
-            
-            return f(*args, **kwargs)
+                return {"message": "Invalid token"}, 401
+
+            if claims_only and request.method in SAFE_METHODS:
+                return f(*args, current_user=Principal.from_claims(payload), **kwargs)
+            if inspect.iscoroutinefunction(f):
+                return _with_principal_async(f, payload['sub'], args, kwargs)
+            current_user = load_principal(payload['sub'])
+            if not current_user:
+                return {"message": "User not found"}, 401
+            return f(*args, current_user=current_user, **kwargs)
         return decorated_function
     
     if f is None:
         return decorator
     return decorator(f)
 
+async def _with_principal_async(f, user_id, args, kwargs):
+    from app.utils.async_views import run_db
+    current_user = await run_db(load_principal, user_id)
+    if not current_user:
+        return {"message": "User not found"}, 401
+    return await f(*args, current_user=current_user, **kwargs)
+
 def get_current_user():
     token = request.headers.get('Authorization')
     if not token:
@@ -55,8 +148,7 @@ def get_current_user():
     try:
         if token.startswith('Bearer '):
             token = token.split(' ')[1]
-        payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-        # Query the User model using the 'sub' (user ID)
-        return User.query.filter_by(id=payload['sub']).first()
+        payload = decode_token(token)
+        return load_principal(payload['sub'])
     except:
-        return None
\ No newline at end of file
+        return None
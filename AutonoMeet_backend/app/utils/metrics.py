@@ -0,0 +1,297 @@
+import hmac
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import partial
+from flask import Response, current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from app.utils.cache import cache_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+class _Sharded(ABC):
+    """Per-thread cells for one metric, merged only when scraped.
+
+    Each thread updates its own dict of label values -> cell, so recording
+    takes no lock; the registry lock is only taken the first time a thread
+    records and when the metric is collected. Cells of finished threads are
+    folded into ``_retired`` so worker churn does not grow the shard list.
+    """
+    kind = None
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = {}
+
+    def _cells(self):
+        try:
+            return self._local.cells
+        except AttributeError:
+            cells = self._local.cells = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), cells))
+            return cells
+
+    @abstractmethod
+    def _new_cell(self):
+        """A zeroed cell for one set of label values."""
+
+    def _merge(self, into, cells):
+        for labels, cell in list(cells.items()):
+            total = into.setdefault(labels, self._new_cell())
+            for i, value in enumerate(list(cell)):
+                total[i] += value
+
+    def collect(self):
+        """Return {label values: merged cell} across every thread."""
+        with self._lock:
+            alive = []
+            for thread, cells in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, cells))
+                else:
+                    self._merge(self._retired, cells)
+            self._shards = alive
+            merged = {}
+            self._merge(merged, self._retired)
+            for _, cells in alive:
+                self._merge(merged, cells)
+            return merged
+
+class Counter(_Sharded):
+    kind = 'counter'
+
+    def _new_cell(self):
+        return [0]
+
+    def inc(self, *labels, amount=1):
+        cells = self._cells()
+        cell = cells.get(labels)
+        if cell is None:
+            cell = cells[labels] = self._new_cell()
+        cell[0] += amount
+
+    def samples(self):
+        for labels, cell in sorted(self.collect().items()):
+            yield self.name + '_total', labels, (), cell[0]
+
+class Histogram(_Sharded):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames, buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_cell(self):
+        # One slot per bucket, one for +Inf, then the running sum
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def observe(self, value, *labels):
+        cells = self._cells()
+        cell = cells.get(labels)
+        if cell is None:
+            cell = cells[labels] = self._new_cell()
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def samples(self):
+        for labels, cell in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), cell):
+                cumulative += count
+                yield self.name + '_bucket', labels, (('le', _format_value(bound)),), cumulative
+            yield self.name + '_sum', labels, (), cell[-1]
+            yield self.name + '_count', labels, (), cumulative
+
+class Gauge:
+    """Values read at scrape time from state another component already keeps.
+
+    ``read`` returns {label values: number}; ``kind`` may be 'counter' for
+    running totals the component counts itself.
+    """
+
+    def __init__(self, name, documentation, labelnames, read, kind='gauge'):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.read = read
+        self.kind = kind
+
+    def samples(self):
+        suffix = '_total' if self.kind == 'counter' else ''
+        for labels, value in sorted(self.read().items()):
+            yield self.name + suffix, labels, (), value
+
+class MetricsRegistry:
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._metrics = {}
+
+    def _add(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Counter(self.prefix + name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(self.prefix + name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, read, labelnames=(), kind='gauge'):
+        return self._add(Gauge(self.prefix + name, documentation, labelnames, read, kind))
+
+    def __getitem__(self, name):
+        return self._metrics[self.prefix + name]
+
+    def render(self):
+        """The Prometheus text exposition of every metric."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample, labels, extra, value in metric.samples():
+                pairs = list(zip(metric.labelnames, labels)) + list(extra)
+                rendered = ','.join(f'{key}="{_escape(value)}"' for key, value in pairs)
+                lines.append(f"{sample}{{{rendered}}} {_format_value(value)}" if rendered
+                             else f"{sample} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return str(value)
+
+def build_registry(prefix='autonomeet_'):
+    registry = MetricsRegistry(prefix)
+    route = ('namespace', 'resource')
+    registry.histogram('http_request_duration_seconds', 'Request latency per API namespace and resource.',
+                       route + ('method', 'status'))
+    registry.histogram('db_queries_per_request', 'Database queries issued while serving one request.',
+                       route, QUERY_COUNT_BUCKETS)
+    registry.histogram('db_time_per_request_seconds', 'Time spent in database queries while serving one request.',
+                       route)
+    registry.histogram('db_query_duration_seconds', 'Latency of individual database queries.', ('bind',))
+    registry.histogram('outbound_request_duration_seconds', 'Latency of calls to Stripe, Google and GitHub.',
+                       ('upstream', 'outcome'))
+    registry.histogram('password_hash_duration_seconds', 'Time to hash or verify a password, queueing included.')
+    return registry
+
+def get_registry():
+    return current_app.extensions.get('metrics') if has_app_context() else None
+
+@contextmanager
+def outbound_call(upstream):
+    """Time one call to an external API under the ``upstream`` label.
+
+    The outcome label is 'ok' unless the block raises; callers with an HTTP
+    response can refine it by setting ``call['outcome']`` on the yielded dict.
+    """
+    call = {'outcome': 'ok'}
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        call['outcome'] = 'error'
+        raise
+    finally:
+        registry = get_registry()
+        if registry is not None:
+            registry['outbound_request_duration_seconds'].observe(
+                time.perf_counter() - started, upstream, call['outcome']
+            )
+
+def _route_labels(app):
+    endpoint = request.endpoint
+    if endpoint is None:
+        return '', 'unmatched'
+    view_class = getattr(app.view_functions.get(endpoint), 'view_class', None)
+    namespace = app.extensions['metrics_namespaces'].get(view_class)
+    if namespace is None:
+        return '', endpoint
+    return namespace, view_class.__name__
+
+def _cache_stat(stat):
+    return {(name,): stats[stat] for name, stats in cache_stats().items()}
+
+def _watch_engine(registry, bind, engine):
+    queries = registry['db_query_duration_seconds']
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        queries.observe(elapsed, bind)
+        if has_request_context():
+            g.db_queries = g.get('db_queries', 0) + 1
+            g.db_seconds = g.get('db_seconds', 0.0) + elapsed
+
+def init_metrics(app, api):
+    """Record request, database, outbound and hashing latencies and serve them on /metrics with cache counters."""
+    if not app.config['METRICS_ENABLED']:
+        return
+    registry = app.extensions['metrics'] = build_registry()
+    app.extensions['metrics_namespaces'] = {
+        route.resource: namespace.name for namespace in api.namespaces for route in namespace.resources
+    }
+    with app.app_context():
+        engines = app.extensions['sqlalchemy'].engines
+        for bind, engine in engines.items():
+            _watch_engine(registry, bind or 'default', engine)
+
+    hasher = app.extensions['password_hasher']
+    registry.gauge('password_hash_in_flight', 'Password hashes queued or running.',
+                   lambda: {(): hasher.stats()['in_flight']})
+    registry.gauge('password_hash_queue_depth', 'Password hashes waiting for a worker process.',
+                   lambda: {(): hasher.stats()['queue_depth']})
+    registry.gauge('password_hash_rejected', 'Password hashes refused because the queue stayed full.',
+                   lambda: {(): hasher.stats()['rejected']}, kind='counter')
+    for stat, documentation, kind in (('hits', 'Lookups served from a cache.', 'counter'),
+                                      ('misses', 'Lookups a cache had to load.', 'counter'),
+                                      ('size', 'Entries held by a cache.', 'gauge')):
+        registry.gauge(f'cache_{stat}', documentation, partial(_cache_stat, stat), ('cache',), kind)
+
+    requests = registry['http_request_duration_seconds']
+    query_counts = registry['db_queries_per_request']
+    query_time = registry['db_time_per_request_seconds']
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+        g.db_queries = 0
+        g.db_seconds = 0.0
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('metrics_started')
+        if started is not None:
+            namespace, resource = _route_labels(app)
+            requests.observe(time.perf_counter() - started, namespace, resource, request.method,
+                             str(response.status_code))
+            query_counts.observe(g.db_queries, namespace, resource)
+            query_time.observe(g.db_seconds, namespace, resource)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        # Closed until a token is configured: the metrics name every route and upstream
+        token = app.config['METRICS_TOKEN']
+        if not token or not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return Response('Forbidden\n', status=403, content_type='text/plain')
+        return Response(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,169 @@
+import importlib
+import os
+import pkgutil
+import re
+from collections import namedtuple
+from datetime import datetime
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, inspect, select
+from sqlalchemy.schema import CreateColumn
+from app import db
+
+MIGRATIONS_PACKAGE = 'app.migrations'
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+MODULE_NAME = re.compile(r'^v(\d{4})_\w+$')
+
+# Bookkeeping table: one row per applied migration
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('version', Integer, primary_key=True),
+    Column('name', String(255), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+Migration = namedtuple('Migration', ['version', 'name', 'module'])
+
+def load_migrations():
+    """Every migration under app/migrations, in version order.
+
+    Modules are named ``vNNNN_description.py`` and define ``upgrade(conn)``
+    and ``downgrade(conn)``. A module setting ``transactional = False`` runs
+    in autocommit mode (e.g. for Postgres ``CREATE INDEX CONCURRENTLY``).
+    """
+    migrations = []
+    for info in pkgutil.iter_modules([MIGRATIONS_DIR]):
+        match = MODULE_NAME.match(info.name)
+        if match:
+            module = importlib.import_module(f'{MIGRATIONS_PACKAGE}.{info.name}')
+            migrations.append(Migration(int(match.group(1)), info.name, module))
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError("Duplicate migration versions")
+    return migrations
+
+def applied_versions(engine=None):
+    engine = engine or db.engine
+    with engine.begin() as conn:
+        schema_migrations.create(conn, checkfirst=True)
+        return [row.version for row in conn.execute(select(schema_migrations.c.version).order_by(schema_migrations.c.version))]
+
+def _run(engine, migration, step):
+    if getattr(migration.module, 'transactional', True):
+        with engine.begin() as conn:
+            getattr(migration.module, step)(conn)
+            _record(conn, migration, step)
+    else:
+        with engine.connect() as conn:
+            conn = conn.execution_options(isolation_level='AUTOCOMMIT')
+            getattr(migration.module, step)(conn)
+            _record(conn, migration, step)
+
+def _record(conn, migration, step):
+    if step == 'upgrade':
+        conn.execute(schema_migrations.insert().values(
+            version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+        ))
+    else:
+        conn.execute(schema_migrations.delete().where(schema_migrations.c.version == migration.version))
+
+def upgrade(target=None, engine=None):
+    """Apply pending migrations up to ``target`` (default: latest); returns those applied."""
+    engine = engine or db.engine
+    done = set(applied_versions(engine))
+    pending = [m for m in load_migrations() if m.version not in done and (target is None or m.version <= target)]
+    for migration in pending:
+        current_app.logger.info("Applying migration %s", migration.name)
+        _run(engine, migration, 'upgrade')
+    return pending
+
+def downgrade(target, engine=None):
+    """Revert applied migrations newer than ``target`` (0 reverts everything); returns those reverted."""
+    engine = engine or db.engine
+    done = set(applied_versions(engine))
+    reverting = [m for m in reversed(load_migrations()) if m.version in done and m.version > target]
+    for migration in reverting:
+        current_app.logger.info("Reverting migration %s", migration.name)
+        _run(engine, migration, 'downgrade')
+    return reverting
+
+# Helpers for migration modules. They check before acting so a migration can
+# adopt a database whose schema was previously created by db.create_all().
+
+def has_table(conn, table):
+    return inspect(conn).has_table(table)
+
+def has_column(conn, table, column):
+    return any(c['name'] == column for c in inspect(conn).get_columns(table))
+
+def has_index(conn, table, name):
+    return any(i['name'] == name for i in inspect(conn).get_indexes(table))
+
+def add_column(conn, table, column):
+    """ALTER TABLE ... ADD COLUMN; foreign keys declared on ``column`` are added where supported."""
+    if has_column(conn, table, column.name):
+        return
+    Table(table, MetaData(), column)
+    conn.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN {CreateColumn(column).compile(dialect=conn.dialect)}')
+    if conn.dialect.name == 'sqlite':
+        return
+    for foreign_key in column.foreign_keys:
+        referenced_table, referenced_column = foreign_key.target_fullname.split('.')
+        conn.exec_driver_sql(
+            f'ALTER TABLE {table} ADD CONSTRAINT fk_{table}_{column.name} '
+            f'FOREIGN KEY ({column.name}) REFERENCES {referenced_table} ({referenced_column})'
+        )
+
+def drop_column(conn, table, column):
+    if not has_column(conn, table, column):
+        return
+    if conn.dialect.name != 'sqlite':
+        conn.exec_driver_sql(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS fk_{table}_{column}')
+    conn.exec_driver_sql(f'ALTER TABLE {table} DROP COLUMN {column}')
+
+def set_not_null(conn, table, column):
+    """Tighten a backfilled column; SQLite cannot alter columns, so there it stays nullable."""
+    if conn.dialect.name != 'sqlite':
+        conn.exec_driver_sql(f'ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL')
+
+def create_index(conn, name, table, *columns, unique=False, using=None):
+    """CREATE INDEX; ``using`` picks a Postgres access method such as 'gin'."""
+    if has_index(conn, table, name):
+        return
+    target = Table(table, MetaData(), *(Column(column) for column in columns))
+    Index(name, *(target.c[column] for column in columns), unique=unique,
+          postgresql_concurrently=_autocommit(conn), postgresql_using=using).create(conn)
+
+def drop_index(conn, name, table):
+    if not has_index(conn, table, name):
+        return
+    concurrently = 'CONCURRENTLY ' if conn.dialect.name == 'postgresql' and _autocommit(conn) else ''
+    conn.exec_driver_sql(f'DROP INDEX {concurrently}{name}')
+
+def _autocommit(conn):
+    return conn.get_execution_options().get('isolation_level') == 'AUTOCOMMIT'
+
+migrations_cli = AppGroup('db', help='Apply or revert schema migrations.')
+
+@migrations_cli.command('upgrade')
+@click.argument('target', type=int, required=False)
+def upgrade_command(target):
+    """Apply pending migrations (up to TARGET)."""
+    applied = upgrade(target)
+    click.echo('\n'.join(f'Applied {m.name}' for m in applied) or 'Schema is up to date')
+
+@migrations_cli.command('downgrade')
+@click.argument('target', type=int)
+def downgrade_command(target):
+    """Revert migrations newer than TARGET (0 reverts all)."""
+    reverted = downgrade(target)
+    click.echo('\n'.join(f'Reverted {m.name}' for m in reverted) or 'Nothing to revert')
+
+@migrations_cli.command('status')
+def status_command():
+    """List migrations and whether each is applied."""
+    done = set(applied_versions())
+    for migration in load_migrations():
+        click.echo(f"{'applied' if migration.version in done else 'pending':<8} {migration.name}")
@@ -0,0 +1,121 @@
+import base64
+import json
+import math
+from collections import namedtuple
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import tuple_
+from app import db
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+PAGE_PARAMS = {
+    'limit': 'Maximum items per page',
+    'after': "Opaque cursor from the previous page's 'next' field"
+}
+
+Page = namedtuple('Page', ['items', 'next_cursor'])
+
+def encode_cursor(values, scope=None):
+    """Opaque cursor for ``values``; a ``scope`` ties it to the listing that issued it."""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(values if scope is None else {'scope': scope, 'values': values})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, order_by, scope=None):
+    """The ``order_by`` values of a cursor; raises ValueError unless it was issued for ``scope``."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if scope is not None:
+        if not isinstance(values, dict) or values.get('scope') != scope:
+            raise ValueError("Cursor belongs to a different sort or filter")
+        values = values.get('values')
+    if not isinstance(values, list) or len(values) != len(order_by):
+        raise ValueError("Invalid cursor")
+    return [_cursor_value(column, value) for column, value in zip(order_by, values)]
+
+def _cursor_value(column, value):
+    """``value`` as the Python type of ``column``; raises ValueError when it cannot be one.
+
+    Cursors come from clients, so a value of the wrong type must never reach
+    the comparison (SQLite would compare it anyway, Postgres would fail).
+    """
+    python_type = column.type.python_type
+    if python_type is datetime:
+        try:
+            return datetime.fromisoformat(value)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+    if python_type is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+        if math.isfinite(value):
+            return float(value)
+    elif isinstance(value, python_type) and not isinstance(value, bool):
+        return value
+    raise ValueError("Invalid cursor")
+
+def page_args(args):
+    """Read 'limit' and 'after' from a request's query string.
+
+    Raises ValueError with a client-facing message when they are malformed.
+    """
+    default_limit = current_app.config['PAGINATION_DEFAULT_LIMIT']
+    max_limit = current_app.config['PAGINATION_MAX_LIMIT']
+    try:
+        limit = int(args.get('limit', default_limit))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 0 < limit <= max_limit:
+        raise ValueError(f"limit must be between 1 and {max_limit}")
+    return limit, args.get('after')
+
+def paginate(query, order_by, limit, after=None):
+    """Return one keyset page of ``query`` ordered by the ``order_by`` columns.
+
+    The columns must end with a unique key so the ordering is total; the
+    next page then starts strictly after the last row's values, which the
+    database answers with an index seek however deep the page is.
+    """
+    if after:
+        query = query.filter(_after(order_by, after))
+    return _page(query.order_by(*order_by).limit(limit + 1).all(), order_by, limit)
+
+def paginate_rows(statement, order_by, limit, after=None, descending=False, scope=None):
+    """Like paginate, for a Core select: returns plain rows, no ORM entities.
+
+    The select must expose each ``order_by`` column under its own key.
+    ``descending`` reverses every column, which keeps the order total and
+    the seek a single index range scan read backwards. Listings whose sort
+    or filters vary pass a ``scope`` naming them, so a cursor is only
+    accepted by the listing that issued it.
+    """
+    if after:
+        statement = statement.where(_after(order_by, after, descending, scope))
+    ordering = [column.desc() for column in order_by] if descending else order_by
+    rows = db.session.execute(statement.order_by(*ordering).limit(limit + 1)).all()
+    return _page(rows, order_by, limit, scope)
+
+def _after(order_by, after, descending=False, scope=None):
+    values = decode_cursor(after, order_by, scope)
+    if descending:
+        return tuple_(*order_by) < tuple_(*values)
+    return tuple_(*order_by) > tuple_(*values)
+
+def _page(rows, order_by, limit, scope=None):
+    if len(rows) <= limit:
+        return Page(rows, None)
+    rows = rows[:limit]
+    last = rows[-1]
+    return Page(rows, encode_cursor([getattr(last, column.key) for column in order_by], scope))
+
+def page_headers(page):
+    return {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+
+def page_response(items, page, status_code=200):
+    """A list endpoint's response: the page's items and the cursor of the next page (null on the last).
+
+    The cursor is also sent in the X-Next-Cursor header.
+    """
+    return {'items': items, 'next': page.next_cursor}, status_code, page_headers(page)
@@ -0,0 +1,103 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.metrics import get_registry
+
+class HashingBusyError(Exception):
+    """Raised when the hashing queue stays full for longer than the queue timeout."""
+
+class PasswordHasher:
+    """Runs werkzeug's password KDFs off the request threads, with bounded queueing.
+
+    Hashes run in a process pool so they neither hold the GIL nor block
+    threads serving other requests. At most ``max_pending`` hashes may be
+    queued or running; callers wait up to ``queue_timeout`` seconds for a
+    place, then get HashingBusyError. ``workers=0`` hashes inline.
+    """
+
+    def __init__(self, method, workers, max_pending, queue_timeout):
+        self.method = method
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    @cached_property
+    def canonical_method(self):
+        # werkzeug expands bare names like 'scrypt' into their full parameters
+        return generate_password_hash('', self.method).split('$', 1)[0]
+
+    def _pool(self):
+        with self._executor_lock:
+            if self._executor is None:
+                # Forking copies whatever locks other request threads hold at that moment
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                context = multiprocessing.get_context(method)
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._stats_lock:
+                self._rejected += 1
+            raise HashingBusyError("Password hashing queue is full")
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._in_flight += 1
+        try:
+            if self.workers:
+                return self._pool().submit(fn, *args).result()
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                self._in_flight -= 1
+                self._completed += 1
+                self._total_seconds += elapsed
+                self._max_seconds = max(self._max_seconds, elapsed)
+            self._slots.release()
+            registry = get_registry()
+            if registry is not None:
+                registry['password_hash_duration_seconds'].observe(elapsed)
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split('$', 1)[0] != self.canonical_method
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'in_flight': self._in_flight,
+                'queue_depth': max(0, self._in_flight - self.workers) if self.workers else 0,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'avg_latency_ms': 1000 * self._total_seconds / self._completed if self._completed else 0.0,
+                'max_latency_ms': 1000 * self._max_seconds
+            }
+
+def init_password_hasher(app):
+    app.extensions['password_hasher'] = PasswordHasher(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+        queue_timeout=app.config['PASSWORD_HASH_QUEUE_TIMEOUT']
+    )
+
+def password_hasher():
+    return current_app.extensions['password_hasher']
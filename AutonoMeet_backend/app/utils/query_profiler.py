@@ -0,0 +1,136 @@
+import logging
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_IN_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)')
+_SPACE = re.compile(r'\s+')
+
+def normalize(statement):
+    """Statement text with IN lists collapsed, so calls differing only by parameters match."""
+    return _IN_LIST.sub('(?)', _SPACE.sub(' ', statement).strip())
+
+def call_site():
+    """``path:line in function`` of the innermost app frame outside this module."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIR) and filename != __file__:
+            return f"{os.path.relpath(filename, os.path.dirname(APP_DIR))}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+class StatementStats:
+    __slots__ = ('statement', 'count', 'seconds', 'site')
+
+    def __init__(self, statement):
+        self.statement = statement
+        self.count = 0
+        self.seconds = 0.0
+        self.site = None
+
+class QueryProfile:
+    """Statements executed during one request or ``profile_queries`` block."""
+
+    def __init__(self):
+        self.statements = {}
+        self.count = 0
+        self.seconds = 0.0
+
+    def record(self, statement, seconds):
+        key = normalize(statement)
+        stats = self.statements.get(key)
+        if stats is None:
+            stats = self.statements[key] = StatementStats(key)
+        stats.count += 1
+        stats.seconds += seconds
+        if stats.count == 2:
+            # Only repeats need a call site, and walking the stack is not free
+            stats.site = call_site()
+        self.count += 1
+        self.seconds += seconds
+
+    def repeated(self, threshold):
+        """Statements run at least ``threshold`` times: likely N+1 lazy loads."""
+        return sorted(
+            (stats for stats in self.statements.values() if stats.count >= threshold),
+            key=lambda stats: stats.count, reverse=True
+        )
+
+    def report(self, repeat_threshold=2):
+        lines = [f"{self.count} statements in {self.seconds * 1000:.1f} ms"]
+        for stats in sorted(self.statements.values(), key=lambda stats: stats.count, reverse=True):
+            flag = '  <-- repeated' if stats.count >= repeat_threshold else ''
+            site = f" at {stats.site}" if stats.site else ''
+            lines.append(f"  {stats.count}x {stats.seconds * 1000:.1f} ms{site}: {stats.statement[:300]}{flag}")
+        return '\n'.join(lines)
+
+def _listen(engines, on_statement):
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._profiler_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        on_statement(statement, time.perf_counter() - context._profiler_started)
+
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+    def remove():
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+            event.remove(engine, 'after_cursor_execute', after_cursor_execute)
+    return remove
+
+@contextmanager
+def profile_queries(engines=None):
+    """Collect every statement run on ``engines`` (default: all of db's) into a QueryProfile."""
+    if engines is None:
+        from app import db
+        engines = list(db.engines.values())
+    profile = QueryProfile()
+    remove = _listen(engines, profile.record)
+    try:
+        yield profile
+    finally:
+        remove()
+
+def init_query_profiler(app):
+    """Opt-in (SQL_PROFILER) per-request statement counts, N+1 warnings and slow-query log."""
+    if not app.config['SQL_PROFILER']:
+        return
+    slow_seconds = app.config['SQL_SLOW_QUERY_MS'] / 1000
+    repeat_threshold = app.config['SQL_REPEAT_THRESHOLD']
+
+    def on_statement(statement, seconds):
+        if seconds >= slow_seconds:
+            logger.warning("Slow query (%.1f ms) at %s: %s", seconds * 1000, call_site(), normalize(statement))
+        if has_request_context() and 'query_profile' in g:
+            g.query_profile.record(statement, seconds)
+
+    with app.app_context():
+        _listen(list(app.extensions['sqlalchemy'].engines.values()), on_statement)
+
+    @app.before_request
+    def start_query_profile():
+        g.query_profile = QueryProfile()
+
+    @app.after_request
+    def report_query_profile(response):
+        profile = g.pop('query_profile', None)
+        if profile is None:
+            return response
+        for stats in profile.repeated(repeat_threshold):
+            logger.warning("Possible N+1 in %s %s: %dx at %s: %s", request.method, request.path,
+                           stats.count, stats.site, stats.statement[:300])
+        logger.info("%s %s ran %d statements in %.1f ms", request.method, request.path,
+                    profile.count, profile.seconds * 1000)
+        response.headers['X-Query-Count'] = str(profile.count)
+        return response
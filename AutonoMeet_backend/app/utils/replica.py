@@ -0,0 +1,103 @@
+import threading
+from functools import wraps
+from cachetools import TTLCache
+from flask import current_app, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql.expression import UpdateBase
+
+REPLICA_BIND = 'replica'
+
+class RoutingSession(Session):
+    """Session that sends reads made inside ``read_replica`` calls to the replica bind.
+
+    Everything else goes to the primary: flushes, Core INSERT/UPDATE/DELETE,
+    and every read once this session has written (read-your-writes), or
+    when the current caller wrote within DB_REPLICA_STICKY_SECONDS. Callers
+    are told apart by their Authorization header, so the window also covers
+    the anonymous GET routes a client hits right after its own write.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('read_replica') and not self._flushing:
+            if isinstance(clause, UpdateBase):
+                _mark_written(self)
+            elif not self.info.get('wrote') and not _caller_is_sticky():
+                replica = self._db.engines.get(REPLICA_BIND)
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _after_flush(session, flush_context):
+    _mark_written(session)
+
+def _caller():
+    return request.headers.get('Authorization') if has_request_context() else None
+
+def _mark_written(session):
+    session.info['wrote'] = True
+    caller = _caller()
+    sticky = current_app.extensions.get('replica_sticky')
+    if caller and sticky is not None:
+        sticky.touch(caller)
+
+def _caller_is_sticky():
+    caller = _caller()
+    sticky = current_app.extensions.get('replica_sticky')
+    return bool(caller) and sticky is not None and caller in sticky
+
+class StickyCallers:
+    """Callers who wrote recently and must keep reading from the primary."""
+
+    def __init__(self, maxsize, ttl):
+        self._recent = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def touch(self, caller):
+        with self._lock:
+            self._recent[caller] = True
+
+    def __contains__(self, caller):
+        with self._lock:
+            return caller in self._recent
+
+def read_replica(f):
+    """Run a read-only service call against the replica bind, when one is configured."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        session = current_app.extensions['sqlalchemy'].session()
+        outer = session.info.get('read_replica', False)
+        session.info['read_replica'] = True
+        try:
+            return f(*args, **kwargs)
+        finally:
+            session.info['read_replica'] = outer
+    return decorated_function
+
+def pinned_to_primary():
+    """Whether reads of the current session and caller must come from the primary.
+
+    True once the session wrote, or while the caller is in its sticky
+    window, and only when a replica is configured. Shared caches are filled
+    from the replica by everyone else, so callers pinned to the primary must
+    bypass them too, or they could read their own write's previous value.
+    """
+    if current_app.extensions.get('replica_sticky') is None:
+        return False
+    session = current_app.extensions['sqlalchemy'].session()
+    return bool(session.info.get('wrote')) or _caller_is_sticky()
+
+def replica_binds(config, engine_options):
+    """SQLALCHEMY_BINDS with the replica added when SQLALCHEMY_REPLICA_URI is set."""
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    uri = config.get('SQLALCHEMY_REPLICA_URI')
+    if uri:
+        binds[REPLICA_BIND] = {'url': uri, **engine_options(config, uri)}
+    return binds
+
+def init_replica(app):
+    if app.config.get('SQLALCHEMY_REPLICA_URI'):
+        app.extensions['replica_sticky'] = StickyCallers(
+            app.config['AUTH_CACHE_MAXSIZE'], app.config['DB_REPLICA_STICKY_SECONDS']
+        )
@@ -0,0 +1,247 @@
+"""Ranked full-text search over the service catalogue.
+
+A service's document is its title, its category's name and its description,
+weighted in that order. On Postgres the document is kept in the
+``services.search_vector`` tsvector column behind a GIN index (migration
+v0005) and queries run as ``@@`` matches ranked with ts_rank. Other
+databases (SQLite in tests and local runs) get an in-process inverted
+index instead, built from the database on the first search. Like the
+booking locks' fallback, it only covers this process: it sees the writes
+made here, not writes made by other workers.
+
+Code that changes a service's title, description or category, deletes a
+service or renames a category calls reindex_services before committing.
+"""
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left
+from flask import current_app
+from sqlalchemy import column, event, func, literal_column, select, table, true, update
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from app import db
+from app.utils.replica import RoutingSession
+
+TEXT_SEARCH_CONFIG = 'english'
+MAX_QUERY_LENGTH = 200
+MAX_QUERY_TERMS = 8
+# A shorter last term only matches whole words; 'p' would expand to most of the vocabulary
+MIN_PREFIX_LENGTH = 2
+# Document fields and their weight labels; the in-process index scores the
+# labels with ts_rank's default weights so both backends rank alike
+FIELDS = (('title', 'A'), ('category_name', 'B'), ('description', 'C'))
+LABEL_WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2}
+TOKEN = re.compile(r'\w+')
+PENDING_KEY = 'search_reindex'
+
+services = table('services', column('id'), column('category_id'), column('title'), column('description'),
+                 column('search_vector', TSVECTOR))
+categories = table('categories', column('id'), column('name'))
+
+def tokenize(text):
+    return TOKEN.findall(text.lower()) if text else []
+
+def parse_query(text):
+    """The distinct terms of a search query, in order.
+
+    Raises ValueError with a client-facing message when it has no terms or
+    is too long. The last term also matches as a prefix (from
+    MIN_PREFIX_LENGTH characters), so results keep up with a query that is
+    still being typed.
+    """
+    if not text or not text.strip():
+        raise ValueError("q is required")
+    if len(text) > MAX_QUERY_LENGTH:
+        raise ValueError(f"q must be at most {MAX_QUERY_LENGTH} characters")
+    terms = list(dict.fromkeys(tokenize(text)))
+    if not terms:
+        raise ValueError("q must contain at least one word")
+    if len(terms) > MAX_QUERY_TERMS:
+        raise ValueError(f"q must have at most {MAX_QUERY_TERMS} words")
+    return terms
+
+def _is_postgres():
+    return db.session.get_bind().dialect.name == 'postgresql'
+
+def _weighted(value, label):
+    config = literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig")
+    return func.setweight(func.to_tsvector(config, func.coalesce(value, '')), label)
+
+def search_vector():
+    """SQL for a service's weighted tsvector, evaluated against the ``services`` row it updates."""
+    category_name = select(categories.c.name).where(categories.c.id == services.c.category_id).scalar_subquery()
+    values = {'title': services.c.title, 'category_name': category_name, 'description': services.c.description}
+    title, *rest = (_weighted(values[field], label) for field, label in FIELDS)
+    vector = title
+    for weighted in rest:
+        vector = vector.op('||')(weighted)
+    return vector
+
+def reindex_services(service_id=None, category_id=None):
+    """Refresh the search document of one service, of every service in a category, or of all of them.
+
+    Call it inside the writing transaction, before the commit: the
+    Postgres column is updated in that transaction, and the in-process
+    index picks the services up once the commit succeeds. A deleted
+    service must be reindexed before its row is deleted.
+    """
+    if service_id is not None:
+        condition = services.c.id == service_id
+    elif category_id is not None:
+        condition = services.c.category_id == category_id
+    else:
+        condition = true()
+    if _is_postgres():
+        db.session.execute(update(services).where(condition).values(search_vector=search_vector()))
+    else:
+        service_ids = db.session.execute(select(services.c.id).where(condition)).scalars()
+        db.session.info.setdefault(PENDING_KEY, set()).update(service_ids)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _after_commit(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        current_app.extensions['search_index'].mark_stale(pending)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop(PENDING_KEY, None)
+
+def search(statement, terms, limit):
+    """Rows of ``statement``, a select over ``services``, matching every term; best match first."""
+    if _is_postgres():
+        query = func.to_tsquery(literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig"), _tsquery(terms))
+        vector = literal_column('services.search_vector')
+        statement = (statement.where(vector.bool_op('@@')(query))
+                     .order_by(func.ts_rank(vector, query).desc(), literal_column('services.id'))
+                     .limit(limit))
+        return db.session.execute(statement).all()
+    service_ids = current_app.extensions['search_index'].search(terms, limit)
+    if not service_ids:
+        return []
+    rows = {row.id: row for row in db.session.execute(statement.where(literal_column('services.id').in_(service_ids)))}
+    return [rows[service_id] for service_id in service_ids if service_id in rows]
+
+def _tsquery(terms):
+    # Terms are runs of word characters, so none of them is tsquery syntax
+    last = f'{terms[-1]}:*' if len(terms[-1]) >= MIN_PREFIX_LENGTH else terms[-1]
+    return ' & '.join(terms[:-1] + [last])
+
+class InvertedIndex:
+    """In-process term -> {service_id: weight} postings for databases without full-text search.
+
+    Built on the first search and brought up to date with the services
+    marked stale before each search after that. One lock guards it all:
+    searches are pure Python, so under the GIL they would not run in
+    parallel anyway.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = None
+        self._documents = {}
+        self._vocabulary = None
+        self._stale = set()
+
+    def mark_stale(self, service_ids):
+        with self._lock:
+            if self._postings is not None:
+                self._stale.update(service_ids)
+
+    def build(self):
+        with self._lock:
+            self._build()
+
+    def search(self, terms, limit):
+        """Ids of up to ``limit`` services matching every term (the last also as a prefix), best first."""
+        with self._lock:
+            if self._postings is None:
+                self._build()
+            elif self._stale:
+                self._refresh()
+            documents = len(self._documents)
+            matches = [self._postings.get(term, {}) for term in terms[:-1]]
+            last = terms[-1]
+            matches.append(self._prefix_postings(last) if len(last) >= MIN_PREFIX_LENGTH else self._postings.get(last, {}))
+            matches.sort(key=len)
+            if not matches[0]:
+                return []
+            if len(matches) == 1:
+                # One term ranks by its weight alone; no need to score
+                scores = matches[0]
+            else:
+                idf = [math.log(1 + documents / len(postings)) for postings in matches]
+                scores = {}
+                for service_id in matches[0]:
+                    score = 0.0
+                    for postings, weight in zip(matches, idf):
+                        term_weight = postings.get(service_id)
+                        if term_weight is None:
+                            break
+                        score += term_weight * weight
+                    else:
+                        scores[service_id] = score
+            best = heapq.nsmallest(limit, scores.items(), key=_best_first)
+        return [service_id for service_id, _ in best]
+
+    def _prefix_postings(self, prefix):
+        """Postings of every term starting with ``prefix``, keeping each service's best weight."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        merged = {}
+        position = bisect_left(self._vocabulary, prefix)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(prefix):
+            for service_id, weight in self._postings[self._vocabulary[position]].items():
+                if weight > merged.get(service_id, 0):
+                    merged[service_id] = weight
+            position += 1
+        return merged
+
+    def _build(self):
+        self._postings = {}
+        self._documents = {}
+        self._vocabulary = None
+        self._stale = set()
+        for row in db.session.execute(_documents().execution_options(yield_per=1000)):
+            self._add(row)
+
+    def _refresh(self):
+        stale, self._stale = self._stale, set()
+        for service_id in stale:
+            self._remove(service_id)
+        for row in db.session.execute(_documents().where(services.c.id.in_(list(stale)))):
+            self._add(row)
+
+    def _add(self, row):
+        weights = {}
+        for field, label in FIELDS:
+            for term in tokenize(getattr(row, field)):
+                weights[term] = weights.get(term, 0) + LABEL_WEIGHTS[label]
+        self._documents[row.id] = tuple(weights)
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._vocabulary = None
+            postings[row.id] = weight
+
+    def _remove(self, service_id):
+        for term in self._documents.pop(service_id, ()):
+            postings = self._postings[term]
+            del postings[service_id]
+            if not postings:
+                del self._postings[term]
+                self._vocabulary = None
+
+def _best_first(item):
+    service_id, score = item
+    return -score, service_id
+
+def _documents():
+    return select(
+        services.c.id, services.c.title, services.c.description, categories.c.name.label('category_name')
+    ).select_from(services.outerjoin(categories, categories.c.id == services.c.category_id))
+
+def init_search_index(app):
+    app.extensions['search_index'] = InvertedIndex()
@@ -0,0 +1,26 @@
+from flask import Response, stream_with_context
+from app.utils.json_provider import dumps
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_FORMATS = ('ndjson',)
+STREAM_PARAMS = {'stream': "Set to 'ndjson' to stream every row as newline-delimited JSON"}
+
+ROWS_PER_CHUNK = 200
+
+def ndjson_response(rows, serialize):
+    """Stream ``rows`` as newline-delimited JSON without materializing them.
+
+    ``rows`` should be a lazily evaluated query (see ``yield_per``); lines
+    are flushed in small chunks so memory stays flat whatever the row count.
+    """
+    def generate():
+        chunk = []
+        for row in rows:
+            chunk.append(dumps(serialize(row)))
+            if len(chunk) == ROWS_PER_CHUNK:
+                yield '\n'.join(chunk) + '\n'
+                chunk = []
+        if chunk:
+            yield '\n'.join(chunk) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,10 @@
+from flask import current_app
+
+def stripe_client():
+    """The stripe module, imported on first use and keyed from the app config.
+
+    Importing stripe costs most of a second, so only the payment paths pay it.
+    """
+    import stripe
+    stripe.api_key = current_app.config['STRIPE_SECRET_KEY']
+    return stripe
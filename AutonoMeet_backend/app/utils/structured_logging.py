@@ -0,0 +1,136 @@
+import atexit
+import itertools
+import logging
+import queue
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import has_request_context, request
+from app.utils.json_provider import dumps
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+_PLAIN = (str, int, float, bool, type(None))
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, call site, extras."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value if isinstance(value, _PLAIN) else str(value)
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return dumps(entry)
+
+class DebugSampler(logging.Filter):
+    """Let through one in every ``1 / rate`` DEBUG records; other levels always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._seen = itertools.count()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        return self.every != 0 and next(self._seen) % self.every == 0
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves message formatting to the writer thread.
+
+    The stock handler formats every record before queueing it; here only
+    what must be captured on the calling thread is: request fields, and
+    arguments that are not plain values (e.g. ORM objects, which must not
+    be touched from another thread). A full queue drops the record rather
+    than block the request.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        if record.args:
+            args = record.args if isinstance(record.args, tuple) else (record.args,)
+            if not all(isinstance(arg, _PLAIN) for arg in args):
+                record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if has_request_context():
+            record.method = request.method
+            record.path = request.path
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LogPipeline:
+    """The process-wide queue, its handler and the background writer thread."""
+
+    def __init__(self, stream, formatter, queue_size):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.handler = DeferredQueueHandler(self.queue)
+        writer = logging.StreamHandler(stream)
+        writer.setFormatter(formatter)
+        self.listener = QueueListener(self.queue, writer, respect_handler_level=False)
+        self.listener.start()
+
+    def flush(self, timeout=5):
+        """Wait until the writer has drained everything queued so far."""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def stop(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+        if self.handler.dropped:
+            sys.stderr.write(f"{self.handler.dropped} log records were dropped (queue full)\n")
+
+_pipeline = None
+
+def init_logging(app, stream=None):
+    """Route every log record through one queue to a background writer.
+
+    LOG_LEVEL sets the root level, LOG_FORMAT picks 'json' or 'text' lines,
+    and LOG_DEBUG_SAMPLE_RATE thins out DEBUG records. The pipeline is shared
+    by every app in the process; later calls only change level and sampling.
+    """
+    global _pipeline
+    config = app.config
+    if _pipeline is None:
+        formatter = JsonFormatter() if config['LOG_FORMAT'] == 'json' else logging.Formatter(
+            '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
+        )
+        _pipeline = LogPipeline(stream or sys.stdout, formatter, config['LOG_QUEUE_SIZE'])
+        atexit.register(_pipeline.stop)
+
+    handler = _pipeline.handler
+    handler.filters = [DebugSampler(config['LOG_DEBUG_SAMPLE_RATE'])]
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if isinstance(existing, DeferredQueueHandler) or type(existing) is logging.StreamHandler:
+            root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(config['LOG_LEVEL'])
+
+    from flask.logging import default_handler
+    app.logger.removeHandler(default_handler)
+    app.logger.setLevel(config['LOG_LEVEL'])
+    return _pipeline
@@ -0,0 +1,79 @@
+import logging
+import threading
+import time
+from app import db
+
+WARMUP_HOOKS = {}
+
+def warmup_hook(name):
+    """Register ``fn(app)`` as the warm-up step called ``name`` (selected via the WARMUP setting)."""
+    def register(fn):
+        WARMUP_HOOKS[name] = fn
+        return fn
+    return register
+
+@warmup_hook('db')
+def warm_db_pool(app):
+    """Open WARMUP_DB_CONNECTIONS pooled connections so early requests skip connect()."""
+    connections = [db.engine.connect() for _ in range(app.config['WARMUP_DB_CONNECTIONS'])]
+    for connection in connections:
+        connection.exec_driver_sql('SELECT 1')
+    for connection in connections:
+        connection.close()
+
+@warmup_hook('http')
+def warm_http_client(app):
+    from app.utils.http_client import http_client
+    http_client()
+
+@warmup_hook('stripe')
+def warm_stripe(app):
+    from app.utils.stripe_client import stripe_client
+    stripe_client()
+
+@warmup_hook('google')
+def warm_google(app):
+    import google.auth.jwt  # noqa: F401
+
+@warmup_hook('services')
+def warm_service_cache(app):
+    """Load the first page of the service catalogue into the listing cache."""
+    from app.services.serv_service import ServiceService
+    ServiceService.get_all_services(app.config['PAGINATION_DEFAULT_LIMIT'])
+    db.session.remove()
+
+@warmup_hook('search')
+def warm_search_index(app):
+    """Build the in-process search index; Postgres searches its own index, so there it is skipped."""
+    if db.engine.dialect.name != 'postgresql':
+        app.extensions['search_index'].build()
+    db.session.remove()
+
+def run_warmup(app, names):
+    """Run the named hooks in order; returns {name: seconds}. Failures are logged, not raised."""
+    unknown = [name for name in names if name not in WARMUP_HOOKS]
+    if unknown:
+        raise ValueError(f"Unknown warm-up hooks: {', '.join(unknown)}")
+    timings = {}
+    with app.app_context():
+        for name in names:
+            started = time.perf_counter()
+            try:
+                WARMUP_HOOKS[name](app)
+            except Exception as e:
+                app.logger.warning("Warm-up '%s' failed: %s", name, str(e))
+            timings[name] = time.perf_counter() - started
+    if app.logger.isEnabledFor(logging.INFO):
+        app.logger.info("Warm-up done: %s", ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings.items()))
+    return timings
+
+def start_warmup(app):
+    """Run the configured warm-up, off the boot path unless WARMUP_IN_BACKGROUND is off."""
+    names = app.config['WARMUP']
+    if not names:
+        return None
+    if not app.config['WARMUP_IN_BACKGROUND']:
+        return run_warmup(app, names)
+    thread = threading.Thread(target=run_warmup, args=(app, names), name='warmup', daemon=True)
+    thread.start()
+    return thread
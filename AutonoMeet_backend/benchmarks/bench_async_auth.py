@@ -0,0 +1,232 @@
+"""Concurrent GitHub sign-ins through one threaded WSGI worker: sync views vs async views.
+
+Run from AutonoMeet_backend with:
+
+    python -m benchmarks.bench_async_auth [--requests 2000] [--concurrency 200]
+                                          [--upstream-latency-ms 200]
+
+Serves the app with werkzeug's threaded server in a child process against
+a seeded SQLite file, with GitHub replaced by a stub in another process
+that answers the code exchange and the profile lookup after
+``--upstream-latency-ms`` each. ``--concurrency`` clients then sign in
+returning users, closed loop, in each mode:
+
+- sync: ASYNC_VIEWS off, the sign-in's upstream calls run on its thread
+- async: ASYNC_VIEWS on, the sign-in runs as a Flask async view and only
+  takes a database thread (ASYNC_DB_WORKERS) for the user lookup
+
+Besides throughput and latency the report shows the peak number of calls
+the stub saw in flight at once. Worker, stub and load generator are
+separate processes so they do not contend for one GIL, but they do share
+this machine's CPUs.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'bench-secret')
+os.environ.setdefault('STRIPE_PUBLISHABLE_KEY', 'pk_bench')
+os.environ.setdefault('STRIPE_SECRET_KEY', 'sk_bench')
+
+import httpx
+from werkzeug.serving import make_server
+from app import create_app, db
+from app.utils.migrations import upgrade
+from benchmarks.bench_load import percentile
+
+MODES = ('sync', 'async')
+
+class StubGitHub(BaseHTTPRequestHandler):
+    """Stand-in for GitHub's code exchange and /user; counts calls in flight."""
+    latency = 0
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        if self.path == '/stats':
+            # Peak calls in flight since the last /stats
+            with self.lock:
+                peak, StubGitHub.peak = StubGitHub.peak, StubGitHub.in_flight
+            return self.reply({'peak_in_flight': peak})
+        github_id = int(self.headers['Authorization'].split()[1])
+        self.wait()
+        self.reply({'id': github_id, 'email': f'dev{github_id}@example.com'})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        self.wait()
+        self.reply({'access_token': parse_qs(body)['code'][0]})
+
+    def wait(self):
+        with self.lock:
+            StubGitHub.in_flight += 1
+            StubGitHub.peak = max(StubGitHub.peak, StubGitHub.in_flight)
+        try:
+            time.sleep(self.latency)
+        finally:
+            with self.lock:
+                StubGitHub.in_flight -= 1
+
+    def reply(self, body):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _serve_stub(port, latency):
+    StubGitHub.latency = latency
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubGitHub)
+    server.daemon_threads = True
+    server.serve_forever()
+
+def _serve_app(port, config):
+    # The access log would cost more than the sign-ins
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    make_server('127.0.0.1', port, create_app(config), threaded=True).serve_forever()
+
+def start_server(target, *args):
+    """Run ``target(port, *args)`` in a child process; return (process, base URL) once it answers."""
+    port = free_port()
+    process = multiprocessing.get_context('spawn').Process(target=target, args=(port, *args), daemon=True)
+    process.start()
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            httpx.get(f'{url}/stats', timeout=1)
+            return process, url
+        except httpx.TransportError:
+            if time.monotonic() > deadline or not process.is_alive():
+                raise RuntimeError(f"Server at {url} did not come up")
+            time.sleep(0.1)
+
+def stop_server(process):
+    process.terminate()
+    process.join()
+
+def seed_users(users):
+    from app.models.user import User
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'dev{github_id}@example.com', 'github_id': github_id, 'is_freelancer': False}
+        for github_id in range(1, users + 1)
+    ])
+    db.session.commit()
+
+async def sign_in_load(base_url, requests, concurrency, users):
+    """Closed loop: ``concurrency`` clients share ``requests`` sign-ins; return (latencies, statuses, seconds)."""
+    remaining = iter(range(requests))
+    latencies, statuses = [], {}
+
+    async def client():
+        # One keep-alive connection per client, like a browser; one shared
+        # httpx pool would spend more CPU scanning its connections than the
+        # server spends on a sign-in
+        async with httpx.AsyncClient(timeout=120) as http:
+            for index in remaining:
+                began = time.perf_counter()
+                response = await http.post(f'{base_url}/api/v0/auth/github',
+                                           json={'code': str(index % users + 1)})
+                latencies.append(time.perf_counter() - began)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    began = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - began
+
+def run_mode(mode, database_uri, stub_url, args):
+    config = {
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'LOG_LEVEL': 'WARNING',
+        'WARMUP': [],
+        'PAYMENT_SWEEP_ON_START': False,
+        'ASYNC_VIEWS': mode == 'async',
+        'GITHUB_OAUTH_URL': f'{stub_url}/login/oauth/access_token',
+        'GITHUB_API_URL': stub_url,
+        'HTTP_POOL_MAXSIZE': args.concurrency,
+        'HTTP_PER_HOST_LIMIT': args.concurrency
+    }
+    process, base_url = start_server(_serve_app, config)
+    try:
+        # Warm both paths (imports, pools) before measuring
+        asyncio.run(sign_in_load(base_url, min(args.concurrency, args.requests), args.concurrency, args.users))
+        httpx.get(f'{stub_url}/stats')
+        latencies, statuses, seconds = asyncio.run(
+            sign_in_load(base_url, args.requests, args.concurrency, args.users)
+        )
+        peak = httpx.get(f'{stub_url}/stats').json()['peak_in_flight']
+        return latencies, statuses, seconds, peak
+    finally:
+        stop_server(process)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--upstream-latency-ms', type=float, default=200)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args(argv)
+
+    latency = args.upstream_latency_ms / 1000
+    stub, stub_url = start_server(_serve_stub, latency)
+    report = {'settings': vars(args), 'modes': {}}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            database_uri = f"sqlite:///{os.path.join(tmp, 'auth.db')}"
+            setup = create_app({'SQLALCHEMY_DATABASE_URI': database_uri, 'LOG_LEVEL': 'WARNING', 'WARMUP': []})
+            with setup.app_context():
+                upgrade()
+                seed_users(args.users)
+                db.session.remove()
+                db.engine.dispose()
+            for mode in MODES:
+                latencies, statuses, seconds, peak = run_mode(mode, database_uri, stub_url, args)
+                ordered = sorted(latencies)
+                report['modes'][mode] = {
+                    'throughput_rps': round(len(ordered) / seconds, 1),
+                    'p50_ms': round(percentile(ordered, 0.50) * 1000, 1),
+                    'p95_ms': round(percentile(ordered, 0.95) * 1000, 1),
+                    'p99_ms': round(percentile(ordered, 0.99) * 1000, 1),
+                    'peak_upstream_in_flight': peak,
+                    'statuses': {str(status): count for status, count in sorted(statuses.items())}
+                }
+    finally:
+        stop_server(stub)
+
+    print(f"{args.requests} GitHub sign-ins from {args.concurrency} clients, "
+          f"{args.upstream_latency_ms:.0f} ms per upstream call")
+    print(f"\n{'mode':<6} {'req/s':>8} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10} {'in flight':>10}  statuses")
+    for mode, result in report['modes'].items():
+        statuses = ' '.join(f"{status}:{count}" for status, count in result['statuses'].items())
+        print(f"{mode:<6} {result['throughput_rps']:>8.0f} {result['p50_ms']:>10.1f} {result['p95_ms']:>10.1f} "
+              f"{result['p99_ms']:>10.1f} {result['peak_upstream_in_flight']:>10}  {statuses}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
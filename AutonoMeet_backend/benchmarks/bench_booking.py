@@ -0,0 +1,84 @@
+"""Conflict-check latency as a freelancer's booking history grows.
+
+Run from AutonoMeet_backend with:
+
+    python -m benchmarks.bench_booking
+
+Each round seeds one freelancer with a growing number of past appointments
+in a throwaway SQLite database and times ``AppointmentService.find_conflict``
+for fresh slots right after that history. With the indexed predecessor
+lookup the median should stay flat across history sizes.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'bench-secret')
+os.environ.setdefault('STRIPE_PUBLISHABLE_KEY', 'pk_bench')
+os.environ.setdefault('STRIPE_SECRET_KEY', 'sk_bench')
+
+from app import create_app, db
+from app.utils.migrations import upgrade
+
+HISTORY_SIZES = (100, 1_000, 10_000, 100_000)
+PROBES = 500
+DURATION = 60
+
+def seed_history(freelancer_id, client_id, service_id, size, start):
+    from app.models.appointment import Appointment
+    rows = []
+    for i in range(size):
+        scheduled_at = start + timedelta(minutes=DURATION * i)
+        rows.append({
+            'client_id': client_id,
+            'service_id': service_id,
+            'freelancer_id': freelancer_id,
+            'scheduled_at': scheduled_at,
+            'ends_at': scheduled_at + timedelta(minutes=DURATION),
+            'created_at': start
+        })
+    db.session.execute(Appointment.__table__.insert(), rows)
+    db.session.commit()
+
+def run_round(size):
+    from app.models.user import User
+    from app.models.category import Category
+    from app.models.service import Service
+    from app.services.appointment_service import AppointmentService
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            upgrade()
+            freelancer = User(email='pro@example.com', is_freelancer=True)
+            client = User(email='client@example.com')
+            service = Service(user=freelancer, category=Category(name='Bench'), title='Bench', price=1.0, duration=DURATION)
+            db.session.add_all([freelancer, client, service])
+            db.session.commit()
+
+            start = datetime(2020, 1, 1)
+            seed_history(freelancer.id, client.id, service.id, size, start)
+            history_end = start + timedelta(minutes=DURATION * size)
+
+            timings = []
+            for i in range(PROBES):
+                probe = history_end - timedelta(minutes=DURATION // 2) + timedelta(minutes=DURATION * (i % 2))
+                began = time.perf_counter()
+                AppointmentService.find_conflict(freelancer.id, probe, probe + timedelta(minutes=DURATION))
+                timings.append(time.perf_counter() - began)
+            db.session.remove()
+    return statistics.median(timings), statistics.quantiles(timings, n=100)[94]
+
+def main():
+    print(f"{'history':>10} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+    for size in HISTORY_SIZES:
+        p50, p95 = run_round(size)
+        print(f"{size:>10} {p50 * 1000:>10.3f} {p95 * 1000:>10.3f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""Load benchmark: real routes, seeded database, concurrent clients.
+
+Run from AutonoMeet_backend with:
+
+    python -m benchmarks.bench_load [--profile ci|full] [--database-url URL]
+                                    [--threads 8] [--requests 2000]
+                                    [--json report.json] [--baseline benchmarks/baseline.json]
+
+Builds the app with ``create_app`` against a throwaway SQLite file (or an
+empty database given with ``--database-url``, e.g. a local Postgres),
+migrates it and seeds freelancers, services and appointments (see
+benchmarks/seed.py). Each scenario then drives the real routes through
+the Flask test client from ``--threads`` worker threads, closed loop:
+
+- catalogue: service listing pages, category listings and service detail
+- authenticated_reads: clients reading their appointments with a JWT
+- booking: POST /appointments on a few hot freelancers' slots, so
+  bookings contend; afterwards the overlapping appointments the run
+  created are counted as double bookings
+
+The report gives throughput and p50/p95/p99 latency per scenario. With
+``--baseline`` the run exits non-zero when a scenario's p95 or throughput
+is worse than the baseline by more than ``--tolerance``, when any request
+fails with a 5xx, or (with ``--forbid-double-bookings``, as CI runs it)
+when the booking scenario double-booked anyone. ``--write-baseline`` stores the run as the
+new baseline.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'bench-secret')
+os.environ.setdefault('STRIPE_PUBLISHABLE_KEY', 'pk_bench')
+os.environ.setdefault('STRIPE_SECRET_KEY', 'sk_bench')
+
+from sqlalchemy import text
+from app import create_app, db
+from app.utils.jwt_utils import generate_access_token
+from app.utils.migrations import upgrade
+from app.utils.pagination import encode_cursor
+from benchmarks.seed import seed_database
+
+PROFILES = {
+    'ci': {'freelancers': 500, 'services_per_freelancer': 3, 'clients': 500, 'appointments': 5000,
+           'threads': 4, 'requests': 400},
+    'full': {'freelancers': 5000, 'services_per_freelancer': 3, 'clients': 5000, 'appointments': 50000,
+             'threads': 8, 'requests': 2000}
+}
+SCENARIOS = ('catalogue', 'authenticated_reads', 'booking')
+HOT_FREELANCERS = 5
+BOOKING_START = datetime(2031, 1, 1, 8, 0)
+BOOKING_SLOTS = 40
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+def drive(app, make_request, requests, threads, seed=0):
+    """Send ``requests`` requests from ``threads`` workers; return (latencies, statuses, seconds)."""
+    share, extra = divmod(requests, threads)
+    start = threading.Barrier(threads + 1)
+
+    def worker(index):
+        client = app.test_client()
+        rng = random.Random(seed * 1000 + index)
+        results = []
+        start.wait()
+        for _ in range(share + (index < extra)):
+            began = time.perf_counter()
+            response = make_request(client, rng)
+            results.append((time.perf_counter() - began, response.status_code))
+        return results
+
+    with ThreadPoolExecutor(threads) as pool:
+        futures = [pool.submit(worker, index) for index in range(threads)]
+        start.wait()
+        began = time.perf_counter()
+        results = [result for future in futures for result in future.result()]
+        seconds = time.perf_counter() - began
+    return [latency for latency, _ in results], Counter(status for _, status in results), seconds
+
+def summarize(latencies, statuses, seconds, threads):
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'threads': threads,
+        'seconds': round(seconds, 3),
+        'throughput_rps': round(len(ordered) / seconds, 1),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'errors': sum(count for status, count in statuses.items() if status >= 500)
+    }
+
+def catalogue_requests(ids):
+    services, categories = ids['services'], ids['categories']
+
+    def request(client, rng):
+        roll = rng.random()
+        if roll < 0.4:
+            after = encode_cursor([rng.choice(services)])
+            return client.get(f'/api/v0/services/?limit=50&after={after}')
+        if roll < 0.6:
+            return client.get('/api/v0/services/?limit=50')
+        if roll < 0.8:
+            return client.get(f'/api/v0/services/category/{rng.choice(categories)}?limit=50')
+        return client.get(f'/api/v0/services/{rng.choice(services)}')
+    return request
+
+def client_tokens(app, ids):
+    with app.app_context():
+        return {
+            client_id: generate_access_token(SimpleNamespace(id=client_id, email=f'user{client_id - 1}@example.com',
+                                                             is_freelancer=False))
+            for client_id in ids['clients']
+        }
+
+def authenticated_requests(ids, tokens):
+    clients = ids['clients']
+
+    def request(client, rng):
+        client_id = rng.choice(clients)
+        return client.get(f'/api/v0/appointments/client/{client_id}?limit=50',
+                          headers={'Authorization': f'Bearer {tokens[client_id]}'})
+    return request
+
+def hot_services(services_per_freelancer):
+    """The first service of each of the HOT_FREELANCERS busiest-to-be freelancers."""
+    return [1 + freelancer_index * services_per_freelancer for freelancer_index in range(HOT_FREELANCERS)]
+
+def booking_requests(ids, tokens, services):
+    clients = ids['clients']
+
+    def request(client, rng):
+        client_id = rng.choice(clients)
+        scheduled_at = BOOKING_START + timedelta(minutes=30 * rng.randrange(BOOKING_SLOTS))
+        return client.post('/api/v0/appointments', headers={'Authorization': f'Bearer {tokens[client_id]}'}, json={
+            'client_id': client_id,
+            'service_id': rng.choice(services),
+            'scheduled_at': scheduled_at.strftime('%Y-%m-%dT%H:%M:%S')
+        })
+    return request
+
+def count_double_bookings(app):
+    """Pairs of overlapping appointments for one freelancer created by the booking scenario."""
+    with app.app_context():
+        count = db.session.execute(text(
+            "SELECT count(*) FROM appointments a JOIN appointments b "
+            "ON a.freelancer_id = b.freelancer_id AND a.id < b.id "
+            "AND a.scheduled_at < b.ends_at AND b.scheduled_at < a.ends_at "
+            "WHERE a.scheduled_at >= :start"
+        ), {'start': BOOKING_START}).scalar()
+        db.session.remove()
+    return count
+
+def run_suite(settings, scenarios=SCENARIOS, database_url=None):
+    """Seed a database, run ``scenarios`` and return the report dict."""
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = database_url or f"sqlite:///{os.path.join(tmp, 'load.db')}"
+        app = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'LOG_LEVEL': 'WARNING', 'WARMUP': []})
+        with app.app_context():
+            upgrade()
+            seeded_at = time.perf_counter()
+            ids = seed_database(
+                freelancers=settings['freelancers'],
+                services_per_freelancer=settings['services_per_freelancer'],
+                clients=settings['clients'],
+                appointments=settings['appointments'],
+                seed=settings.get('seed', 0)
+            )
+            seed_seconds = time.perf_counter() - seeded_at
+            db.session.remove()
+        tokens = client_tokens(app, ids)
+
+        requests_by_scenario = {
+            'catalogue': lambda: catalogue_requests(ids),
+            'authenticated_reads': lambda: authenticated_requests(ids, tokens),
+            'booking': lambda: booking_requests(ids, tokens, hot_services(settings['services_per_freelancer']))
+        }
+        report = {'settings': settings, 'seed_seconds': round(seed_seconds, 3), 'scenarios': {}}
+        for scenario in scenarios:
+            latencies, statuses, seconds = drive(
+                app, requests_by_scenario[scenario](), settings['requests'], settings['threads'],
+                seed=settings.get('seed', 0)
+            )
+            report['scenarios'][scenario] = summarize(latencies, statuses, seconds, settings['threads'])
+        if 'booking' in scenarios:
+            report['scenarios']['booking']['double_bookings'] = count_double_bookings(app)
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+    return report
+
+def regressions(report, baseline, tolerance, forbid_double_bookings=False):
+    """Human-readable reasons ``report`` is worse than ``baseline``; empty when it is not."""
+    problems = []
+    for scenario, result in report['scenarios'].items():
+        if result['errors']:
+            problems.append(f"{scenario}: {result['errors']} requests failed with a 5xx")
+        if forbid_double_bookings and result.get('double_bookings'):
+            problems.append(f"{scenario}: {result['double_bookings']} double bookings")
+        expected = baseline.get('scenarios', {}).get(scenario)
+        if expected is None:
+            continue
+        if result['p95_ms'] > expected['p95_ms'] * (1 + tolerance):
+            problems.append(f"{scenario}: p95 {result['p95_ms']:.1f} ms vs baseline {expected['p95_ms']:.1f} ms")
+        if result['throughput_rps'] < expected['throughput_rps'] * (1 - tolerance):
+            problems.append(f"{scenario}: {result['throughput_rps']:.0f} req/s vs baseline "
+                            f"{expected['throughput_rps']:.0f} req/s")
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='full')
+    parser.add_argument('--database-url', help='empty database to migrate and seed (default: temporary SQLite)')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='run only these (repeatable)')
+    for option in ('freelancers', 'services-per-freelancer', 'clients', 'appointments', 'threads', 'requests', 'seed'):
+        parser.add_argument(f'--{option}', type=int)
+    parser.add_argument('--json', help='also write the report to this file')
+    parser.add_argument('--baseline', help='fail when worse than this baseline report')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed relative slowdown (default 0.5)')
+    parser.add_argument('--write-baseline', help='store this run as the baseline at this path')
+    parser.add_argument('--forbid-double-bookings', action='store_true',
+                        help='fail when the booking scenario created overlapping appointments')
+    args = parser.parse_args(argv)
+
+    settings = dict(PROFILES[args.profile], profile=args.profile)
+    for key in ('freelancers', 'services_per_freelancer', 'clients', 'appointments', 'threads', 'requests', 'seed'):
+        if getattr(args, key) is not None:
+            settings[key] = getattr(args, key)
+
+    report = run_suite(settings, args.scenario or SCENARIOS, args.database_url)
+    print(f"seeded {settings['freelancers']} freelancers, {settings['clients']} clients, "
+          f"{settings['appointments']} appointments in {report['seed_seconds']:.1f} s; "
+          f"{settings['threads']} threads x {settings['requests']} requests per scenario")
+    print(f"\n{'scenario':<22} {'req/s':>8} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10}  statuses")
+    for scenario, result in report['scenarios'].items():
+        statuses = ' '.join(f"{status}:{count}" for status, count in result['statuses'].items())
+        print(f"{scenario:<22} {result['throughput_rps']:>8.0f} {result['p50_ms']:>10.2f} "
+              f"{result['p95_ms']:>10.2f} {result['p99_ms']:>10.2f}  {statuses}")
+    if 'double_bookings' in report['scenarios'].get('booking', {}):
+        print(f"\ndouble bookings created under contention: {report['scenarios']['booking']['double_bookings']}")
+
+    for path in filter(None, (args.json, args.write_baseline)):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = regressions(report, json.load(f), args.tolerance, args.forbid_double_bookings)
+        if problems:
+            print('\nregressions against ' + args.baseline + ':\n  ' + '\n  '.join(problems))
+            return 1
+        print(f"\nwithin {args.tolerance:.0%} of {args.baseline}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
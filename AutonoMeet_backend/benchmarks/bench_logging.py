@@ -0,0 +1,118 @@
+"""Request overhead of logging: off vs synchronous handler vs the queued pipeline.
+
+Run from AutonoMeet_backend with:
+
+    python -m benchmarks.bench_logging [--requests 5000] [--sink-latency-us 50]
+
+Serves the (cached) service listing through the test client while each
+request emits one INFO and three DEBUG records with arguments, the volume
+the old Google sign-in path produced. Output goes to a sink that stalls
+``--sink-latency-us`` per write, standing in for a container's stdout pipe
+under back-pressure (0 measures pure formatting and handler cost):
+
+- off: LOG_LEVEL=WARNING, records are rejected by level
+- sync: a plain StreamHandler formatting JSON on the request thread
+- queued: the DeferredQueueHandler pipeline with its background writer
+- sampled: queued with LOG_DEBUG_SAMPLE_RATE=0.01
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'bench-secret')
+os.environ.setdefault('STRIPE_PUBLISHABLE_KEY', 'pk_bench')
+os.environ.setdefault('STRIPE_SECRET_KEY', 'sk_bench')
+
+from app import create_app, db
+from app.utils.migrations import upgrade
+from app.utils.structured_logging import DebugSampler, JsonFormatter, init_logging
+
+MODES = ('off', 'sync', 'queued', 'sampled')
+
+class Sink:
+    """Discards writes after sleeping, like a log pipe that is slow to drain."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def write(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def flush(self):
+        pass
+
+def build_app(path, sink):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'WARMUP': []})
+    pipeline = init_logging(app)
+    pipeline.listener.handlers[0].setStream(sink)
+    with app.app_context():
+        upgrade()
+
+    @app.before_request
+    def chatty():
+        app.logger.info("Request %s %s", 'GET', '/api/v0/services/')
+        for step in ('parse', 'lookup', 'render'):
+            app.logger.debug("Step %s took %.3f ms", step, 0.125)
+    return app, pipeline
+
+def configure(mode, app, pipeline, sink):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    level = logging.WARNING if mode == 'off' else logging.DEBUG
+    root.setLevel(level)
+    app.logger.setLevel(level)
+    if mode == 'sync':
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(JsonFormatter())
+        root.addHandler(handler)
+    else:
+        pipeline.handler.filters = [DebugSampler(0.01 if mode == 'sampled' else 1)]
+        root.addHandler(pipeline.handler)
+
+def run(app, requests):
+    client = app.test_client()
+    client.get('/api/v0/services/')
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        client.get('/api/v0/services/')
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--sink-latency-us', type=float, default=50)
+    args = parser.parse_args(argv)
+
+    sink = Sink(args.sink_latency_us / 1e6)
+    with tempfile.TemporaryDirectory() as tmp:
+        app, pipeline = build_app(os.path.join(tmp, 'bench.db'), sink)
+        results = {}
+        for mode in MODES:
+            configure(mode, app, pipeline, sink)
+            dropped = pipeline.handler.dropped
+            with app.app_context():
+                timings = run(app, args.requests)
+                db.session.remove()
+            pipeline.flush(timeout=60)
+            results[mode] = (timings, pipeline.handler.dropped - dropped)
+
+    baseline = statistics.mean(results['off'][0])
+    print(f"{'mode':<10} {'mean (us)':>10} {'p50 (us)':>10} {'p99 (us)':>10} {'vs off':>8} {'dropped':>8}")
+    for mode, (timings, dropped) in results.items():
+        timings = sorted(timings)
+        mean = statistics.mean(timings)
+        print(f"{mode:<10} {mean * 1e6:>10.0f} {timings[len(timings) // 2] * 1e6:>10.0f} "
+              f"{timings[int(len(timings) * 0.99)] * 1e6:>10.0f} {mean / baseline:>7.2f}x {dropped:>8}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
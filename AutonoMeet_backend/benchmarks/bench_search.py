@@ -0,0 +1,181 @@
+"""Service search latency at catalogue scale: client-side filtering vs LIKE vs the search index.
+
+Run from AutonoMeet_backend with:
+
+    python -m benchmarks.bench_search [--services 100000] [--rounds 20]
+                                      [--database-url postgresql://...]
+
+Seeds ``--services`` services with generated titles, categories and
+descriptions (a throwaway SQLite file unless ``--database-url`` points at an
+empty Postgres database), then times a fixed set of queries three ways:
+
+- client: what the frontend does today, i.e. fetch the whole catalogue
+  through the streaming listing and filter it in Python (the network and the
+  browser's own work are not counted)
+- like: one SQL query with ``LIKE '%word%'`` on every field, ranked with
+  title hits first, which no B-tree index can serve
+- index: ``GET /services/search``; the in-process inverted index on
+  SQLite (its build time is reported separately), tsvector + GIN on Postgres
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'bench-secret')
+os.environ.setdefault('STRIPE_PUBLISHABLE_KEY', 'pk_bench')
+os.environ.setdefault('STRIPE_SECRET_KEY', 'sk_bench')
+
+from sqlalchemy import and_, case, or_, text
+from app import create_app, db
+from app.utils.migrations import upgrade
+from app.utils.search_index import reindex_services
+from benchmarks.bench_load import percentile
+
+CATEGORIES = ('Fitness', 'Music', 'Languages', 'Beauty', 'Home repair', 'Tutoring', 'Photography',
+              'Cooking', 'Wellness', 'Design', 'Programming', 'Pets')
+WORDS = ('yoga', 'pilates', 'guitar', 'piano', 'violin', 'spanish', 'french', 'german', 'haircut', 'manicure',
+         'plumbing', 'painting', 'electrician', 'math', 'physics', 'chemistry', 'portrait', 'wedding', 'baking',
+         'vegan', 'massage', 'meditation', 'logo', 'branding', 'python', 'javascript', 'dog', 'walking', 'grooming',
+         'beginner', 'advanced', 'private', 'group', 'online', 'weekend', 'evening', 'express', 'premium')
+FILLER = ('session', 'lesson', 'class', 'service', 'with', 'for', 'and', 'the', 'your', 'home', 'studio',
+          'professional', 'experienced', 'friendly', 'certified', 'hour', 'minutes', 'tailored', 'plan')
+# Zipf-like: the first words are common, the last ones rare
+WORD_WEIGHTS = [1 / rank for rank in range(1, len(WORDS) + 1)]
+# Common, rare, multi-word and still-being-typed queries
+QUERIES = ('yoga', 'premium', 'private guitar', 'spanish online beginner', 'wedding portrait', 'mass', 'pi')
+LIMIT = 20
+
+def seed(services, rng):
+    from app.models.category import Category
+    from app.models.service import Service
+    from app.models.user import User
+
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'pro{i}@example.com', 'is_freelancer': True} for i in range(1000)
+    ])
+    db.session.execute(Category.__table__.insert(), [{'name': name} for name in CATEGORIES])
+    batch = []
+    for i in range(services):
+        batch.append({
+            'user_id': 1 + i % 1000,
+            'category_id': rng.randint(1, len(CATEGORIES)),
+            'title': ' '.join(rng.choices(WORDS, WORD_WEIGHTS, k=2) + rng.sample(FILLER, 1)).capitalize(),
+            'price': round(rng.uniform(10, 200), 2),
+            'duration': rng.choice((30, 45, 60, 90)),
+            'description': ' '.join(rng.choices(WORDS, WORD_WEIGHTS, k=3) + rng.sample(FILLER, 8))
+        })
+        if len(batch) == 10_000:
+            db.session.execute(Service.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Service.__table__.insert(), batch)
+    # Core inserts bypass ServiceService, so the documents are built here
+    reindex_services()
+    db.session.commit()
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text('ANALYZE services'))
+        db.session.commit()
+
+def client_side(q):
+    from app.services.serv_service import ServiceService
+    words = q.lower().split()
+    matches = []
+    for service in ServiceService.iter_all_services():
+        haystack = ' '.join(filter(None, (service.title, service.category_name, service.description))).lower()
+        if all(word in haystack for word in words):
+            matches.append(service)
+    return matches[:LIMIT]
+
+def like_scan(q):
+    from app.models.category import Category
+    from app.models.service import Service
+    from app.serializers.service import service_projection
+    words = q.lower().split()
+    fields = (Service.title, Category.name, Service.description)
+    # Ranked like the search: title hits first, then category, then description
+    rank = sum(case((field.ilike(f'%{word}%'), weight), else_=0)
+               for word in words for field, weight in zip(fields, (100, 10, 1)))
+    statement = service_projection().where(and_(*(
+        or_(*(field.ilike(f'%{word}%') for field in fields)) for word in words
+    ))).order_by(rank.desc(), Service.id).limit(LIMIT)
+    return db.session.execute(statement).all()
+
+def time_queries(run, rounds):
+    """Median seconds per query over ``rounds`` repetitions, and the result count."""
+    timings = {}
+    for q in QUERIES:
+        samples = []
+        for _ in range(rounds):
+            began = time.perf_counter()
+            found = run(q)
+            samples.append(time.perf_counter() - began)
+            db.session.remove()
+        timings[q] = (statistics.median(samples), len(found))
+    return timings
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--services', type=int, default=100_000)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--database-url', help='an empty Postgres database to use instead of SQLite')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = args.database_url or f"sqlite:///{os.path.join(tmp, 'search.db')}"
+        app = create_app({'SQLALCHEMY_DATABASE_URI': database_uri, 'LOG_LEVEL': 'WARNING', 'WARMUP': []})
+        with app.app_context():
+            upgrade()
+            began = time.perf_counter()
+            seed(args.services, random.Random(0))
+            seconds_seeding = time.perf_counter() - began
+            backend = db.engine.dialect.name
+            build_ms = None
+            if backend != 'postgresql':
+                began = time.perf_counter()
+                app.extensions['search_index'].build()
+                build_ms = (time.perf_counter() - began) * 1000
+                db.session.remove()
+
+            http = app.test_client()
+
+            def indexed(q):
+                response = http.get('/api/v0/services/search', query_string={'q': q, 'limit': LIMIT})
+                assert response.status_code == 200, response.json
+                return response.json
+
+            modes = {
+                'client': time_queries(client_side, max(1, args.rounds // 10)),
+                'like': time_queries(like_scan, max(1, args.rounds // 4)),
+                'index': time_queries(indexed, args.rounds)
+            }
+
+    print(f"{args.services} services on {backend}, seeded in {seconds_seeding:.1f}s"
+          + (f", in-process index built in {build_ms:.0f}ms" if build_ms is not None else ''))
+    print(f"\n{'query':<26}" + ''.join(f"{mode + ' (ms)':>14}" for mode in modes) + f"{'hits':>6}")
+    for q in QUERIES:
+        print(f"{q:<26}" + ''.join(f"{modes[mode][q][0] * 1000:>14.1f}" for mode in modes)
+              + f"{modes['index'][q][1]:>6}")
+    summary = {}
+    for mode, timings in modes.items():
+        ordered = sorted(seconds for seconds, _ in timings.values())
+        summary[mode] = {'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+                         'max_ms': round(ordered[-1] * 1000, 2)}
+    print(f"\n{'':<26}" + ''.join(f"{mode:>14}" for mode in modes))
+    for stat in ('p50_ms', 'max_ms'):
+        print(f"{stat:<26}" + ''.join(f"{summary[mode][stat]:>14.1f}" for mode in modes))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'settings': vars(args), 'backend': backend, 'index_build_ms': build_ms,
+                       'modes': summary}, f, indent=2)
+            f.write('\n')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Serialization cost per 10k rows: lazy ORM dicts vs load plans + DTOs.
+
+Run from AutonoMeet_backend with:
+
+    python -m benchmarks.bench_serializers
+
+Seeds 10k services (spread over freelancers and categories) and 10k
+appointments in a throwaway SQLite database, then times loading and
+encoding every row two ways:
+
+- legacy: plain ``query.all()``, hand-built dicts that touch relationships
+  lazily, stdlib ``json.dumps``
+- serializers: the explicit load plan, ``__slots__`` DTOs and the shared
+  fast encoder (orjson when installed)
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'bench-secret')
+os.environ.setdefault('STRIPE_PUBLISHABLE_KEY', 'pk_bench')
+os.environ.setdefault('STRIPE_SECRET_KEY', 'sk_bench')
+
+from app import create_app, db
+from app.utils.migrations import upgrade
+from app.utils.json_provider import dumps, orjson
+
+ROWS = 10_000
+FREELANCERS = 500
+CATEGORIES = 20
+ROUNDS = 5
+
+def seed(start):
+    from app.models.appointment import Appointment
+    from app.models.category import Category
+    from app.models.service import Service
+    from app.models.user import User
+
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'user{i}@example.com', 'is_freelancer': i < FREELANCERS, 'created_at': start}
+        for i in range(FREELANCERS + 1)
+    ])
+    db.session.execute(Category.__table__.insert(), [{'name': f'Category {i}'} for i in range(CATEGORIES)])
+    db.session.execute(Service.__table__.insert(), [{
+        'user_id': 1 + i % FREELANCERS,
+        'category_id': 1 + i % CATEGORIES,
+        'title': f'Service {i}',
+        'price': 10.0 + i % 50,
+        'duration': 60,
+        'description': 'Benchmark service'
+    } for i in range(ROWS)])
+    db.session.execute(Appointment.__table__.insert(), [{
+        'client_id': FREELANCERS + 1,
+        'service_id': 1 + i,
+        'freelancer_id': 1 + i % FREELANCERS,
+        'scheduled_at': start + timedelta(hours=i),
+        'ends_at': start + timedelta(hours=i, minutes=60),
+        'created_at': start
+    } for i in range(ROWS)])
+    db.session.commit()
+
+def legacy_services():
+    from app.models.service import Service
+    return [{
+        'id': s.id,
+        'user_id': s.user_id,
+        'user': {'id': s.user.id, 'email': s.user.email} if s.user else None,
+        'category_id': s.category_id,
+        'category': {'name': s.category.name} if s.category else None,
+        'title': s.title,
+        'price': s.price,
+        'duration': s.duration,
+        'description': s.description
+    } for s in Service.query.all()]
+
+def legacy_appointments():
+    from app.models.appointment import Appointment
+    return [{
+        'id': a.id,
+        'client_id': a.client_id,
+        'service_id': a.service_id,
+        'scheduled_at': a.scheduled_at.isoformat(),
+        'created_at': a.created_at.isoformat(),
+        'service': {'duration': a.service.duration}
+    } for a in Appointment.query.all()]
+
+def dto_services():
+    from app.models.service import Service
+    from app.serializers.service import ServiceDTO, service_load
+    return [ServiceDTO.from_orm(s).to_dict() for s in Service.query.options(*service_load())]
+
+def dto_appointments():
+    from app.models.appointment import Appointment
+    from app.serializers.appointment import AppointmentDTO, detail_load
+    return [AppointmentDTO.from_orm(a, with_service=True).to_detail_dict()
+            for a in Appointment.query.options(*detail_load())]
+
+def measure(build, encode):
+    builds, encodes = [], []
+    for _ in range(ROUNDS):
+        db.session.expunge_all()
+        began = time.perf_counter()
+        rows = build()
+        built = time.perf_counter()
+        encode(rows)
+        builds.append(built - began)
+        encodes.append(time.perf_counter() - built)
+    return statistics.median(builds), statistics.median(encodes)
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            upgrade()
+            seed(datetime(2020, 1, 1))
+            cases = (
+                ('services / legacy', legacy_services, json.dumps),
+                ('services / serializers', dto_services, dumps),
+                ('appointments / legacy', legacy_appointments, json.dumps),
+                ('appointments / serializers', dto_appointments, dumps),
+            )
+            print(f"encoder: {'orjson ' + orjson.__version__ if orjson else 'stdlib json'}, {ROWS} rows per case")
+            print(f"{'case':<28} {'load+build (ms)':>16} {'encode (ms)':>12} {'total (ms)':>11}")
+            for name, build, encode in cases:
+                build_s, encode_s = measure(build, encode)
+                print(f"{name:<28} {build_s * 1000:>16.1f} {encode_s * 1000:>12.1f} {(build_s + encode_s) * 1000:>11.1f}")
+            db.session.remove()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Cold-start report: create_app wall time and import cost per module.
+
+Run from AutonoMeet_backend with:
+
+    python -m benchmarks.bench_startup [--runs 5] [--json report.json] [--budget-ms 1500]
+
+Each run starts a fresh interpreter with ``-X importtime``, imports the app
+and calls ``create_app()``. The report shows the median import and
+create_app times, the packages whose imports cost the most (self time
+summed per top-level package) and the slowest individual modules. With
+``--budget-ms`` it exits non-zero when the median cold start is over
+budget, so CI can track regressions.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+done = time.perf_counter()
+print(json.dumps({
+    'import_s': imported - started,
+    'create_app_s': done - imported,
+    'deferred': {name: name in sys.modules for name in ('stripe', 'requests', 'google.auth')}
+}))
+"""
+
+DEFAULT_ENV = {
+    'DATABASE_URL': 'sqlite://',
+    'SECRET_KEY': 'bench-secret',
+    'STRIPE_PUBLISHABLE_KEY': 'pk_bench',
+    'STRIPE_SECRET_KEY': 'sk_bench',
+    'LOG_LEVEL': 'WARNING',
+    'WARMUP': ''
+}
+
+def parse_importtime(stderr):
+    """Yield (module, self_us, cumulative_us) from ``-X importtime`` output."""
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        yield name.strip(), int(self_us), int(cumulative_us)
+
+def cold_start():
+    env = {**DEFAULT_ENV, **os.environ}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    probe['modules'] = list(parse_importtime(result.stderr))
+    return probe
+
+def build_report(runs, top):
+    starts = [cold_start() for _ in range(runs)]
+    per_package = defaultdict(list)
+    per_module = defaultdict(list)
+    for start in starts:
+        packages = defaultdict(int)
+        for name, self_us, _ in start['modules']:
+            packages[name.split('.')[0]] += self_us
+            per_module[name].append(self_us)
+        for package, total in packages.items():
+            per_package[package].append(total)
+    median_ms = lambda values: statistics.median(values) / 1000
+    return {
+        'runs': runs,
+        'import_ms': statistics.median(s['import_s'] for s in starts) * 1000,
+        'create_app_ms': statistics.median(s['create_app_s'] for s in starts) * 1000,
+        'total_ms': statistics.median(s['import_s'] + s['create_app_s'] for s in starts) * 1000,
+        'loaded_at_boot': [name for name, loaded in starts[-1]['deferred'].items() if loaded],
+        'packages_ms': dict(sorted(
+            ((package, median_ms(values)) for package, values in per_package.items()),
+            key=lambda item: item[1], reverse=True
+        )[:top]),
+        'modules_ms': dict(sorted(
+            ((module, median_ms(values)) for module, values in per_module.items()),
+            key=lambda item: item[1], reverse=True
+        )[:top])
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', help='also write the report to this file')
+    parser.add_argument('--budget-ms', type=float, help='fail when the median cold start exceeds this')
+    args = parser.parse_args(argv)
+
+    report = build_report(args.runs, args.top)
+    print(f"cold start (median of {report['runs']}): {report['total_ms']:.0f} ms "
+          f"= import {report['import_ms']:.0f} ms + create_app {report['create_app_ms']:.0f} ms")
+    print(f"optional clients loaded at boot: {', '.join(report['loaded_at_boot']) or 'none'}")
+    print(f"\n{'package':<32} {'import (ms)':>12}")
+    for package, ms in report['packages_ms'].items():
+        print(f"{package:<32} {ms:>12.1f}")
+    print(f"\n{'module (self time)':<48} {'ms':>8}")
+    for module, ms in report['modules_ms'].items():
+        print(f"{module:<48} {ms:>8.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.budget_ms is not None and report['total_ms'] > args.budget_ms:
+        print(f"\ncold start {report['total_ms']:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""Deterministic catalogue and booking data for the load benchmarks.
+
+Rows are bulk-inserted through Core, so seeding tens of thousands of
+appointments takes seconds; the same ``seed`` always produces the same
+rows, which keeps runs comparable.
+"""
+import random
+from datetime import datetime, timedelta
+from app import db
+
+SEED_START = datetime(2024, 1, 1, 8, 0)
+
+def seed_database(freelancers=2000, services_per_freelancer=3, clients=2000, appointments=20000,
+                  categories=20, seed=0):
+    """Insert users, categories, services and past appointments; return their id ranges."""
+    from app.models.appointment import Appointment
+    from app.models.category import Category
+    from app.models.service import Service
+    from app.models.user import User
+
+    rng = random.Random(seed)
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'user{i}@example.com', 'is_freelancer': i < freelancers, 'created_at': SEED_START}
+        for i in range(freelancers + clients)
+    ])
+    db.session.execute(Category.__table__.insert(), [{'name': f'Category {i}'} for i in range(categories)])
+    services = []
+    for freelancer_id in range(1, freelancers + 1):
+        for _ in range(services_per_freelancer):
+            services.append({
+                'user_id': freelancer_id,
+                'category_id': rng.randint(1, categories),
+                'title': f'Service {len(services)}',
+                'price': round(rng.uniform(10, 200), 2),
+                'duration': rng.choice((30, 45, 60, 90)),
+                'description': 'Seeded for benchmarks'
+            })
+    db.session.execute(Service.__table__.insert(), services)
+
+    # Past appointments land on distinct hourly slots per freelancer, so the
+    # seed itself never contains overlapping bookings
+    rows = []
+    next_slot = {}
+    for _ in range(appointments):
+        service_id = rng.randint(1, len(services))
+        service = services[service_id - 1]
+        slot = next_slot.get(service['user_id'], 0)
+        next_slot[service['user_id']] = slot + rng.randint(2, 4)
+        scheduled_at = SEED_START + timedelta(hours=slot)
+        rows.append({
+            'client_id': freelancers + rng.randint(1, clients),
+            'service_id': service_id,
+            'freelancer_id': service['user_id'],
+            'scheduled_at': scheduled_at,
+            'ends_at': scheduled_at + timedelta(minutes=service['duration']),
+            'created_at': SEED_START
+        })
+    if rows:
+        db.session.execute(Appointment.__table__.insert(), rows)
+    db.session.commit()
+    return {
+        'freelancers': range(1, freelancers + 1),
+        'clients': range(freelancers + 1, freelancers + clients + 1),
+        'services': range(1, len(services) + 1),
+        'categories': range(1, categories + 1)
+    }
@@ -1,9 +1,11 @@
 from app import create_app
+from app.utils.migrations import upgrade
 
 app = create_app()
 
 if __name__ == "__main__":
+	# The development server brings the schema up to date itself; deployments
+	# run `flask db upgrade` before starting (see the Dockerfile)
+	with app.app_context():
+		upgrade()
 	app.run(host="0.0.0.0", port=5000, debug=True)
-
-
-
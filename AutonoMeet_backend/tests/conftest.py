@@ -0,0 +1,140 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Config refuses to import without these; CI provides real values.
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'test-secret')
+os.environ.setdefault('STRIPE_PUBLISHABLE_KEY', 'pk_test')
+os.environ.setdefault('STRIPE_SECRET_KEY', 'sk_test')
+
+from app import create_app, db
+from app.utils.migrations import upgrade
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'TESTING': True,
+        'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+        'PASSWORD_HASH_WORKERS': 0,
+        'PAYMENT_SWEEP_ON_START': False
+    })
+    with app.app_context():
+        upgrade()
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def make_user(app):
+    from app.models.user import User
+
+    def _make_user(email, is_freelancer=False):
+        user = User(email=email, is_freelancer=is_freelancer)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return _make_user
+
+@pytest.fixture
+def make_service(app):
+    from app.models.category import Category
+    from app.models.service import Service
+
+    def _make_service(user, duration=60, title='Service', price=10.0, category=None):
+        if category is None:
+            category = Category.query.filter_by(name='General').first() or Category(name='General')
+        service = Service(user_id=user.id, category=category, title=title, price=price, duration=duration)
+        db.session.add(service)
+        db.session.commit()
+        return service
+    return _make_service
+
+@pytest.fixture
+def query_budget(app):
+    """Fail the test when the block run under ``with query_budget(n):`` issues more than n statements.
+
+    ``max_repeats`` also fails it when any one statement (parameters aside)
+    runs more than that many times, the signature of an N+1 lazy load.
+    """
+    from contextlib import contextmanager
+    from app.utils.query_profiler import profile_queries
+
+    @contextmanager
+    def _budget(limit, max_repeats=None):
+        with profile_queries() as profile:
+            yield profile
+        if profile.count > limit:
+            pytest.fail(f"Query budget of {limit} exceeded: {profile.report()}", pytrace=False)
+        repeated = profile.repeated(max_repeats + 1) if max_repeats is not None else []
+        if repeated:
+            pytest.fail(f"Statement ran more than {max_repeats} times: {profile.report()}", pytrace=False)
+    return _budget
+
+@pytest.fixture
+def fake_github(app, local_server):
+    import json
+    import time
+    from http.server import BaseHTTPRequestHandler
+    from app.utils.http_client import HttpClient
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def reply(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            form = self.rfile.read(int(self.headers['Content-Length'])).decode()
+            calls.append(('POST', self.path))
+            if 'code=slow' in form:
+                # Never answers within the client's read timeout
+                return time.sleep(1)
+            if 'code=bad' in form:
+                return self.reply(200, {'error': 'bad_verification_code'})
+            self.reply(200, {'access_token': 'gho_test'})
+
+        def do_GET(self):
+            calls.append(('GET', self.path))
+            # The first profile lookup hits a transient upstream failure
+            if calls.count(('GET', '/user')) == 1:
+                return self.reply(503, {'message': 'unavailable'})
+            self.reply(200, {'id': 42, 'email': 'dev@example.com'})
+
+        def log_message(self, *args):
+            pass
+
+    base_url = local_server(Handler)
+    app.config['GITHUB_OAUTH_URL'] = f'{base_url}/login/oauth/access_token'
+    app.config['GITHUB_API_URL'] = base_url
+    app.extensions['http_client'] = HttpClient(read_timeout=0.3, retries=2, backoff_factor=0, backoff_jitter=0)
+    # The async views' client (app/utils/async_http.py) is built from config
+    app.config['HTTP_READ_TIMEOUT'] = 0.3
+    return calls
+
+@pytest.fixture
+def local_server():
+    """Start a local HTTP server for a BaseHTTPRequestHandler class and return its base URL."""
+    import threading
+    from http.server import ThreadingHTTPServer
+    servers = []
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        # Concurrency tests open a hundred connections at once
+        request_queue_size = 128
+
+    def _start(handler_class):
+        server = Server(('127.0.0.1', 0), handler_class)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_port}'
+    yield _start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
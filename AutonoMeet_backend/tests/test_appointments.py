@@ -0,0 +1,202 @@
+from app.services.appointment_service import AppointmentService
+
+
+def book(client, service, scheduled_at):
+    return AppointmentService.create_appointment({
+        'client_id': client.id,
+        'service_id': service.id,
+        'scheduled_at': scheduled_at
+    })
+
+def test_overlapping_booking_is_rejected(make_user, make_service):
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    client = make_user('client@example.com')
+    service = make_service(freelancer, duration=60)
+
+    appointment, error, status_code = book(client, service, '2030-01-01T10:00:00')
+    assert status_code == 201
+    assert appointment.freelancer_id == freelancer.id
+    assert appointment.ends_at.isoformat() == '2030-01-01T11:00:00'
+
+    _, error, status_code = book(client, service, '2030-01-01T10:30:00')
+    assert status_code == 409
+    assert '2030-01-01T10:00:00' in error
+
+def test_back_to_back_bookings_are_allowed(make_user, make_service):
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    client = make_user('client@example.com')
+    service = make_service(freelancer, duration=60)
+
+    assert book(client, service, '2030-01-01T10:00:00')[2] == 201
+    assert book(client, service, '2030-01-01T11:00:00')[2] == 201
+    assert book(client, service, '2030-01-01T09:00:00')[2] == 201
+
+def test_multi_day_appointment_blocks_later_days(make_user, make_service):
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    client = make_user('client@example.com')
+    retreat = make_service(freelancer, duration=3 * 24 * 60)
+    session = make_service(freelancer, duration=30)
+
+    assert book(client, retreat, '2030-01-01T09:00:00')[2] == 201
+    assert book(client, session, '2030-01-03T12:00:00')[2] == 409
+    assert book(client, session, '2030-01-04T09:00:00')[2] == 201
+
+def test_booking_inside_an_earlier_long_booking_is_rejected(app, make_user, make_service):
+    from app import db
+    from app.models.appointment import Appointment
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    client = make_user('client@example.com')
+    long = make_service(freelancer, duration=120)
+    short = make_service(freelancer, duration=30)
+    first, _, _ = book(client, long, '2030-01-01T10:00:00')
+    # An overlapping booking left over from before conflicts were checked
+    db.session.add(Appointment(client_id=client.id, service_id=short.id, freelancer_id=freelancer.id,
+                               scheduled_at=first.scheduled_at.replace(minute=30),
+                               ends_at=first.scheduled_at.replace(hour=11)))
+    db.session.commit()
+
+    _, error, status_code = book(client, short, '2030-01-01T11:15:00')
+    assert status_code == 409
+    assert '2030-01-01T10:00:00' in error
+    response = app.test_client().get(
+        f'/api/v0/services/{short.id}/availability?from=2030-01-01T11:00:00&to=2030-01-01T13:00:00&step=30'
+    )
+    assert response.json['slots'][0]['start'] == '2030-01-01T12:00:00'
+
+def test_update_cannot_move_into_another_booking(make_user, make_service):
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    client = make_user('client@example.com')
+    service = make_service(freelancer, duration=60)
+    book(client, service, '2030-01-01T10:00:00')
+    later, _, _ = book(client, service, '2030-01-01T12:00:00')
+
+    _, error, status_code = AppointmentService.update_appointment(later.id, {'scheduled_at': '2030-01-01T10:30:00'})
+    assert status_code == 409
+    assert AppointmentService.get_appointment_by_id(later.id)[0].scheduled_at.isoformat() == '2030-01-01T12:00:00'
+    assert AppointmentService.update_appointment(later.id, {'scheduled_at': '2030-01-01T11:00:00'})[2] == 200
+
+def test_update_writes_only_under_both_freelancers_locks(app, make_user, make_service):
+    from sqlalchemy import event
+    from app import db
+    one = make_user('one@example.com', is_freelancer=True)
+    two = make_user('two@example.com', is_freelancer=True)
+    client = make_user('client@example.com')
+    first, second = make_service(one, duration=60), make_service(two, duration=60)
+    appointment, _, _ = book(client, first, '2030-01-01T10:00:00')
+    book(client, second, '2030-01-01T12:00:00')
+    db.session.commit()
+
+    held = []
+    def listener(conn, cursor, statement, *args):
+        if statement.startswith('UPDATE appointments'):
+            held.append(set(app.extensions['booking_locks']._locks))
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        moved = {'service_id': second.id, 'scheduled_at': '2030-01-01T12:30:00'}
+        assert AppointmentService.update_appointment(appointment.id, moved)[2] == 409
+        moved['scheduled_at'] = '2030-01-01T13:00:00'
+        assert AppointmentService.update_appointment(appointment.id, moved)[2] == 200
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert held == [{one.id, two.id}]
+    assert AppointmentService.get_appointment_by_id(appointment.id)[0].freelancer_id == two.id
+
+def test_other_freelancers_are_not_blocked(make_user, make_service):
+    client = make_user('client@example.com')
+    first = make_service(make_user('one@example.com', is_freelancer=True))
+    second = make_service(make_user('two@example.com', is_freelancer=True))
+
+    assert book(client, first, '2030-01-01T10:00:00')[2] == 201
+    assert book(client, second, '2030-01-01T10:00:00')[2] == 201
+
+def test_update_recomputes_materialized_window(make_user, make_service):
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    client = make_user('client@example.com')
+    short = make_service(freelancer, duration=30)
+    long = make_service(freelancer, duration=120)
+
+    appointment, _, _ = book(client, short, '2030-01-01T10:00:00')
+    appointment, error, status_code = AppointmentService.update_appointment(appointment.id, {'service_id': long.id})
+
+    assert status_code == 200
+    assert appointment.ends_at.isoformat() == '2030-01-01T12:00:00'
+    assert book(client, short, '2030-01-01T11:00:00')[2] == 409
+
+def test_availability_skips_busy_intervals(app, make_user, make_service):
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    client = make_user('client@example.com')
+    service = make_service(freelancer, duration=60)
+    book(client, service, '2030-01-01T10:00:00')
+    book(client, make_service(freelancer, duration=30), '2030-01-01T11:00:00')
+
+    response = app.test_client().get(
+        f'/api/v0/services/{service.id}/availability?from=2030-01-01T09:00:00&to=2030-01-01T13:00:00&step=30'
+    )
+
+    assert response.status_code == 200
+    assert [slot['start'] for slot in response.json['slots']] == [
+        '2030-01-01T09:00:00', '2030-01-01T11:30:00', '2030-01-01T12:00:00'
+    ]
+    assert response.json['next'] is None
+
+def test_availability_accounts_for_booking_started_before_window(app, make_user, make_service):
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    client = make_user('client@example.com')
+    service = make_service(freelancer, duration=60)
+    book(client, make_service(freelancer, duration=2 * 24 * 60), '2029-12-31T00:00:00')
+
+    response = app.test_client().get(
+        f'/api/v0/services/{service.id}/availability?from=2030-01-01T20:00:00&to=2030-01-02T03:00:00&step=60'
+    )
+
+    assert [slot['start'] for slot in response.json['slots']] == [
+        '2030-01-02T00:00:00', '2030-01-02T01:00:00', '2030-01-02T02:00:00'
+    ]
+
+def test_availability_paginates_large_windows(app, make_user, make_service):
+    service = make_service(make_user('pro@example.com', is_freelancer=True), duration=30)
+    client = app.test_client()
+    url = f'/api/v0/services/{service.id}/availability?to=2030-01-31T00:00:00&step=30&limit=50&from='
+
+    first = client.get(url + '2030-01-01T00:00:00').json
+    second = client.get(url + first['next']).json
+
+    assert len(first['slots']) == 50
+    assert first['next'] == '2030-01-02T01:00:00'
+    assert second['slots'][0]['start'] == first['next']
+
+def test_availability_rejects_bad_window(app, make_user, make_service):
+    service = make_service(make_user('pro@example.com', is_freelancer=True))
+    response = app.test_client().get(
+        f'/api/v0/services/{service.id}/availability?from=2030-01-02T00:00:00&to=2030-01-01T00:00:00'
+    )
+    assert response.status_code == 400
+
+def test_client_appointments_are_keyset_paginated(app, make_user, make_service):
+    from app.utils.jwt_utils import generate_access_token
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    client = make_user('client@example.com')
+    service = make_service(freelancer, duration=60)
+    for hour in range(10, 15):
+        book(client, service, f'2030-01-01T{hour}:00:00')
+    http = app.test_client()
+    headers = {'Authorization': f'Bearer {generate_access_token(client)}'}
+    url = f'/api/v0/appointments/client/{client.id}?limit=2'
+
+    seen = []
+    response = http.get(url, headers=headers)
+    while True:
+        assert response.status_code == 200
+        seen += [appointment['scheduled_at'] for appointment in response.json['items']]
+        cursor = response.json['next']
+        assert response.headers.get('X-Next-Cursor') == cursor
+        if not cursor:
+            break
+        response = http.get(f'{url}&after={cursor}', headers=headers)
+
+    assert seen == [f'2030-01-01T{hour}:00:00' for hour in range(10, 15)]
+    assert http.get(f'{url}&after=not-a-cursor', headers=headers).status_code == 400
+    # Well-formed cursors whose values have the wrong types: [1, 2] and ["2030-01-01T10:00:00", "x"]
+    for cursor in ('WzEsIDJd', 'WyIyMDMwLTAxLTAxVDEwOjAwOjAwIiwgIngiXQ'):
+        assert http.get(f'{url}&after={cursor}', headers=headers).status_code == 400
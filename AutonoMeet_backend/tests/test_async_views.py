@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler
+import pytest
+from app import db
+from app.models.appointment import Appointment
+from app.services.auth_service import AuthService
+
+@pytest.fixture
+def async_views(app):
+    app.config['ASYNC_VIEWS'] = True
+    return app
+
+def unused(*args, **kwargs):
+    raise AssertionError("served by the other mode's view")
+
+def test_github_sign_in_with_async_views(async_views, fake_github, monkeypatch):
+    monkeypatch.setattr(AuthService, 'github_auth', staticmethod(unused))
+    client = async_views.test_client()
+
+    first = client.post('/api/v0/auth/github', json={'code': 'good'})
+    second = client.post('/api/v0/auth/github', json={'code': 'good'})
+    bad = client.post('/api/v0/auth/github', json={'code': 'bad'})
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.json['user_id'] == second.json['user_id']
+    assert first.json['email'] == 'dev@example.com'
+    # The transient 503 on the first profile lookup was retried
+    assert fake_github.count(('GET', '/user')) == 3
+    assert bad.status_code == 401
+    # Every request's event loop closed its connections on the way out
+    assert not async_views.extensions['async_http_clients']
+
+    started = time.monotonic()
+    assert client.post('/api/v0/auth/github', json={'code': 'slow'}).status_code == 502
+    assert time.monotonic() - started < 1
+
+def test_async_views_keep_restx_method_decorators(async_views):
+    response = async_views.test_client().post('/api/v0/appointments/checkout', json={'service_id': 1})
+    assert response.status_code == 401
+
+def test_concurrent_sign_ins_share_two_database_threads(async_views, local_server):
+    in_flight = 20
+    everyone_waiting = threading.Barrier(in_flight, timeout=10)
+
+    class Handler(BaseHTTPRequestHandler):
+        def reply(self, body):
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            code = self.rfile.read(int(self.headers['Content-Length'])).decode().rsplit('code=', 1)[1]
+            # Answers only once every sign-in's code exchange is waiting on us
+            everyone_waiting.wait()
+            self.reply({'access_token': code})
+
+        def do_GET(self):
+            github_id = int(self.headers['Authorization'].split()[1])
+            self.reply({'id': github_id, 'email': f'dev{github_id}@example.com'})
+
+        def log_message(self, *args):
+            pass
+
+    base_url = local_server(Handler)
+    async_views.config['GITHUB_OAUTH_URL'] = f'{base_url}/login/oauth/access_token'
+    async_views.config['GITHUB_API_URL'] = base_url
+    async_views.extensions['async_db'] = ThreadPoolExecutor(2, thread_name_prefix='async-db')
+
+    def sign_in(github_id):
+        return async_views.test_client().post('/api/v0/auth/github', json={'code': str(github_id)})
+
+    with ThreadPoolExecutor(in_flight) as requests:
+        responses = list(requests.map(sign_in, range(1, in_flight + 1)))
+
+    assert [response.status_code for response in responses] == [200] * in_flight
+    assert {response.json['email'] for response in responses} == {f'dev{i}@example.com' for i in range(1, in_flight + 1)}
+    assert db.session.execute(db.text('SELECT count(*) FROM users')).scalar() == in_flight
+
+def test_payment_success_waits_for_the_webhook(async_views, make_user, make_service):
+    client = make_user('client@example.com')
+    service = make_service(make_user('pro@example.com', is_freelancer=True))
+    client_id, service_id, freelancer_id = client.id, service.id, service.user_id
+    async_views.config['PAYMENT_SUCCESS_WAIT'] = 5
+    url = '/api/v0/appointments/success?session_id=cs_1'
+    async_views.config['ASYNC_VIEWS'] = False
+    assert async_views.test_client().get(url).status_code == 202
+    async_views.config['ASYNC_VIEWS'] = True
+
+    def webhook_lands():
+        time.sleep(0.3)
+        with async_views.app_context():
+            scheduled_at = datetime(2030, 1, 1, 10, 0)
+            db.session.add(Appointment(client_id=client_id, service_id=service_id, freelancer_id=freelancer_id,
+                                       scheduled_at=scheduled_at, ends_at=scheduled_at + timedelta(hours=1),
+                                       stripe_session_id='cs_1'))
+            db.session.commit()
+            db.session.remove()
+
+    thread = threading.Thread(target=webhook_lands)
+    thread.start()
+    response = async_views.test_client().get(url)
+    thread.join()
+
+    assert response.status_code == 200
+    assert response.json['appointment']['service_id'] == service_id
+
+def test_sync_views_by_default(app, fake_github, monkeypatch):
+    monkeypatch.setattr(AuthService, 'github_auth_async', staticmethod(unused))
+
+    sign_in = app.test_client().post('/api/v0/auth/github', json={'code': 'good'})
+
+    assert not app.config['ASYNC_VIEWS']
+    assert sign_in.status_code == 200 and sign_in.json['email'] == 'dev@example.com'
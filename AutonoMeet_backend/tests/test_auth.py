@@ -0,0 +1,202 @@
+import pytest
+from sqlalchemy import event
+from app import db
+from app.utils.jwt_utils import generate_access_token, invalidate_principal
+
+
+@pytest.fixture
+def user_queries(app):
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        if 'FROM users' in statement:
+            statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', listener)
+
+def test_principal_is_cached_between_requests(app, make_user, make_service, user_queries):
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    service = make_service(freelancer)
+    headers = {'Authorization': f'Bearer {generate_access_token(freelancer)}'}
+    client = app.test_client()
+    user_queries.clear()
+
+    for _ in range(3):
+        assert client.delete(f'/api/v0/services/{service.id + 1}', headers=headers).status_code == 404
+    assert len(user_queries) == 1
+
+    invalidate_principal(freelancer.id)
+    client.delete(f'/api/v0/services/{service.id + 1}', headers=headers)
+    assert len(user_queries) == 2
+
+def test_claims_only_routes_skip_the_user_lookup(app, make_user, user_queries):
+    user = make_user('client@example.com')
+    headers = {'Authorization': f'Bearer {generate_access_token(user)}'}
+    user_queries.clear()
+
+    response = app.test_client().get(f'/api/v0/appointments/client/{user.id}', headers=headers)
+
+    assert response.status_code == 200
+    assert user_queries == []
+
+def test_user_writes_and_deletes_refresh_the_cached_principal(app, make_user):
+    from app.utils.jwt_utils import load_principal
+    user = make_user('pro@example.com', is_freelancer=True)
+    user_id = user.id
+    assert load_principal(user_id).is_freelancer
+
+    user.is_freelancer = False
+    db.session.commit()
+    assert not load_principal(user_id).is_freelancer
+
+    db.session.delete(user)
+    db.session.commit()
+    assert load_principal(user_id) is None
+
+@pytest.mark.parametrize('async_views', [False, True])
+def test_claims_only_routes_reject_deleted_users_on_writes(app, make_user, async_views):
+    user = make_user('client@example.com')
+    headers = {'Authorization': f'Bearer {generate_access_token(user)}'}
+    client = app.test_client()
+    app.config['ASYNC_VIEWS'] = async_views
+    db.session.delete(user)
+    db.session.commit()
+
+    response = client.post('/api/v0/appointments/checkout', headers=headers, json={'service_id': 1})
+
+    assert response.status_code == 401
+    assert response.json == {"message": "User not found"}
+
+def test_tampered_token_is_rejected_after_a_cached_verification(app, make_user):
+    user = make_user('client@example.com')
+    token = generate_access_token(user)
+    client = app.test_client()
+    url = f'/api/v0/appointments/client/{user.id}'
+
+    assert client.get(url, headers={'Authorization': f'Bearer {token}'}).status_code == 200
+    tampered = token[:-2] + ('AA' if token[-2:] != 'AA' else 'BB')
+    assert client.get(url, headers={'Authorization': f'Bearer {tampered}'}).status_code == 401
+
+@pytest.fixture
+def google_issuer(app, local_server):
+    import datetime
+    import json
+    import time
+    from http.server import BaseHTTPRequestHandler
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+    from google.auth import crypt, jwt as google_jwt
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'stand-in issuer')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key()) \
+        .serial_number(x509.random_serial_number()).not_valid_before(now) \
+        .not_valid_after(now + datetime.timedelta(days=1)).sign(key, hashes.SHA256())
+    certs = json.dumps({'kid-1': cert.public_bytes(serialization.Encoding.PEM).decode()}).encode()
+    requests_served = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_served.append(self.path)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Cache-Control', 'public, max-age=3600')
+            self.send_header('Content-Length', str(len(certs)))
+            self.end_headers()
+            self.wfile.write(certs)
+
+        def log_message(self, *args):
+            pass
+
+    app.config['GOOGLE_CLIENT_ID'] = 'test-client-id'
+    app.config['GOOGLE_CERTS_URL'] = f'{local_server(Handler)}/certs'
+    private_pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    signer = crypt.RSASigner.from_string(private_pem, key_id='kid-1')
+
+    def issue(email, audience='test-client-id'):
+        issued_at = int(time.time())
+        return google_jwt.encode(signer, {
+            'iss': 'https://accounts.google.com', 'aud': audience, 'email': email,
+            'iat': issued_at, 'exp': issued_at + 600
+        }).decode()
+
+    issue.requests_served = requests_served
+    return issue
+
+def test_google_sign_in_reuses_cached_certificates(app, google_issuer):
+    client = app.test_client()
+
+    first = client.post('/api/v0/auth/google', json={'token': google_issuer('Someone@Example.com')})
+    second = client.post('/api/v0/auth/google', json={'token': google_issuer('someone@example.com')})
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.json['user_id'] == second.json['user_id']
+    assert first.json['email'] == 'someone@example.com'
+    assert google_issuer.requests_served == ['/certs']
+
+def test_google_token_for_another_audience_is_rejected(app, google_issuer):
+    response = app.test_client().post('/api/v0/auth/google', json={'token': google_issuer('a@example.com', audience='other')})
+    assert response.status_code == 401
+
+def test_github_sign_in_through_fake_upstream(app, fake_github):
+    client = app.test_client()
+
+    first = client.post('/api/v0/auth/github', json={'code': 'good'})
+    second = client.post('/api/v0/auth/github', json={'code': 'good'})
+
+    assert first.status_code == 200
+    assert first.json['user_id'] == second.json['user_id']
+    assert first.json['email'] == 'dev@example.com'
+    assert fake_github.count(('GET', '/user')) == 3
+    assert client.post('/api/v0/auth/github', json={'code': 'bad'}).status_code == 401
+
+def test_slow_github_is_cut_off_by_the_read_timeout(app, fake_github):
+    import time
+    started = time.monotonic()
+
+    response = app.test_client().post('/api/v0/auth/github', json={'code': 'slow'})
+
+    assert response.status_code == 502
+    assert time.monotonic() - started < 1
+    assert fake_github.count(('POST', '/login/oauth/access_token')) == 1
+
+def test_login_rehashes_passwords_with_outdated_parameters(app):
+    from app.models.user import User
+    from app.utils.password_hashing import init_password_hasher
+    client = app.test_client()
+    client.post('/api/v0/auth/register', json={'email': 'someone@example.com', 'password': 'secret'})
+    assert User.query.one().password_hash.startswith('pbkdf2:sha256:1000$')
+
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:2000'
+    init_password_hasher(app)
+
+    assert client.post('/api/v0/auth/login', json={'email': 'someone@example.com', 'password': 'secret'}).status_code == 200
+    db.session.expire_all()
+    assert User.query.one().password_hash.startswith('pbkdf2:sha256:2000$')
+    assert client.post('/api/v0/auth/login', json={'email': 'someone@example.com', 'password': 'wrong'}).status_code == 401
+
+def test_hashing_runs_in_worker_processes_and_reports_metrics():
+    from app.utils.password_hashing import PasswordHasher
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=1, max_pending=4, queue_timeout=5)
+
+    password_hash = hasher.hash('secret')
+
+    assert hasher.verify(password_hash, 'secret')
+    assert not hasher.needs_rehash(password_hash)
+    stats = hasher.stats()
+    assert stats['completed'] == 2 and stats['in_flight'] == 0 and stats['max_latency_ms'] > 0
+    # Workers never start by forking the threaded server process
+    assert hasher._pool()._mp_context.get_start_method() in ('forkserver', 'spawn')
+
+def test_full_hashing_queue_pushes_back():
+    from app.utils.password_hashing import PasswordHasher, HashingBusyError
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=0, max_pending=1, queue_timeout=0.01)
+    hasher._slots.acquire()
+
+    with pytest.raises(HashingBusyError):
+        hasher.hash('secret')
+    assert hasher.stats()['rejected'] == 1
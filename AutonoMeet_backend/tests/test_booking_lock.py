@@ -0,0 +1,112 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import text
+from app import db
+from app.services.appointment_service import AppointmentService
+from app.utils.booking_lock import BookingBusyError, KeyedLocks
+
+THREADS = 8
+ATTEMPTS_PER_THREAD = 25
+SLOTS = 20
+
+def overlapping_pairs():
+    return db.session.execute(text(
+        "SELECT count(*) FROM appointments a JOIN appointments b "
+        "ON a.freelancer_id = b.freelancer_id AND a.id < b.id "
+        "AND a.scheduled_at < b.ends_at AND b.scheduled_at < a.ends_at"
+    )).scalar()
+
+def test_concurrent_bookings_never_double_book(app, make_user, make_service, record_property):
+    freelancers = [make_user(f'pro{i}@example.com', is_freelancer=True) for i in range(2)]
+    # 60-minute services on a 30-minute grid: neighbouring slots overlap too
+    services = [make_service(freelancer, duration=60) for freelancer in freelancers]
+    clients = [make_user(f'client{i}@example.com') for i in range(THREADS)]
+    service_ids = [service.id for service in services]
+    client_ids = [client.id for client in clients]
+    start = datetime(2030, 1, 1, 8, 0)
+    db.session.remove()
+
+    def worker(index):
+        statuses = []
+        with app.app_context():
+            for attempt in range(ATTEMPTS_PER_THREAD):
+                slot = start + timedelta(minutes=30 * ((index * 7 + attempt) % SLOTS))
+                _, _, status_code = AppointmentService.create_appointment({
+                    'client_id': client_ids[index],
+                    'service_id': service_ids[(index + attempt) % len(service_ids)],
+                    'scheduled_at': slot.strftime('%Y-%m-%dT%H:%M:%S')
+                })
+                statuses.append(status_code)
+            db.session.remove()
+        return statuses
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        statuses = [status for result in pool.map(worker, range(THREADS)) for status in result]
+    seconds = time.perf_counter() - began
+
+    throughput = len(statuses) / seconds
+    record_property('booking_attempts_per_second', round(throughput, 1))
+
+    assert set(statuses) <= {200, 201, 409}
+    assert overlapping_pairs() == 0
+    # Every other 30-minute slot fits a 60-minute booking, per freelancer
+    assert statuses.count(201) == len(service_ids) * SLOTS // 2
+
+def test_other_keys_are_not_blocked_while_one_is_held():
+    locks = KeyedLocks()
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with locks.hold(1):
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait(5)
+    try:
+        with locks.hold(2, timeout=0.5):
+            pass
+        with pytest.raises(BookingBusyError):
+            with locks.hold(1, timeout=0.05):
+                pass
+    finally:
+        release.set()
+        thread.join()
+
+    with locks.hold(1, timeout=0.5):
+        pass
+    assert locks._locks == {}
+
+def test_busy_freelancer_lock_returns_503(app, make_user, make_service):
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    service = make_service(freelancer)
+    client = make_user('client@example.com')
+    freelancer_id, service_id, client_id = freelancer.id, service.id, client.id
+    app.config['BOOKING_LOCK_TIMEOUT'] = 0.05
+    acquired = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with app.extensions['booking_locks'].hold(freelancer_id):
+            acquired.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    acquired.wait(5)
+    try:
+        _, error, status_code = AppointmentService.create_appointment({
+            'client_id': client_id, 'service_id': service_id, 'scheduled_at': '2030-01-01T10:00:00'
+        })
+    finally:
+        release.set()
+        thread.join()
+
+    assert status_code == 503
+    assert 'try again' in error
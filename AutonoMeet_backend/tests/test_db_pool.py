@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app import create_app, db
+from app.utils.db_pool import InstrumentedQueuePool, pool_stats
+from app.utils.jwt_utils import generate_access_token
+
+
+def test_pool_is_sized_from_config(app):
+    assert isinstance(db.engine.pool, InstrumentedQueuePool)
+    assert db.engine.pool.size() == app.config['DB_POOL_SIZE']
+    assert db.engine.pool._pre_ping is True
+
+def test_explicit_engine_options_win(tmp_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'pool.db'}",
+        'DB_POOL_SIZE': 3,
+        'SQLALCHEMY_ENGINE_OPTIONS': {'pool_size': 7, 'pool_pre_ping': False}
+    })
+    with app.app_context():
+        assert db.engine.pool.size() == 7
+        assert db.engine.pool._pre_ping is False
+
+def test_saturated_pool_reports_waits_and_timeouts(tmp_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'pool.db'}",
+        'DB_POOL_SIZE': 1,
+        'DB_MAX_OVERFLOW': 0,
+        'DB_POOL_TIMEOUT': 1
+    })
+    with app.app_context():
+        held = db.engine.connect()
+        with pytest.raises(PoolTimeoutError):
+            db.engine.connect()
+        stats = pool_stats()['default']
+        held.close()
+
+    assert stats['checked_out'] == 1
+    assert stats['overflow'] == 0
+    assert stats['wait']['timeouts'] == 1
+    assert stats['wait']['max_ms'] >= 900
+
+def test_admin_endpoint_reports_checkouts_per_request(app, make_user, make_service):
+    app.config['ADMIN_EMAILS'] = ['ops@example.com']
+    make_service(make_user('pro@example.com', is_freelancer=True))
+    admin_token = generate_access_token(make_user('ops@example.com'))
+    user_token = generate_access_token(make_user('someone@example.com'))
+    db.session.close()
+    client = app.test_client()
+
+    client.get('/api/v0/services/?limit=1')
+    forbidden = client.get('/api/v0/admin/db-pool', headers={'Authorization': f'Bearer {user_token}'})
+    response = client.get('/api/v0/admin/db-pool', headers={'Authorization': f'Bearer {admin_token}'})
+
+    assert forbidden.status_code == 403
+    assert response.status_code == 200
+    stats = response.get_json()['default']
+    assert stats['pool'] == 'InstrumentedQueuePool'
+    assert stats['checkouts'] >= stats['checkins'] > 0
+    listing = stats['requests']['by_endpoint']['services_service_list']
+    assert listing == {'requests': 1, 'avg_checkouts': 1.0, 'max_checkouts': 1}
@@ -0,0 +1,28 @@
+from benchmarks.bench_load import SCENARIOS, regressions, run_suite
+
+TINY = {'freelancers': 10, 'services_per_freelancer': 2, 'clients': 10, 'appointments': 50,
+        'threads': 2, 'requests': 20}
+
+def test_suite_drives_every_scenario_without_errors():
+    report = run_suite(TINY)
+
+    assert list(report['scenarios']) == list(SCENARIOS)
+    for result in report['scenarios'].values():
+        assert result['requests'] == 20
+        assert result['errors'] == 0
+        assert 0 < result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+    assert set(report['scenarios']['booking']['statuses']) <= {'200', '201', '409'}
+    assert 'double_bookings' in report['scenarios']['booking']
+
+def test_regressions_compare_against_the_baseline():
+    baseline = {'scenarios': {'catalogue': {'p95_ms': 10.0, 'throughput_rps': 100.0}}}
+    def report(p95, rps, errors=0, double_bookings=0):
+        return {'scenarios': {'catalogue': {'p95_ms': p95, 'throughput_rps': rps, 'errors': errors,
+                                            'double_bookings': double_bookings}}}
+
+    assert regressions(report(14.0, 60.0), baseline, 0.5) == []
+    assert len(regressions(report(16.0, 100.0), baseline, 0.5)) == 1
+    assert len(regressions(report(10.0, 40.0), baseline, 0.5)) == 1
+    assert len(regressions(report(10.0, 100.0, errors=1), baseline, 0.5)) == 1
+    assert regressions(report(10.0, 100.0, double_bookings=2), baseline, 0.5) == []
+    assert len(regressions(report(10.0, 100.0, double_bookings=2), baseline, 0.5, forbid_double_bookings=True)) == 1
@@ -0,0 +1,84 @@
+import io
+import json
+import logging
+import threading
+import pytest
+from app.services.serv_service import ServiceService
+from app.utils.structured_logging import DebugSampler, JsonFormatter, LogPipeline
+
+@pytest.fixture
+def pipeline():
+    stream = io.StringIO()
+    pipeline = LogPipeline(stream, JsonFormatter(), queue_size=100)
+    logger = logging.getLogger('tests.structured')
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(pipeline.handler)
+    yield pipeline, logger, stream
+    logger.removeHandler(pipeline.handler)
+    pipeline.stop()
+
+def lines(pipeline, stream):
+    pipeline.flush()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+def test_records_are_written_as_json_with_request_fields(app, pipeline):
+    pipeline, logger, stream = pipeline
+
+    with app.test_request_context('/api/v0/services/', method='GET'):
+        logger.info("Listed %d services", 3, extra={'cache': 'hit'})
+
+    [entry] = lines(pipeline, stream)
+    assert entry['level'] == 'INFO'
+    assert entry['message'] == 'Listed 3 services'
+    assert (entry['method'], entry['path'], entry['cache']) == ('GET', '/api/v0/services/', 'hit')
+
+def test_formatting_is_deferred_except_for_objects(pipeline):
+    pipeline, logger, stream = pipeline
+    formatted_on = []
+
+    class Model:
+        def __str__(self):
+            formatted_on.append(threading.current_thread().name)
+            return 'model'
+
+    queued = []
+    pipeline.listener.handlers[0].addFilter(lambda record: queued.append(record.args) or True)
+    logger.info("Loaded %s", Model())
+    logger.info("Plain %s", 'value')
+
+    assert [entry['message'] for entry in lines(pipeline, stream)] == ['Loaded model', 'Plain value']
+    assert formatted_on == [threading.current_thread().name]
+    # Plain arguments reach the writer thread unformatted
+    assert queued == [None, ('value',)]
+
+def test_debug_records_are_sampled():
+    sampler = DebugSampler(0.1)
+    debug = logging.LogRecord('x', logging.DEBUG, '', 0, 'debug', None, None)
+    warning = logging.LogRecord('x', logging.WARNING, '', 0, 'warning', None, None)
+
+    assert sum(sampler.filter(debug) for _ in range(1000)) == 100
+    assert all(sampler.filter(warning) for _ in range(10))
+    assert not DebugSampler(0).filter(debug)
+
+def test_a_full_queue_drops_records_instead_of_blocking():
+    pipeline = LogPipeline(io.StringIO(), JsonFormatter(), queue_size=1)
+    pipeline.listener.stop()
+    logger = logging.getLogger('tests.full')
+    logger.propagate = False
+    logger.addHandler(pipeline.handler)
+
+    for i in range(3):
+        logger.warning("record %d", i)
+
+    logger.removeHandler(pipeline.handler)
+    assert pipeline.handler.dropped == 2
+
+def test_services_by_freelancer_no_longer_prints(app, make_user, make_service, capsys):
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    make_service(freelancer)
+
+    page, _, _ = ServiceService.get_services_by_freelancer(freelancer.id, 10)
+
+    assert len(page.items) == 1
+    assert capsys.readouterr().out == ''
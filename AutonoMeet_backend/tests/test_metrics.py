@@ -0,0 +1,113 @@
+import re
+import threading
+from http.server import BaseHTTPRequestHandler
+from app.utils.http_client import http_client
+from app.utils.metrics import build_registry
+
+def scrape(client, token='scrape-me'):
+    client.application.config['METRICS_TOKEN'] = token
+    response = client.get('/metrics', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    return response.get_data(as_text=True)
+
+def sample(text, name, **labels):
+    """Value of the sample ``name`` whose labels include ``labels``."""
+    for line in text.splitlines():
+        match = re.match(r'^(\w+)(?:\{(.*)\})? (\S+)$', line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ''))
+        if all(found.get(key) == value for key, value in labels.items()):
+            return float(match.group(3))
+    return None
+
+def test_request_latency_and_db_usage_per_resource(app, make_user, make_service):
+    make_service(make_user('pro@example.com', is_freelancer=True))
+    client = app.test_client()
+
+    for _ in range(3):
+        client.get('/api/v0/services/?limit=1')
+    client.get('/api/v0/services/999')
+    text = scrape(client)
+
+    route = {'namespace': 'services', 'resource': 'ServiceList'}
+    assert sample(text, 'autonomeet_http_request_duration_seconds_count', method='GET', status='200', **route) == 3
+    assert sample(text, 'autonomeet_http_request_duration_seconds_bucket', le='+Inf', status='200', **route) == 3
+    assert sample(text, 'autonomeet_http_request_duration_seconds_count',
+                  namespace='services', resource='ServiceResource', status='404') == 1
+    assert sample(text, 'autonomeet_db_queries_per_request_count', **route) == 3
+    # The first listing queries the database; the next two are cache hits
+    assert sample(text, 'autonomeet_db_queries_per_request_sum', **route) == 1
+    assert sample(text, 'autonomeet_db_time_per_request_seconds_sum', **route) > 0
+    assert sample(text, 'autonomeet_db_query_duration_seconds_count', bind='default') > 0
+
+def test_outbound_calls_are_timed_per_upstream(app, local_server):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200 if self.path == '/ok' else 503)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    app.config['HTTP_RETRIES'] = 0
+    url = local_server(Handler)
+    http_client().get(f'{url}/ok', upstream='google')
+    http_client().get(f'{url}/down', upstream='github')
+    text = scrape(app.test_client())
+
+    name = 'autonomeet_outbound_request_duration_seconds_count'
+    assert sample(text, name, upstream='google', outcome='2xx') == 1
+    assert sample(text, name, upstream='github', outcome='5xx') == 1
+
+def test_password_hashing_latency_and_queue_are_exported(app):
+    client = app.test_client()
+    client.post('/api/v0/auth/register', json={'email': 'someone@example.com', 'password': 'secret'})
+    client.post('/api/v0/auth/login', json={'email': 'someone@example.com', 'password': 'secret'})
+    text = scrape(client)
+
+    assert sample(text, 'autonomeet_password_hash_duration_seconds_count') == 2
+    assert sample(text, 'autonomeet_password_hash_duration_seconds_sum') > 0
+    assert sample(text, 'autonomeet_password_hash_queue_depth') == 0
+    assert sample(text, 'autonomeet_password_hash_in_flight') == 0
+    assert sample(text, 'autonomeet_password_hash_rejected_total') == 0
+
+def test_cache_hits_and_misses_are_exported(app, make_user, make_service):
+    service = make_service(make_user('pro@example.com', is_freelancer=True))
+    client = app.test_client()
+    for _ in range(3):
+        client.get(f'/api/v0/services/{service.id}')
+    text = scrape(client)
+
+    assert sample(text, 'autonomeet_cache_misses_total', cache='services') == 1
+    assert sample(text, 'autonomeet_cache_hits_total', cache='services') == 2
+    assert sample(text, 'autonomeet_cache_size', cache='services') == 1
+    assert sample(text, 'autonomeet_cache_hits_total', cache='verified_tokens') == 0
+
+def test_metrics_token_guards_the_endpoint(app):
+    client = app.test_client()
+    # Closed by default
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer '}).status_code == 403
+
+    app.config['METRICS_TOKEN'] = 'scrape-me'
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    scrape(client)
+
+def test_concurrent_observations_are_not_lost():
+    registry = build_registry()
+    histogram = registry['db_query_duration_seconds']
+    threads = [
+        threading.Thread(target=lambda: [histogram.observe(0.001, 'default') for _ in range(20000)])
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = registry.render()
+    assert sample(text, 'autonomeet_db_query_duration_seconds_count', bind='default') == 160000
+    assert sample(text, 'autonomeet_db_query_duration_seconds_bucket', bind='default', le='0.005') == 160000
@@ -0,0 +1,105 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+from app import db
+from app.models.appointment import Appointment
+from app.models.service import Service
+from app.serializers.appointment import appointment_projection
+from app.serializers.service import service_projection
+from app.services.appointment_service import APPOINTMENT_ORDER
+from app.services.serv_service import SERVICE_ORDER, SERVICE_SORTS, listing_conditions
+from app.utils.migrations import applied_versions, downgrade, load_migrations, upgrade
+
+
+def model_schema():
+    return {
+        table.name: ({column.name for column in table.columns}, {index.name for index in table.indexes})
+        for table in db.metadata.sorted_tables
+    }
+
+def database_schema(engine):
+    inspector = inspect(engine)
+    return {
+        name: ({c['name'] for c in inspector.get_columns(name)}, {i['name'] for i in inspector.get_indexes(name)})
+        for name in inspector.get_table_names() if name != 'schema_migrations'
+    }
+
+def explain(statement):
+    """Query plan text for ``statement`` on the test database."""
+    sql = str(statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    if db.engine.dialect.name == 'postgresql':
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('SET LOCAL enable_seqscan = off')
+            return '\n'.join(row[0] for row in conn.exec_driver_sql(f'EXPLAIN {sql}'))
+    return '\n'.join(row[-1] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')))
+
+def test_migrations_build_the_models_schema(app):
+    assert database_schema(db.engine) == model_schema()
+    assert applied_versions() == [migration.version for migration in load_migrations()]
+
+def test_migrations_are_reversible(app):
+    reverted = downgrade(0)
+
+    assert [m.version for m in reverted] == sorted((m.version for m in load_migrations()), reverse=True)
+    assert database_schema(db.engine) == {}
+    assert upgrade() and database_schema(db.engine) == model_schema()
+
+def test_upgrade_adopts_a_database_built_by_create_all(app, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    db.metadata.create_all(engine)
+
+    upgrade(engine=engine)
+
+    assert database_schema(engine) == model_schema()
+    assert applied_versions(engine) == [migration.version for migration in load_migrations()]
+    engine.dispose()
+
+def test_upgrade_backfills_existing_appointments(app):
+    downgrade(1)
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO users (id, email, is_freelancer) VALUES (1, 'pro@example.com', 1), (2, 'client@example.com', 0)")
+        conn.exec_driver_sql("INSERT INTO services (id, user_id, title, price, duration) VALUES (1, 1, 'Yoga', 10.0, 90)")
+        conn.exec_driver_sql(
+            "INSERT INTO appointments (client_id, service_id, scheduled_at, created_at) "
+            "VALUES (2, 1, '2030-01-01 10:00:00.000000', '2029-12-01 00:00:00.000000')"
+        )
+
+    upgrade()
+
+    appointment = Appointment.query.one()
+    assert appointment.freelancer_id == 1
+    assert appointment.ends_at == datetime(2030, 1, 1, 11, 30)
+
+@pytest.mark.parametrize('statement, index', [
+    (lambda: appointment_projection().where(Appointment.client_id == 1).order_by(*APPOINTMENT_ORDER).limit(100),
+     'ix_appointments_client_schedule'),
+    (lambda: appointment_projection(with_service=True).where(Appointment.freelancer_id == 1)
+     .order_by(*APPOINTMENT_ORDER).limit(100),
+     'ix_appointments_freelancer_schedule'),
+    (lambda: appointment_projection().order_by(*APPOINTMENT_ORDER).limit(100),
+     'ix_appointments_scheduled_at_id'),
+    (lambda: select(Appointment.id).where(Appointment.service_id == 1),
+     'ix_appointments_service_schedule'),
+    (lambda: select(Appointment.ends_at).where(
+        Appointment.freelancer_id == 1, Appointment.scheduled_at < datetime(2030, 1, 1)
+    ).order_by(Appointment.scheduled_at.desc()).limit(1),
+     'ix_appointments_freelancer_window'),
+    (lambda: service_projection().where(Service.user_id == 1).order_by(*SERVICE_ORDER).limit(100),
+     'ix_services_user_id_id'),
+    (lambda: service_projection().where(Service.category_id == 1).order_by(*SERVICE_ORDER).limit(100),
+     'ix_services_category_id_id'),
+    (lambda: service_projection().where(*listing_conditions(min_price=10, max_price=50))
+     .order_by(*SERVICE_SORTS['price'][0]).limit(100),
+     'ix_services_price_id'),
+    (lambda: service_projection().where(*listing_conditions(max_duration=60))
+     .order_by(*(column.desc() for column in SERVICE_SORTS['-duration'][0])).limit(100),
+     'ix_services_duration_id'),
+    (lambda: service_projection().where(*listing_conditions(category_id=1, max_price=50))
+     .order_by(*SERVICE_SORTS['price'][0]).limit(100),
+     'ix_services_category_price_id'),
+])
+def test_hot_queries_use_their_indexes(app, statement, index):
+    plan = explain(statement())
+
+    assert index in plan
+    assert 'TEMP B-TREE' not in plan
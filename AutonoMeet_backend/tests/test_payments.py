@@ -0,0 +1,148 @@
+import hashlib
+import hmac
+import json
+import time
+import pytest
+from app.services.payment_service import PaymentService
+
+WEBHOOK_SECRET = 'whsec_test'
+
+
+@pytest.fixture
+def signed_checkout(app):
+    app.config['STRIPE_WEBHOOK_SECRET'] = WEBHOOK_SECRET
+
+    def _signed_checkout(event_id, session_id, metadata, payment_status='paid', secret=WEBHOOK_SECRET):
+        payload = json.dumps({
+            'id': event_id,
+            'type': 'checkout.session.completed',
+            'data': {'object': {
+                'id': session_id,
+                'object': 'checkout.session',
+                'payment_status': payment_status,
+                'metadata': metadata
+            }}
+        }).encode()
+        timestamp = int(time.time())
+        digest = hmac.new(secret.encode(), f'{timestamp}.'.encode() + payload, hashlib.sha256).hexdigest()
+        return payload, f't={timestamp},v1={digest}'
+    return _signed_checkout
+
+def booking_metadata(client, service, scheduled_at='2030-01-01T10:00:00'):
+    return {'client_id': str(client.id), 'service_id': str(service.id), 'scheduled_at': scheduled_at}
+
+def test_completed_checkout_is_booked_once(app, make_user, make_service, signed_checkout):
+    client = make_user('client@example.com')
+    service = make_service(make_user('pro@example.com', is_freelancer=True))
+    payload, signature = signed_checkout('evt_1', 'cs_1', booking_metadata(client, service))
+    http = app.test_client()
+
+    assert http.get('/api/v0/appointments/success?session_id=cs_1').status_code == 202
+
+    job, error, status_code = PaymentService.handle_webhook(payload, signature)
+    assert status_code == 200
+    appointment_id = job.result(timeout=5)
+
+    redelivered, _, status_code = PaymentService.handle_webhook(payload, signature)
+    assert redelivered is None and status_code == 200
+
+    response = http.get('/api/v0/appointments/success?session_id=cs_1')
+    assert response.status_code == 200
+    assert response.json['appointment']['id'] == appointment_id
+    assert response.json['appointment']['scheduled_at'] == '2030-01-01T10:00:00'
+
+def test_webhook_rejects_bad_signatures(app, make_user, make_service, signed_checkout):
+    client = make_user('client@example.com')
+    service = make_service(make_user('pro@example.com', is_freelancer=True))
+    payload, signature = signed_checkout('evt_1', 'cs_1', booking_metadata(client, service), secret='whsec_wrong')
+
+    response = app.test_client().post('/api/v0/appointments/webhook', data=payload,
+                                      headers={'Stripe-Signature': signature, 'Content-Type': 'application/json'})
+
+    assert response.status_code == 400
+
+def test_unbookable_checkout_is_reported_on_success_page(app, make_user, make_service, signed_checkout):
+    client = make_user('client@example.com')
+    service = make_service(make_user('pro@example.com', is_freelancer=True))
+    first = signed_checkout('evt_1', 'cs_1', booking_metadata(client, service))
+    clash = signed_checkout('evt_2', 'cs_2', booking_metadata(make_user('other@example.com'), service, '2030-01-01T10:30:00'))
+
+    PaymentService.handle_webhook(*first)[0].result(timeout=5)
+    PaymentService.handle_webhook(*clash)[0].result(timeout=5)
+
+    response = app.test_client().get('/api/v0/appointments/success?session_id=cs_2')
+    assert response.status_code == 409
+    assert 'Time slot unavailable' in response.json['message']
+
+def test_crashed_booking_job_marks_the_event_failed(app, make_user, make_service, signed_checkout, monkeypatch):
+    from app.services.appointment_service import AppointmentService
+    client = make_user('client@example.com')
+    service = make_service(make_user('pro@example.com', is_freelancer=True))
+
+    def crash(data):
+        raise RuntimeError('database went away')
+    monkeypatch.setattr(AppointmentService, 'create_appointment', crash)
+    job, _, _ = PaymentService.handle_webhook(*signed_checkout('evt_1', 'cs_1', booking_metadata(client, service)))
+    with pytest.raises(RuntimeError):
+        job.result(timeout=5)
+    malformed = {**booking_metadata(client, service), 'client_id': 'abc'}
+    PaymentService.handle_webhook(*signed_checkout('evt_2', 'cs_2', malformed))[0].result(timeout=5)
+
+    http = app.test_client()
+    crashed = http.get('/api/v0/appointments/success?session_id=cs_1')
+    assert crashed.status_code == 409 and 'database went away' in crashed.json['message']
+    invalid = http.get('/api/v0/appointments/success?session_id=cs_2')
+    assert invalid.status_code == 409 and 'Invalid appointment data' in invalid.json['message']
+
+def test_unfinished_events_are_queued_again(app, make_user, make_service, signed_checkout):
+    from datetime import datetime, timedelta
+    from app import db
+    from app.models.stripe_event import StripeEvent
+    client = make_user('client@example.com')
+    service = make_service(make_user('pro@example.com', is_freelancer=True))
+    payload, signature = signed_checkout('evt_1', 'cs_1', booking_metadata(client, service))
+    session = json.loads(payload)['data']['object']
+    # Recorded by a process that died before its job ran
+    db.session.add(StripeEvent(id='evt_1', type='checkout.session.completed', session_id='cs_1',
+                               payload=json.dumps(session)))
+    db.session.add(StripeEvent(id='evt_2', type='checkout.session.completed', session_id='cs_2',
+                               payload=json.dumps({**session, 'id': 'cs_2', 'metadata': booking_metadata(
+                                   client, service, '2030-01-02T10:00:00')}),
+                               received_at=datetime.utcnow() - timedelta(hours=1)))
+    db.session.commit()
+
+    redelivered, _, status_code = PaymentService.handle_webhook(payload, signature)
+    assert status_code == 200 and redelivered.result(timeout=5)
+    swept = PaymentService.requeue_abandoned(app)
+    assert len(swept) == 1 and swept[0].result(timeout=5)
+
+    http = app.test_client()
+    assert http.get('/api/v0/appointments/success?session_id=cs_1').status_code == 200
+    assert http.get('/api/v0/appointments/success?session_id=cs_2').status_code == 200
+    assert PaymentService.handle_webhook(payload, signature)[0] is None
+    assert PaymentService.requeue_abandoned(app) == []
+
+def test_redelivery_during_a_slow_job_books_once(app, make_user, make_service, signed_checkout, monkeypatch):
+    import threading
+    from app.services.appointment_service import AppointmentService
+    client = make_user('client@example.com')
+    service = make_service(make_user('pro@example.com', is_freelancer=True))
+    payload, signature = signed_checkout('evt_1', 'cs_1', booking_metadata(client, service))
+    create_appointment = AppointmentService.create_appointment
+    booking, release, calls = threading.Event(), threading.Event(), []
+
+    def slow_create(data):
+        calls.append(data)
+        booking.set()
+        release.wait(5)
+        return create_appointment(data)
+    monkeypatch.setattr(AppointmentService, 'create_appointment', slow_create)
+
+    first, _, _ = PaymentService.handle_webhook(payload, signature)
+    assert booking.wait(5)
+    redelivered, _, status_code = PaymentService.handle_webhook(payload, signature)
+    assert status_code == 200 and redelivered.result(timeout=5) is None
+    release.set()
+
+    assert first.result(timeout=5)
+    assert len(calls) == 1
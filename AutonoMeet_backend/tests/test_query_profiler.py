@@ -0,0 +1,78 @@
+import logging
+from app import create_app, db
+from app.models.service import Service
+from app.services.appointment_service import AppointmentService
+from app.utils.jwt_utils import generate_access_token
+from app.utils.migrations import upgrade
+from app.utils.query_profiler import normalize, profile_queries
+
+
+def seed_catalogue(make_user, make_service, count=5):
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    client = make_user('client@example.com')
+    services = [make_service(make_user(f'pro{i}@example.com', is_freelancer=True)) for i in range(count)]
+    for i, service in enumerate(services):
+        AppointmentService.create_appointment({
+            'client_id': client.id, 'service_id': service.id, 'scheduled_at': f'2030-01-0{i + 1}T10:00:00'
+        })
+    return freelancer, client, services
+
+def test_listing_routes_stay_within_their_query_budget(app, make_user, make_service, query_budget):
+    _, client, services = seed_catalogue(make_user, make_service)
+    headers = {'Authorization': f'Bearer {generate_access_token(client)}'}
+    client_id, service_id = client.id, services[0].id
+    db.session.remove()
+    http = app.test_client()
+
+    with query_budget(1, max_repeats=1):
+        assert len(http.get('/api/v0/services/').get_json()['items']) == 5
+    with query_budget(1):
+        http.get(f'/api/v0/services/{service_id}')
+    with query_budget(1, max_repeats=1):
+        assert len(http.get(f'/api/v0/appointments/client/{client_id}', headers=headers).get_json()['items']) == 5
+
+def test_lazy_loads_are_reported_as_repeated_statements(app, make_user, make_service):
+    seed_catalogue(make_user, make_service)
+    db.session.remove()
+
+    with profile_queries() as profile:
+        [service.to_dict() for service in Service.query.all()]
+
+    repeated = profile.repeated(5)
+    assert len(repeated) == 1
+    assert repeated[0].statement.startswith('SELECT users.')
+    assert repeated[0].site.startswith('app/serializers/service.py:')
+    assert '<-- repeated' in profile.report()
+
+def test_in_lists_of_any_length_normalize_alike():
+    assert normalize('SELECT x FROM t WHERE id IN (?, ?, ?)') == normalize('SELECT x\n FROM t WHERE id IN (?, ?)')
+    assert normalize('SELECT x FROM t WHERE id = ?') != normalize('SELECT x FROM t WHERE name = ?')
+
+def test_profiler_logs_slow_queries_and_counts_per_request(tmp_path, caplog):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'profiled.db'}",
+        'SQL_PROFILER': True,
+        'SQL_SLOW_QUERY_MS': 0
+    })
+    with app.app_context():
+        upgrade()
+        db.session.remove()
+        with caplog.at_level(logging.INFO, logger='app.utils.query_profiler'):
+            response = app.test_client().get('/api/v0/services/categories')
+
+    assert response.headers['X-Query-Count'] == '1'
+    slow = [r.getMessage() for r in caplog.records if r.getMessage().startswith('Slow query')]
+    assert any('app/services/serv_service.py' in message and 'FROM categories' in message for message in slow)
+    assert any('GET /api/v0/services/categories ran 1 statements' in r.getMessage() for r in caplog.records)
+
+def test_deleting_a_category_checks_for_services_without_loading_them(app, make_user, make_service, query_budget):
+    make_service(make_user('pro@example.com', is_freelancer=True))
+    category_id = Service.query.first().category_id
+    db.session.remove()
+    from app.services.serv_service import CategoryService
+
+    with query_budget(2) as profile:
+        _, error, status_code = CategoryService.delete_category(category_id)
+
+    assert (error, status_code) == ("Cannot delete category with associated services", 400)
+    assert not any(stats.statement.startswith('SELECT services.') for stats in profile.statements.values())
@@ -0,0 +1,114 @@
+import pytest
+from app import create_app, db
+from app.services.serv_service import CategoryService, ServiceService
+from app.utils.jwt_utils import generate_access_token
+from app.utils.migrations import upgrade
+
+@pytest.fixture
+def replica_app(tmp_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+        'SQLALCHEMY_REPLICA_URI': f"sqlite:///{tmp_path / 'replica.db'}",
+        'TESTING': True
+    })
+    with app.app_context():
+        upgrade()
+        upgrade(engine=db.engines['replica'])
+        for bind, label in ((None, 'primary'), ('replica', 'replica')):
+            with db.engines[bind].begin() as conn:
+                conn.exec_driver_sql("INSERT INTO users (id, email, is_freelancer) VALUES (1, 'pro@example.com', 1)")
+                conn.exec_driver_sql(f"INSERT INTO categories (id, name) VALUES (1, '{label}')")
+                conn.exec_driver_sql(
+                    "INSERT INTO services (id, user_id, category_id, title, price, duration) "
+                    f"VALUES (1, 1, 1, '{label}', 10.0, 60)"
+                )
+        yield app
+        db.session.remove()
+
+def test_catalogue_reads_go_to_the_replica(replica_app):
+    client = replica_app.test_client()
+
+    services = client.get('/api/v0/services/').get_json()['items']
+    by_category = client.get('/api/v0/services/category/1').get_json()['items']
+    categories, _, _ = CategoryService.get_all_categories()
+
+    assert [s['title'] for s in services] == ['replica']
+    assert [s['title'] for s in by_category] == ['replica']
+    assert [c.name for c in categories] == ['replica']
+
+def test_writes_go_to_the_primary_and_stick_for_the_session(replica_app):
+    category, _, status_code = CategoryService.create_category('Design')
+    categories, _, _ = CategoryService.get_all_categories()
+
+    assert status_code == 201
+    assert sorted(c.name for c in categories) == ['Design', 'primary']
+    with db.engines['replica'].connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM categories").scalar() == 1
+
+    db.session.remove()
+    categories, _, _ = CategoryService.get_all_categories()
+    assert [c.name for c in categories] == ['replica']
+
+def test_caller_reads_its_own_writes_on_later_requests(replica_app):
+    from app.models.user import User
+    headers = {'Authorization': f'Bearer {generate_access_token(User.query.get(1))}'}
+    db.session.remove()
+    client = replica_app.test_client()
+
+    created = client.post('/api/v0/services/', headers=headers, json={
+        'category_id': 1, 'title': 'fresh', 'price': 20.0, 'duration': 30
+    })
+    db.session.remove()
+    own = client.get('/api/v0/services/freelancer/1', headers=headers).get_json()['items']
+    db.session.remove()
+    others = client.get('/api/v0/services/freelancer/1').get_json()['items']
+
+    assert created.status_code == 201
+    assert [s['title'] for s in own] == ['primary', 'fresh']
+    assert [s['title'] for s in others] == ['replica']
+
+def test_without_a_replica_everything_uses_the_primary(app, make_user, make_service):
+    make_service(make_user('pro@example.com', is_freelancer=True), title='only')
+    db.session.remove()
+
+    page, _, _ = ServiceService.get_all_services(10)
+
+    assert 'replica' not in db.engines
+    assert [s.title for s in page.items] == ['only']
+
+def test_cached_reads_do_not_hide_the_callers_own_writes(replica_app):
+    from app.models.user import User
+    headers = {'Authorization': f'Bearer {generate_access_token(User.query.get(1))}'}
+    db.session.remove()
+    client = replica_app.test_client()
+
+    assert client.put('/api/v0/services/1', headers=headers, json={'title': 'mine'}).status_code == 200
+    db.session.remove()
+    # An anonymous reader fills the shared caches from the lagging replica
+    assert client.get('/api/v0/services/1').get_json()['title'] == 'replica'
+    assert [s['title'] for s in client.get('/api/v0/services/').get_json()['items']] == ['replica']
+    db.session.remove()
+
+    assert client.get('/api/v0/services/1', headers=headers).get_json()['title'] == 'mine'
+    assert [s['title'] for s in client.get('/api/v0/services/', headers=headers).get_json()['items']] == ['mine']
+
+def test_conditional_gets_validate_the_replica_rows_served(replica_app):
+    client = replica_app.test_client()
+    first = client.get('/api/v0/services/1')
+    etag = first.headers['ETag']
+
+    assert first.get_json()['title'] == 'replica'
+    assert 'Last-Modified' not in first.headers
+    assert client.get('/api/v0/services/1', headers={'If-None-Match': etag}).status_code == 304
+
+    # The replica catches up with a write this process never saw
+    with db.engines['replica'].begin() as conn:
+        conn.exec_driver_sql("UPDATE services SET title = 'caught up' WHERE id = 1")
+    for cache in replica_app.extensions['lookup_caches'].values():
+        cache.clear()
+    db.session.remove()
+
+    revalidated = client.get('/api/v0/services/1', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 200
+    assert revalidated.get_json()['title'] == 'caught up'
+    assert revalidated.headers['ETag'] != etag
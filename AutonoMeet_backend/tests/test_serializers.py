@@ -0,0 +1,139 @@
+import json
+from datetime import datetime
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from app import db
+from app.models.appointment import Appointment
+from app.models.service import Service
+from app.serializers.appointment import AppointmentDTO, summary_load, detail_load
+from app.serializers.service import ServiceDTO, service_load
+from app.services.appointment_service import AppointmentService, APPOINTMENT_ORDER
+from app.services.serv_service import SERVICE_ORDER
+from app.utils.json_provider import dumps
+from app.utils.jwt_utils import generate_access_token
+
+
+@pytest.fixture
+def selects(app):
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', listener)
+
+def test_service_dto_matches_model_fields(app, make_user, make_service):
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    service = make_service(freelancer, title='Yoga', price=25.0, duration=45)
+    db.session.expire_all()
+
+    loaded = Service.query.options(*service_load()).get(service.id)
+
+    assert ServiceDTO.from_orm(loaded).to_dict() == {
+        'id': service.id,
+        'user_id': freelancer.id,
+        'user': {'id': freelancer.id, 'email': 'pro@example.com'},
+        'category_id': loaded.category_id,
+        'category': {'name': 'General'},
+        'title': 'Yoga',
+        'price': 25.0,
+        'duration': 45,
+        'description': None
+    }
+
+def test_service_listings_serialize_from_one_select(app, make_user, make_service, selects):
+    freelancers = [make_user(f'pro{i}@example.com', is_freelancer=True) for i in range(3)]
+    for freelancer in freelancers:
+        make_service(freelancer)
+    url = f'/api/v0/services/freelancer/{freelancers[0].id}'
+    selects.clear()
+
+    response = app.test_client().get(url)
+
+    assert response.status_code == 200
+    assert response.get_json()['items'][0]['user']['email'] == 'pro0@example.com'
+    assert len(selects) == 1
+
+def test_load_plans_refuse_lazy_loads(app, make_user, make_service):
+    client = make_user('client@example.com')
+    service = make_service(make_user('pro@example.com', is_freelancer=True))
+    AppointmentService.create_appointment({
+        'client_id': client.id, 'service_id': service.id, 'scheduled_at': '2030-01-01T10:00:00'
+    })
+    db.session.expire_all()
+
+    appointment = Appointment.query.options(*summary_load()).first()
+
+    assert AppointmentDTO.from_orm(appointment).to_dict()['service_id'] == service.id
+    with pytest.raises(InvalidRequestError):
+        AppointmentDTO.from_orm(appointment, with_service=True)
+
+def test_appointment_routes_share_the_serializer(app, make_user, make_service):
+    client = make_user('client@example.com')
+    service = make_service(make_user('pro@example.com', is_freelancer=True))
+    headers = {'Authorization': f'Bearer {generate_access_token(client)}'}
+    http = app.test_client()
+
+    created = http.post('/api/v0/appointments', json={
+        'client_id': client.id, 'service_id': service.id, 'scheduled_at': '2030-01-01T10:00:00'
+    }, headers=headers).get_json()['appointment']
+    listed = http.get(f'/api/v0/appointments/client/{client.id}', headers=headers).get_json()['items']
+
+    assert created == listed[0]
+    assert set(created) == {'id', 'client_id', 'service_id', 'scheduled_at', 'created_at'}
+
+def test_projection_listings_match_the_orm_path_byte_for_byte(app, make_user, make_service):
+    from app.models.category import Category
+    client = make_user('client@example.com')
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    services = [make_service(freelancer, title=f'Service {i}', price=9.5 + i) for i in range(3)]
+    services[1].description = 'Has a description'
+    services[2].category = Category(name='Other')
+    db.session.add(Service(user_id=None, category_id=None, title='Orphan', price=1.0, duration=30))
+    db.session.commit()
+    for i, service in enumerate(services):
+        AppointmentService.create_appointment({
+            'client_id': client.id, 'service_id': service.id, 'scheduled_at': f'2030-01-0{i + 1}T10:00:00'
+        })
+    ids = {'client': client.id, 'freelancer': freelancer.id, 'category': services[2].category_id}
+    headers = {'Authorization': f'Bearer {generate_access_token(client)}'}
+    db.session.expire_all()
+
+    def orm_body(query, serialize, order_by):
+        return dumps({'items': [serialize(row) for row in query.order_by(*order_by)], 'next': None}) + '\n'
+
+    services_query = Service.query.options(*service_load())
+    appointments_query = Appointment.query.options(*detail_load())
+    expected = {
+        '/api/v0/services/': orm_body(
+            services_query, lambda s: ServiceDTO.from_orm(s).to_dict(), SERVICE_ORDER),
+        f"/api/v0/services/freelancer/{ids['freelancer']}": orm_body(
+            services_query.filter(Service.user_id == ids['freelancer']),
+            lambda s: ServiceDTO.from_orm(s).to_dict(), SERVICE_ORDER),
+        f"/api/v0/services/category/{ids['category']}": orm_body(
+            services_query.filter(Service.category_id == ids['category']),
+            lambda s: ServiceDTO.from_orm(s).to_dict(), SERVICE_ORDER),
+        '/api/v0/appointments': orm_body(
+            appointments_query, lambda a: AppointmentDTO.from_orm(a).to_dict(), APPOINTMENT_ORDER),
+        f"/api/v0/appointments/client/{ids['client']}": orm_body(
+            appointments_query.filter(Appointment.client_id == ids['client']),
+            lambda a: AppointmentDTO.from_orm(a).to_dict(), APPOINTMENT_ORDER),
+        f"/api/v0/appointments/freelancer/{ids['freelancer']}": orm_body(
+            appointments_query.filter(Appointment.freelancer_id == ids['freelancer']),
+            lambda a: AppointmentDTO.from_orm(a, with_service=True).to_detail_dict(), APPOINTMENT_ORDER),
+    }
+
+    http = app.test_client()
+    for url, body in expected.items():
+        response = http.get(url, headers=headers)
+        assert response.status_code == 200, url
+        assert response.get_data(as_text=True) == body, url
+    assert json.loads(expected['/api/v0/services/'])['items'][-1]['user'] is None
+
+def test_json_provider_keeps_flask_encoding_for_dates(app):
+    when = datetime(2030, 1, 1, 10, 0, 0)
+
+    assert app.json.loads(app.json.dumps({'at': when})) == {'at': 'Tue, 01 Jan 2030 10:00:00 GMT'}
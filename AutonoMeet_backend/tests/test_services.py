@@ -0,0 +1,245 @@
+import json
+
+
+def test_service_listing_streams_ndjson(app, make_user, make_service):
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    services = [make_service(freelancer, title=f'Service {i}') for i in range(5)]
+
+    response = app.test_client().get('/api/v0/services/?stream=ndjson')
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['id'] for row in rows] == [service.id for service in services]
+    assert rows[0]['user'] == {'id': freelancer.id, 'email': 'pro@example.com'}
+
+def test_service_listing_rejects_unknown_stream_format(app):
+    assert app.test_client().get('/api/v0/services/?stream=csv').status_code == 400
+
+def test_service_lookup_is_cached_until_updated(app, make_user, make_service):
+    from app.services.serv_service import ServiceService
+    from app.utils.cache import get_cache
+    service = make_service(make_user('pro@example.com', is_freelancer=True), title='Haircut')
+
+    ServiceService.get_service_by_id(service.id)
+    cached, _, _ = ServiceService.get_service_by_id(service.id)
+    assert cached.title == 'Haircut'
+    assert get_cache('services').stats()['hits'] == 1
+
+    ServiceService.update_service(service.id, title='Beard trim')
+    refreshed, _, _ = ServiceService.get_service_by_id(service.id)
+    assert refreshed.title == 'Beard trim'
+    assert get_cache('services').stats()['misses'] == 2
+
+def test_listing_cache_tracks_service_and_category_writes(app, make_user, make_service):
+    from app.services.serv_service import ServiceService, CategoryService
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    first = make_service(freelancer)
+    client = app.test_client()
+
+    assert [s['id'] for s in client.get('/api/v0/services/').json['items']] == [first.id]
+
+    created, _, _ = ServiceService.create_service(freelancer.id, first.category_id, 'New', 5.0, 30)
+    assert [s['id'] for s in client.get('/api/v0/services/').json['items']] == [first.id, created.id]
+
+    CategoryService.update_category(first.category_id, 'Renamed')
+    assert {s['category']['name'] for s in client.get('/api/v0/services/').json['items']} == {'Renamed'}
+    assert client.get(f'/api/v0/services/{first.id}').json['category']['name'] == 'Renamed'
+
+    ServiceService.delete_service(first.id)
+    assert [s['id'] for s in client.get('/api/v0/services/').json['items']] == [created.id]
+
+def test_unchanged_catalogue_revalidates_without_querying(app, make_user, make_service):
+    from sqlalchemy import event
+    from app import db
+    from app.services.serv_service import ServiceService
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    service = make_service(freelancer)
+    client = app.test_client()
+
+    first = client.get('/api/v0/services/')
+    etag = first.headers['ETag']
+    assert first.headers['Last-Modified']
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        revalidated = client.get('/api/v0/services/', headers={'If-None-Match': etag})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert revalidated.status_code == 304
+    assert statements == []
+
+    ServiceService.create_service(freelancer.id, service.category_id, 'New', 5.0, 30)
+    changed = client.get('/api/v0/services/', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+def test_category_etag_changes_on_rename(app, make_user, make_service):
+    from app.services.serv_service import CategoryService
+    service = make_service(make_user('pro@example.com', is_freelancer=True))
+    client = app.test_client()
+    category_etag = client.get('/api/v0/services/categories').headers['ETag']
+    service_etag = client.get(f'/api/v0/services/{service.id}').headers['ETag']
+
+    CategoryService.update_category(service.category_id, 'Renamed')
+
+    assert client.get('/api/v0/services/categories', headers={'If-None-Match': category_etag}).status_code == 200
+    assert client.get(f'/api/v0/services/{service.id}', headers={'If-None-Match': service_etag}).status_code == 200
+
+def test_search_ranks_matches_and_follows_writes(app, make_user, make_service):
+    from app.models.category import Category
+    from app.services.serv_service import ServiceService, CategoryService
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    in_title = make_service(freelancer, title='Yoga class')
+    in_description = make_service(freelancer, title='Pilates')
+    ServiceService.update_service(in_description.id, description='Yoga inspired core work')
+    in_category = make_service(freelancer, title='Stretching', category=Category(name='Yoga'))
+    make_service(freelancer, title='Haircut')
+    client = app.test_client()
+
+    def search(q):
+        response = client.get('/api/v0/services/search', query_string={'q': q})
+        assert response.status_code == 200
+        return [service['id'] for service in response.json]
+
+    assert search('yoga') == [in_title.id, in_category.id, in_description.id]
+    assert search('YO') == search('yoga')
+    assert search('yoga pil') == [in_description.id]
+    assert client.get('/api/v0/services/search', query_string={'q': 'yoga', 'limit': 1}).json[0]['title'] == 'Yoga class'
+
+    ServiceService.update_service(in_description.id, title='Yoga pilates')
+    ServiceService.delete_service(in_title.id)
+    created, _, _ = ServiceService.create_service(freelancer.id, in_category.category_id, 'Meditation', 20.0, 30)
+    assert search('yoga') == [in_description.id, in_category.id, created.id]
+
+    CategoryService.update_category(in_category.category_id, 'Mindfulness')
+    assert search('yoga') == [in_description.id]
+    assert search('mindful') == [in_category.id, created.id]
+
+def test_search_rejects_empty_and_oversized_queries(app):
+    client = app.test_client()
+
+    assert client.get('/api/v0/services/search').status_code == 400
+    assert client.get('/api/v0/services/search', query_string={'q': ' ?! '}).status_code == 400
+    assert client.get('/api/v0/services/search', query_string={'q': ' '.join('abcdefghi')}).status_code == 400
+    assert client.get('/api/v0/services/search', query_string={'q': 'yoga'}).json == []
+
+def test_listing_filters_and_sorts_across_pages(app, make_user, make_service):
+    from app.models.category import Category
+    pro = make_user('pro@example.com', is_freelancer=True)
+    other = make_user('other@example.com', is_freelancer=True)
+    music = Category(name='Music')
+    cheap = make_service(pro, title='Cheap', price=10.0, duration=30)
+    mid = make_service(pro, title='Mid', price=50.0, duration=60)
+    same_price = make_service(other, title='Same price', price=50.0, duration=90)
+    pricey = make_service(other, title='Pricey', price=120.0, duration=45, category=music)
+    lesson = make_service(pro, title='Lesson', price=40.0, duration=60, category=music)
+    client = app.test_client()
+
+    def listing(**params):
+        ids, after = [], None
+        while True:
+            response = client.get('/api/v0/services/', query_string={**params, 'limit': 2, **({'after': after} if after else {})})
+            assert response.status_code == 200
+            ids += [service['id'] for service in response.json['items']]
+            after = response.json['next']
+            if not after:
+                return ids
+
+    assert listing(sort='price') == [cheap.id, lesson.id, mid.id, same_price.id, pricey.id]
+    assert listing(sort='-price') == [pricey.id, same_price.id, mid.id, lesson.id, cheap.id]
+    assert listing(min_price=40, max_price=50, sort='-duration') == [same_price.id, lesson.id, mid.id]
+    assert listing(category_id=music.id, sort='price') == [lesson.id, pricey.id]
+    assert listing(user_id=pro.id, max_duration=60) == [cheap.id, mid.id, lesson.id]
+    assert listing(sort='-id', max_price=100) == [lesson.id, same_price.id, mid.id, cheap.id]
+
+    rows = client.get('/api/v0/services/', query_string={'stream': 'ndjson', 'category_id': music.id, 'sort': '-price'})
+    assert [json.loads(line)['id'] for line in rows.get_data(as_text=True).splitlines()] == [pricey.id, lesson.id]
+
+def test_listing_rejects_malformed_filters(app, make_user, make_service):
+    make_service(make_user('pro@example.com', is_freelancer=True))
+    make_service(make_user('other@example.com', is_freelancer=True))
+    client = app.test_client()
+
+    for params in ({'min_price': 'cheap'}, {'max_price': 'nan'}, {'max_duration': '1.5'}, {'sort': 'title'}):
+        response = client.get('/api/v0/services/', query_string=params)
+        assert response.status_code == 400, params
+    id_cursor = client.get('/api/v0/services/?limit=1').json['next']
+    assert client.get('/api/v0/services/', query_string={'sort': 'price', 'after': id_cursor}).status_code == 400
+    # A cursor only continues the sort and filters that issued it
+    price_cursor = client.get('/api/v0/services/?limit=1&sort=price').json['next']
+    for params in ({'sort': 'duration'}, {'sort': '-price'}, {'sort': 'price', 'max_price': 100}):
+        response = client.get('/api/v0/services/', query_string={**params, 'after': price_cursor})
+        assert response.status_code == 400, params
+    assert client.get('/api/v0/services/', query_string={'sort': 'price', 'after': price_cursor}).status_code == 200
+
+def test_listing_rejects_cursors_of_the_wrong_type(app, make_user, make_service):
+    make_service(make_user('pro@example.com', is_freelancer=True))
+    client = app.test_client()
+
+    # ["x"] and [1.5]: well-formed, but not an id
+    for cursor in ('WyJ4Il0', 'WzEuNV0'):
+        assert client.get('/api/v0/services/', query_string={'after': cursor}).status_code == 400
+
+def test_listing_cache_survives_odd_cursors_and_failing_invalidation(app, make_user, make_service):
+    from app.services.serv_service import ServiceService, listing_scope
+    from app.utils.cache import get_cache
+    from app.utils.pagination import encode_cursor
+    service = make_service(make_user('pro@example.com', is_freelancer=True))
+    client = app.test_client()
+
+    assert client.get('/api/v0/services/', query_string={'after': 'WyJ4Il0'}).status_code == 400
+    page = client.get('/api/v0/services/', query_string={'after': encode_cursor([0], listing_scope('id', {}))})
+    assert [s['id'] for s in page.json['items']] == [service.id]
+    assert get_cache('service_pages').stats()['size'] == 1
+
+    created, error, status_code = ServiceService.create_service(service.user_id, service.category_id, 'New', 5.0, 30)
+    assert status_code == 201 and error is None
+
+    pages = get_cache('service_pages')
+    pages.get_or_load('broken', lambda: object())
+    pages.invalidate_where(lambda key, page: page.items)
+    assert pages.stats()['size'] == 0
+
+def test_if_modified_since_follows_writes_and_the_ttl_window(app, make_user, make_service, monkeypatch):
+    from email.utils import formatdate
+    from types import SimpleNamespace
+    from app.services.serv_service import ServiceService
+    from app.utils import conditional
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    service = make_service(freelancer)
+    client = app.test_client()
+    app.config['SERVICE_CACHE_TTL'] = 30
+    now = [1_900_000_025.0]
+    monkeypatch.setattr(conditional, 'time', SimpleNamespace(time=lambda: now[0]))
+
+    first = client.get('/api/v0/services/')
+    assert first.headers['Last-Modified'] == formatdate(1_900_000_020, usegmt=True)
+    since = {'If-Modified-Since': first.headers['Last-Modified']}
+    assert client.get('/api/v0/services/', headers=since).status_code == 304
+
+    # A write in the same second as the date the client holds
+    now[0] = 1_900_000_020.5
+    ServiceService.create_service(freelancer.id, service.category_id, 'New', 5.0, 30)
+    now[0] = 1_900_000_025.0
+    assert client.get('/api/v0/services/', headers=since).status_code == 200
+
+    # The next window moves the date on even though this worker saw no write
+    now[0] = 1_900_000_055.0
+    rolled = client.get('/api/v0/services/')
+    assert rolled.headers['Last-Modified'] == formatdate(1_900_000_050, usegmt=True)
+    assert client.get('/api/v0/services/', headers=since).status_code == 200
+    assert client.get('/api/v0/services/', headers={'If-Modified-Since': rolled.headers['Last-Modified']}).status_code == 304
+
+def test_service_duration_is_capped(app, make_user, make_service):
+    from app.services.serv_service import ServiceService
+    freelancer = make_user('pro@example.com', is_freelancer=True)
+    service = make_service(freelancer)
+    longest = app.config['APPOINTMENT_MAX_DURATION']
+
+    assert ServiceService.create_service(freelancer.id, service.category_id, 'Long', 5.0, longest + 1)[2] == 400
+    assert ServiceService.update_service(service.id, duration=longest + 1)[2] == 400
+    assert ServiceService.update_service(service.id, duration=longest)[2] == 200
@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from app.utils.cache import get_cache
+from app.utils.warmup import run_warmup
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_create_app_defers_payment_and_oauth_clients():
+    probe = (
+        "import json, sys\n"
+        "from app import create_app\n"
+        "create_app()\n"
+        "print(json.dumps([m for m in ('stripe', 'requests', 'google.auth') if m in sys.modules]))\n"
+    )
+    env = {**os.environ, 'DATABASE_URL': 'sqlite://', 'WARMUP': ''}
+
+    result = subprocess.run([sys.executable, '-c', probe], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+def test_warmup_primes_pool_clients_and_catalogue(app, make_user, make_service):
+    make_service(make_user('pro@example.com', is_freelancer=True))
+
+    timings = run_warmup(app, ['db', 'http', 'services'])
+
+    assert list(timings) == ['db', 'http', 'services']
+    assert app.extensions['http_client'] is not None
+    assert get_cache('service_pages').stats()['size'] == 1
+
+def test_unknown_warmup_hook_is_rejected(app):
+    with pytest.raises(ValueError):
+        run_warmup(app, ['db', 'nope'])
@@ -1,4 +1,4 @@
-import apiClient from './apiClient';
+import apiClient, { getAllPages } from './apiClient';
 
 interface AppointmentData {
   client_id: number;
@@ -36,8 +36,7 @@ export const AppointmentService = {
 
   getAppointmentsByFreelancer: async (freelancerId: number): Promise<Appointment[]> => {
     try {
-      const response = await apiClient.get(`/appointments/freelancer/${freelancerId}`);
-      return response.data;
+      return await getAllPages<Appointment>(`/appointments/freelancer/${freelancerId}`);
     } catch (error) {
       throw new Error('Error fetching freelancer appointments');
     }
@@ -48,11 +47,7 @@ export const AppointmentService = {
       if (!clientId || isNaN(clientId)) {
         throw new Error('Invalid client ID');
       }
-      const response = await apiClient.get(`/appointments/client/${clientId}`);
-      if (!Array.isArray(response.data)) {
-        throw new Error('Invalid response format: Expected an array');
-      }
-      return response.data;
+      return await getAllPages<Appointment>(`/appointments/client/${clientId}`);
     } catch (error: any) {
       const message = error.response?.data?.message || error.message || 'Error fetching client appointments';
       throw new Error(`Failed to fetch appointments for client ${clientId}: ${message}`);
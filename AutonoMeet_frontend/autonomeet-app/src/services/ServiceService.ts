@@ -1,4 +1,4 @@
-import apiClient from './apiClient';
+import apiClient, { getAllPages } from './apiClient';
 
 interface Service {
   id: number;
@@ -38,8 +38,7 @@ interface UpdateServiceData {
 export const ServiceService = {
   getFreelancerServices: async (userId: number): Promise<Service[]> => {
     try {
-      const response = await apiClient.get(`/services/freelancer/${userId}`);
-      return response.data;
+      return await getAllPages<Service>(`/services/freelancer/${userId}`);
     } catch (error: any) {
       throw new Error(error.response?.data?.message || 'Error fetching freelancer services');
     }
@@ -105,8 +104,7 @@ export const ServiceService = {
 
   getAllServices: async (): Promise<Service[]> => {
     try {
-      const response = await apiClient.get('/services/');
-      return response.data;
+      return await getAllPages<Service>('/services/');
     } catch (error: any) {
       throw new Error(error.response?.data?.message || 'Error fetching all services');
     }
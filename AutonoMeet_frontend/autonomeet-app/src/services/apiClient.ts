@@ -27,4 +27,21 @@ apiClient.interceptors.response.use((response) => {
   return Promise.reject(error);
 });
 
+export interface Page<T> {
+  items: T[];
+  next: string | null;
+}
+
+// List endpoints answer one page at a time; follow the cursors to get everything
+export const getAllPages = async <T>(url: string): Promise<T[]> => {
+  const items: T[] = [];
+  let after: string | null = null;
+  do {
+    const response: { data: Page<T> } = await apiClient.get<Page<T>>(url, { params: after ? { after } : {} });
+    items.push(...response.data.items);
+    after = response.data.next;
+  } while (after);
+  return items;
+};
+
 export default apiClient;
\ No newline at end of file